@@ -23,6 +23,10 @@ class AnalyzeRequest(BaseModel):
     output_format: OutputFormat = "text"
     length: Length = "medium"
     save: bool = True
+    summary_only: bool = Field(
+        default=False,
+        description="Only compute the analysis fields the summary prompt needs; facts and quotes are omitted.",
+    )
 
     @model_validator(mode="after")
     def require_text_or_url(self) -> "AnalyzeRequest":
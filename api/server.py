@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import math
 import os
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from uuid import uuid4
 
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from adapter_input import to_document
-from main import build_document_from_url, run_llm, run_nlp
+from llm_layer import PROMPT_FIELDS, get_default_summary_cache
+from main import build_document_from_url, run_llm_stream, run_nlp, run_nlp_incremental
+from nlp.dedup import get_default_index as get_dedup_index, save_default_index as save_dedup_index, signature
+from nlp.incremental import get_default_analyzer
+from nlp_layer import analysis_meta, get_default_cache
+from utils.llm_clients import close_clients as close_llm_clients
+from utils.llm_governor import LLMUnavailableError, classify, governor_stats, retry_after
+from utils.llm_providers import get_provider, provider_info
+from utils.llm_telemetry import call_summary, telemetry_stats
+from utils.single_flight import SingleFlight
 
 from .models import AnalyzeRequest, AnalyzeResponse, HistoryResponse
 from .storage import get_run, init_db, list_runs, save_run
@@ -37,6 +51,12 @@ def startup() -> None:
     init_db()
 
 
+@app.on_event("shutdown")
+def shutdown() -> None:
+    save_dedup_index()
+    close_llm_clients()
+
+
 def _now_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
@@ -61,6 +81,13 @@ def _build_document(payload: AnalyzeRequest) -> Dict[str, Any]:
 
 def _pipeline_error(exc: Exception) -> HTTPException:
     message = str(exc)
+    if isinstance(exc, LLMUnavailableError) or classify(exc) == "throttled":
+        wait = exc.retry_after if isinstance(exc, LLMUnavailableError) else retry_after(exc)
+        return HTTPException(
+            status_code=503,
+            detail=f"The LLM provider is unavailable or rate limiting: {message}",
+            headers={"Retry-After": str(max(math.ceil(wait or 1), 1))},
+        )
     if "GROQ_API_KEY" in message:
         return HTTPException(
             status_code=503,
@@ -69,6 +96,14 @@ def _pipeline_error(exc: Exception) -> HTTPException:
     return HTTPException(status_code=500, detail=f"Analysis failed: {message}")
 
 
+def _coalescing_enabled() -> bool:
+    return (os.getenv("NOISE_SIGNAL_COALESCE") or "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _incremental_enabled() -> bool:
+    return (os.getenv("NOISE_SIGNAL_INCREMENTAL_NLP") or "").strip().lower() in {"1", "true", "yes"}
+
+
 def require_extension_token(request: Request) -> None:
     expected = os.getenv("EXTENSION_API_TOKEN")
     if not expected:
@@ -80,11 +115,22 @@ def require_extension_token(request: Request) -> None:
 
 @app.get("/health")
 def health() -> Dict[str, Any]:
+    cache = get_default_cache()
+    summary_cache = get_default_summary_cache()
+    dedup = get_dedup_index()
     return {
         "ok": True,
         "service": "noise-to-signal-api",
         "db": str(os.getenv("NOISE_SIGNAL_DB") or "data/noise_to_signal_extension.db"),
         "groq_configured": bool(os.getenv("GROQ_API_KEY")),
+        "llm_provider": provider_info(),
+        "analysis_cache": cache.stats() if cache is not None else None,
+        "summary_cache": summary_cache.stats() if summary_cache is not None else None,
+        "llm_governor": governor_stats(),
+        "llm_telemetry": telemetry_stats(),
+        "incremental_nlp": get_default_analyzer().stats() if _incremental_enabled() else None,
+        "dedup_index": dedup.stats() if dedup is not None else None,
+        "coalescing": _flights.stats() if _coalescing_enabled() else None,
     }
 
 
@@ -97,64 +143,293 @@ def root() -> Dict[str, Any]:
     }
 
 
-@app.post("/api/analyze", response_model=AnalyzeResponse)
-def analyze(payload: AnalyzeRequest, _: None = Depends(require_extension_token)) -> AnalyzeResponse:
-    run_id = str(uuid4())
-    created_at = _now_iso()
-
-    try:
-        document = _build_document(payload)
+def _prepare(payload: AnalyzeRequest) -> Dict[str, Any]:
+    """
+    Ingest, near-duplicate lookup and NLP for one request. "summary_text" is
+    set when a duplicate's saved summary can be reused; otherwise the caller
+    generates it.
+    """
+    dedup = get_dedup_index()
+    sig = None
+    duplicate_of = None
+    summary_text = None
+    document = _build_document(payload)
+    if dedup is not None:
+        sig = signature((document.get("content") or {}).get("text") or "")
+        match = dedup.query(sig=sig)
+        earlier = get_run(match["ref"]) if match is not None else None
+        # a summary-only run cannot stand in for a full analysis
+        if earlier is not None and (payload.summary_only or "facts" in earlier["analysis"]):
+            duplicate_of = {"run_id": earlier["id"], "similarity": match["similarity"]}
+    if duplicate_of is not None:
+        # near-duplicate of a saved run: its analysis stands in, and so does its
+        # summary when the same variant was requested. Its meta is this document's,
+        # as with AnalysisCache: the prompt's TITLE: and SOURCE: come from it.
+        analysis = {**earlier["analysis"], "meta": analysis_meta(document)}
+        if (earlier["tier"], earlier["output_format"], earlier["length"]) == (
+            payload.tier,
+            payload.output_format,
+            payload.length,
+        ):
+            summary_text = earlier["summary_text"]
+    elif payload.summary_only:
+        analysis = run_nlp(document, fields=PROMPT_FIELDS)
+    elif _incremental_enabled():
+        analysis = run_nlp_incremental(document)
+    else:
         analysis = run_nlp(document)
-        summary_text = run_llm(
-            analysis,
+
+    return {
+        "document": document,
+        "analysis": analysis,
+        "summary_text": summary_text,
+        "duplicate_of": duplicate_of,
+        "sig": sig,
+        **_labels(payload, document),
+    }
+
+
+def _labels(payload: AnalyzeRequest, document: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    doc_meta = document.get("meta") or {}
+    return {
+        "title": _clean_optional(payload.title) or doc_meta.get("title"),
+        "url": _clean_optional(payload.url) or doc_meta.get("url"),
+    }
+
+
+# ---------- Request coalescing ----------
+#
+# Identical requests that overlap (a viral article submitted by many users
+# within seconds) share one ingest + NLP + LLM run. The title, and the URL sent
+# with a text, are part of "identical": they go into the analysis meta and the
+# prompt. Each caller still gets its own run id and saved run; only the first
+# one adds the article to the near-duplicate index. NOISE_SIGNAL_COALESCE=0
+# turns it off.
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "ref_src")
+
+_flights: SingleFlight[Tuple[str, Any]] = SingleFlight("analyze-flight")
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", urlencode(query), "")
+    )
+
+
+def _flight_key(payload: AnalyzeRequest) -> Tuple[Optional[str], ...]:
+    text = _clean_optional(payload.text)
+    url = _clean_optional(payload.url)
+    if text:
+        # the URL sent with a text goes into the analysis meta and the prompt (SOURCE:)
+        source = ("text:" + hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest(), url)
+    else:
+        # fetched pages differing only in tracking parameters count as one
+        source = ("url:" + _normalize_url(url or ""), None)
+    return (
+        *source,
+        _clean_optional(payload.title),  # likewise (TITLE:)
+        payload.tier,
+        payload.output_format,
+        payload.length,
+        str(payload.summary_only),
+    )
+
+
+def _pipeline(payload: AnalyzeRequest) -> Iterator[Tuple[str, Any]]:
+    """
+    ("prepared", _prepare() result), then ("delta", text) while the summary
+    is generated and ("llm", llm_telemetry.call_summary()) once it is.
+    """
+    prepared = _prepare(payload)
+    yield "prepared", prepared
+    if prepared["summary_text"] is None:
+        calls = []
+        for delta in run_llm_stream(
+            prepared["analysis"],
             tier=payload.tier,
             output_format=payload.output_format,
             length=payload.length,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:
-        raise _pipeline_error(exc) from exc
+            calls=calls,
+        ):
+            yield "delta", delta
+        yield "llm", call_summary(calls)
+
+
+def _run_pipeline(payload: AnalyzeRequest) -> Tuple[Iterator[Tuple[str, Any]], bool]:
+    """_pipeline() events for this request, shared with identical requests in flight; (events, first)."""
+    if not _coalescing_enabled():
+        return _pipeline(payload), True
+    return _flights.join(_flight_key(payload), lambda: _pipeline(payload))
+
+
+def _own_prepared(payload: AnalyzeRequest, prepared: Dict[str, Any], first: bool) -> Dict[str, Any]:
+    # a coalesced caller keeps its own URL label (tracking parameters), and does not index the article again
+    return {**prepared, **_labels(payload, prepared["document"]), "coalesced": not first}
 
-    doc_meta = document.get("meta") or {}
-    title = _clean_optional(payload.title) or doc_meta.get("title")
-    url = _clean_optional(payload.url) or doc_meta.get("url")
-    input_text = (document.get("content") or {}).get("text") or ""
-    model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
-    source_type = "text" if _clean_optional(payload.text) else "url"
+
+def _response_meta(
+    payload: AnalyzeRequest, prepared: Dict[str, Any], llm: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    # llm: the summary's LLM telemetry, None if no call was made (cached or reused summary)
+    return {
+        "tier": payload.tier,
+        "output_format": payload.output_format,
+        "length": payload.length,
+        "model": llm["model"] if llm else get_provider().default_model,
+        "source_type": "text" if _clean_optional(payload.text) else "url",
+        "saved": payload.save,
+        "summary_only": payload.summary_only,
+        "duplicate_of": prepared["duplicate_of"],
+        "coalesced": prepared.get("coalesced", False),
+        "llm": llm,
+    }
+
+
+def _finish(
+    payload: AnalyzeRequest,
+    prepared: Dict[str, Any],
+    run_id: str,
+    created_at: str,
+    summary_text: str,
+    llm: Optional[Dict[str, Any]] = None,
+) -> AnalyzeResponse:
+    """Saves the run (when requested) and builds the response."""
+    document = prepared["document"]
+    meta = _response_meta(payload, prepared, llm)
 
     if payload.save:
         save_run(
             run_id=run_id,
             created_at=created_at,
-            title=title,
-            url=url,
-            input_text=input_text,
+            title=prepared["title"],
+            url=prepared["url"],
+            input_text=(document.get("content") or {}).get("text") or "",
             document=document,
-            analysis=analysis,
+            analysis=prepared["analysis"],
             summary_text=summary_text,
             tier=payload.tier,
             output_format=payload.output_format,
             length=payload.length,
-            model=model,
-            source_type=source_type,
+            model=meta["model"],
+            source_type=meta["source_type"],
+            # a coalesced request shares the first one's calls; its cost is counted once
+            llm=None if prepared.get("coalesced") else llm,
         )
+        dedup = get_dedup_index()
+        if dedup is not None and prepared["duplicate_of"] is None and not prepared.get("coalesced"):
+            dedup.add(run_id, ref=run_id, sig=prepared["sig"])
+            save_dedup_index(min_changes=25)
 
     return AnalyzeResponse(
         id=run_id,
         created_at=created_at,
-        title=title,
-        url=url,
+        title=prepared["title"],
+        url=prepared["url"],
         summary_text=summary_text,
-        analysis=analysis,
-        meta={
-            "tier": payload.tier,
-            "output_format": payload.output_format,
-            "length": payload.length,
-            "model": model,
-            "source_type": source_type,
-            "saved": payload.save,
-        },
+        analysis=prepared["analysis"],
+        meta=meta,
+    )
+
+
+@app.post("/api/analyze", response_model=AnalyzeResponse)
+def analyze(payload: AnalyzeRequest, _: None = Depends(require_extension_token)) -> AnalyzeResponse:
+    run_id = str(uuid4())
+    created_at = _now_iso()
+    try:
+        events, first = _run_pipeline(payload)
+        prepared = None
+        parts = []
+        llm = None
+        for kind, value in events:
+            if kind == "prepared":
+                prepared = _own_prepared(payload, value, first)
+            elif kind == "llm":
+                llm = value
+            else:
+                parts.append(value)
+        summary_text = prepared["summary_text"]
+        if summary_text is None:
+            summary_text = "".join(parts).strip()
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise _pipeline_error(exc) from exc
+    return _finish(payload, prepared, run_id, created_at, summary_text, llm)
+
+
+def _stream_frame(event: Dict[str, Any], sse: bool) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event['event']}\ndata: {data}\n\n" if sse else data + "\n"
+
+
+@app.post("/api/analyze/stream")
+def analyze_stream(
+    payload: AnalyzeRequest,
+    request: Request,
+    _: None = Depends(require_extension_token),
+) -> StreamingResponse:
+    """
+    /api/analyze, streamed. Ingest and NLP errors still return an HTTP error;
+    after that the body is NDJSON (or Server-Sent Events when the client
+    accepts text/event-stream) with, in order:
+
+      {"event": "analysis", "id", "created_at", "title", "url", "analysis", "meta"}
+      {"event": "delta", "text"}        summary text as the model produces it
+      {"event": "done", ...}            the AnalyzeResponse fields except analysis;
+                                        meta.llm has the token counts and timings
+      {"event": "error", "detail"}      instead of "done" if generation or saving fails
+    """
+    run_id = str(uuid4())
+    created_at = _now_iso()
+    try:
+        pipeline, first = _run_pipeline(payload)
+        prepared = _own_prepared(payload, next(pipeline)[1], first)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise _pipeline_error(exc) from exc
+    sse = "text/event-stream" in (request.headers.get("accept") or "")
+
+    def events() -> Iterator[Dict[str, Any]]:
+        yield {
+            "event": "analysis",
+            "id": run_id,
+            "created_at": created_at,
+            "title": prepared["title"],
+            "url": prepared["url"],
+            "analysis": prepared["analysis"],
+            "meta": _response_meta(payload, prepared),
+        }
+        try:
+            summary_text = prepared["summary_text"]
+            llm = None
+            if summary_text is not None:
+                yield {"event": "delta", "text": summary_text}
+            else:
+                parts = []
+                for kind, value in pipeline:
+                    if kind == "llm":
+                        llm = value
+                        continue
+                    parts.append(value)
+                    yield {"event": "delta", "text": value}
+                summary_text = "".join(parts).strip()
+            response = _finish(payload, prepared, run_id, created_at, summary_text, llm)
+        except Exception as exc:
+            yield {"event": "error", "detail": _pipeline_error(exc).detail}
+            return
+        yield {"event": "done", **response.model_dump(exclude={"analysis"})}
+
+    return StreamingResponse(
+        (_stream_frame(event, sse) for event in events()),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # keep proxies (nginx, Cloud Run front ends) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
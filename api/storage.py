@@ -29,7 +29,13 @@ CREATE TABLE IF NOT EXISTS analysis_runs (
   output_format TEXT NOT NULL,
   length TEXT NOT NULL,
   model TEXT,
-  source_type TEXT NOT NULL
+  source_type TEXT NOT NULL,
+  llm_calls INTEGER,
+  prompt_tokens INTEGER,
+  completion_tokens INTEGER,
+  queue_wait_ms REAL,
+  ttft_ms REAL,
+  latency_ms REAL
 );
 
 CREATE INDEX IF NOT EXISTS idx_analysis_runs_created_at
@@ -37,6 +43,18 @@ ON analysis_runs(created_at DESC);
 """
 
 
+# LLM telemetry (utils.llm_telemetry.call_summary) of the calls a run made itself;
+# NULL when it made none (cached or reused summary, coalesced request)
+LLM_COLUMNS = {
+    "llm_calls": "INTEGER",
+    "prompt_tokens": "INTEGER",
+    "completion_tokens": "INTEGER",
+    "queue_wait_ms": "REAL",
+    "ttft_ms": "REAL",
+    "latency_ms": "REAL",
+}
+
+
 def connect() -> sqlite3.Connection:
     db_path = get_db_path()
     db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -48,6 +66,10 @@ def connect() -> sqlite3.Connection:
 def init_db() -> None:
     with connect() as conn:
         conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(analysis_runs)")}
+        for name, kind in LLM_COLUMNS.items():
+            if name not in columns:  # databases created before LLM telemetry
+                conn.execute(f"ALTER TABLE analysis_runs ADD COLUMN {name} {kind}")
         conn.commit()
 
 
@@ -66,7 +88,9 @@ def save_run(
     length: str,
     model: Optional[str],
     source_type: str,
+    llm: Optional[Dict[str, Any]] = None,
 ) -> None:
+    llm = llm or {}
     init_db()
     with connect() as conn:
         conn.execute(
@@ -74,9 +98,10 @@ def save_run(
             INSERT INTO analysis_runs (
               id, created_at, title, url, input_text, document_json,
               analysis_json, summary_text, tier, output_format, length,
-              model, source_type
+              model, source_type, llm_calls, prompt_tokens, completion_tokens,
+              queue_wait_ms, ttft_ms, latency_ms
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 run_id,
@@ -92,6 +117,12 @@ def save_run(
                 length,
                 model,
                 source_type,
+                llm.get("calls"),
+                llm.get("prompt_tokens"),
+                llm.get("completion_tokens"),
+                llm.get("queue_wait_ms"),
+                llm.get("ttft_ms"),
+                llm.get("latency_ms"),
             ),
         )
         conn.commit()
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import os
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 from dotenv import load_dotenv
-from groq import Groq
+
+if TYPE_CHECKING:
+    from llm_layer import SummaryCache
 
 load_dotenv()
 
@@ -20,32 +21,42 @@ def summarize_with_openai(
     output_format: str = "text",
     length: str = "short",
     model: Optional[str] = None,
+    cache: Optional["SummaryCache"] = None,
+    fresh: bool = False,
 ) -> str:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("GROQ_API_KEY missing in environment.")
-
-    from llm_layer import _build_prompt, _validate_analysis
-
-    _validate_analysis(analysis)
-    prompt = _build_prompt(analysis, tier, output_format, length)
-    system_msg = (
-        "You are a precise news explainer. Return ONLY the final output. "
-        "No JSON, no code fences."
-        + (
-            " Output must be valid HTML using h3,p,ul,li,strong,em only."
-            if output_format == "html" else ""
-        )
+    from llm_layer import summarize
+
+    return summarize(
+        analysis,
+        tier,
+        output_format,
+        length,
+        model=model or get_default_openai_model(),
+        cache=cache,
+        fresh=fresh,
     )
 
-    client = Groq(api_key=api_key)
-    response = client.chat.completions.create(
+
+async def summarize_with_openai_async(
+    analysis: Dict,
+    *,
+    tier: str = "tier1",
+    output_format: str = "text",
+    length: str = "short",
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cache: Optional["SummaryCache"] = None,
+    fresh: bool = False,
+) -> str:
+    from llm_layer import summarize_async
+
+    return await summarize_async(
+        analysis,
+        tier,
+        output_format,
+        length,
         model=model or get_default_openai_model(),
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2,
-        max_tokens=800,
+        timeout=timeout,
+        cache=cache,
+        fresh=fresh,
     )
-    return response.choices[0].message.content.strip()
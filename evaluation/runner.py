@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import csv
 import json
 import os
@@ -8,7 +9,9 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
 from adapter_input import to_document
-from main import build_document_from_text, build_document_from_url, run_llm, run_nlp
+from llm_layer import SummaryVariant, get_default_summary_cache, summarize_many
+from main import build_document_from_text, build_document_from_url, run_llm, run_llm_async, run_llm_many, run_nlp
+from utils.llm_clients import aclose_async_clients
 
 from .carbon_eval import CodeCarbonUnavailableError, summarize_compute, track_emissions
 from .factcc_eval import FactCCAdapter, FactCCConfig, make_factcc_record, write_factcc_jsonl
@@ -20,7 +23,7 @@ from .metrics_schema import (
     make_article_id,
 )
 from .stability import score_stability
-from .openai_eval import summarize_with_openai
+from .openai_eval import get_default_openai_model, summarize_with_openai, summarize_with_openai_async
 from .summac_eval import SummaCConfig, SummaCEvaluator, SummaCUnavailableError
 
 
@@ -97,9 +100,11 @@ def _evaluate_document(
     output_dir: str,
     artifact_path: Optional[str] = None,
     summary_text_override: Optional[str] = None,
+    analysis: Optional[Dict[str, Any]] = None,
+    pregenerated: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     ensure_dir(output_dir)
-    analysis = run_nlp(document)
+    analysis = analysis or run_nlp(document)
     article_id = make_article_id(document["content"]["text"], (document.get("meta") or {}).get("url"))
 
     if summary_text_override is not None:
@@ -109,6 +114,12 @@ def _evaluate_document(
             "status": "skipped",
             "message": "Generation skipped because summary_text_override was provided.",
         }
+    elif pregenerated is not None:
+        generated_outputs = pregenerated
+        generation_compute = None
+    elif not config.track_generation_carbon and config.stability_runs > 1:
+        generated_outputs = generate_summaries_concurrently([analysis], config)[0]
+        generation_compute = None
     else:
         generated_outputs = []
         generation_compute = None
@@ -183,6 +194,11 @@ def generate_summary_with_tracking(analysis: Dict[str, Any], config: EvaluationC
     return {"summary_text": text, "compute": None}
 
 
+def _fresh_samples(config: EvaluationConfig) -> bool:
+    # stability runs compare independent samples, so they never read the summary cache
+    return config.stability_runs > 1
+
+
 def _generate_summary(analysis: Dict[str, Any], config: EvaluationConfig) -> str:
     if config.provider == "openai":
         return summarize_with_openai(
@@ -191,8 +207,87 @@ def _generate_summary(analysis: Dict[str, Any], config: EvaluationConfig) -> str
             output_format=config.output_format,
             length=config.length,
             model=config.provider_model,
+            cache=get_default_summary_cache(),
+            fresh=_fresh_samples(config),
+        )
+    return run_llm(
+        analysis,
+        tier=config.tier,
+        output_format=config.output_format,
+        length=config.length,
+        fresh=_fresh_samples(config),
+    )
+
+
+async def _generate_summary_async(analysis: Dict[str, Any], config: EvaluationConfig) -> str:
+    if config.provider == "openai":
+        return await summarize_with_openai_async(
+            analysis,
+            tier=config.tier,
+            output_format=config.output_format,
+            length=config.length,
+            model=config.provider_model,
+            cache=get_default_summary_cache(),
+            fresh=_fresh_samples(config),
         )
-    return run_llm(analysis, tier=config.tier, output_format=config.output_format, length=config.length)
+    return await run_llm_async(
+        analysis,
+        tier=config.tier,
+        output_format=config.output_format,
+        length=config.length,
+        fresh=_fresh_samples(config),
+    )
+
+
+def generate_summaries_concurrently(analyses: List[Dict[str, Any]], config: EvaluationConfig) -> List[List[str]]:
+    """
+    config.stability_runs summaries per analysis, all requested from one event
+    loop (NOISE_SIGNAL_LLM_CONCURRENCY in flight). Only used when generation
+    is not carbon-tracked, since the tracker measures one call at a time.
+    """
+    runs = max(config.stability_runs, 1)
+
+    async def _all() -> List[str]:
+        try:
+            return await asyncio.gather(
+                *(_generate_summary_async(analysis, config) for analysis in analyses for _ in range(runs))
+            )
+        finally:
+            await aclose_async_clients()
+
+    flat = asyncio.run(_all())
+    return [flat[i * runs:(i + 1) * runs] for i in range(len(analyses))]
+
+
+def prefetch_summaries(analyses: List[Dict[str, Any]], configs: List[EvaluationConfig]) -> int:
+    """
+    Generates every config's summary of each analysis in one concurrent pass
+    per article (llm_layer.summarize_many), so the evaluations that follow
+    read them from the summary cache instead of calling the model variant by
+    variant. Configs that need fresh samples (stability_runs > 1) or track
+    generation carbon are left alone, as is everything when the cache is off.
+    Returns the number of summaries now cached.
+    """
+    if get_default_summary_cache() is None:
+        return 0
+    groq: List[SummaryVariant] = []
+    openai: List[SummaryVariant] = []
+    for config in configs:
+        if _fresh_samples(config) or config.track_generation_carbon:
+            continue
+        if config.provider == "openai":
+            model = config.provider_model or get_default_openai_model()
+            openai.append(SummaryVariant(config.tier, config.output_format, config.length, model))
+        else:
+            groq.append(SummaryVariant(config.tier, config.output_format, config.length))
+    done = 0
+    for analysis in analyses:
+        if groq:
+            done += sum(1 for _ in run_llm_many(analysis, groq))
+        if openai:
+            # summarize_with_openai always sends the truncated prompt
+            done += sum(1 for _ in summarize_many(analysis, openai, cache=get_default_summary_cache()))
+    return done
 
 
 def score_summary(
@@ -344,6 +439,15 @@ def _document_from_record(record: Dict[str, Any]) -> Dict[str, Any]:
     return to_document(text=text, title=record.get("title"), url=record.get("url"))
 
 
+def dataset_documents(dataset_path: str) -> List[Dict[str, Any]]:
+    """document:v1 for each dataset record that run_batch_evaluation generates a summary for."""
+    return [
+        _document_from_record(record)
+        for record in _iter_dataset_records(dataset_path)
+        if not (record.get("summary_text") or record.get("summary"))
+    ]
+
+
 def run_batch_evaluation(
     *,
     dataset_path: Optional[str] = None,
@@ -374,6 +478,17 @@ def run_batch_evaluation(
     else:
         raise ValueError("dataset_path or artifact_dir is required for batch evaluation.")
 
+    # without generation carbon tracking, every summary is requested up front from one event loop
+    analyses: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+    pregenerated: List[Optional[List[str]]] = [None] * len(inputs)
+    if not cfg.track_generation_carbon:
+        pending = [index for index, item in enumerate(inputs) if item["summary_text"] is None]
+        for index in pending:
+            analyses[index] = run_nlp(inputs[index]["document"])
+        outputs = generate_summaries_concurrently([analyses[index] for index in pending], cfg) if pending else []
+        for index, generated in zip(pending, outputs):
+            pregenerated[index] = generated
+
     results: List[Dict[str, Any]] = []
     flat_rows: List[Dict[str, Any]] = []
     emission_paths = set()
@@ -385,6 +500,8 @@ def run_batch_evaluation(
             config=run_cfg,
             output_dir=output_dir,
             summary_text_override=item["summary_text"],
+            analysis=analyses[index],
+            pregenerated=pregenerated[index],
         )
         results.append(result)
         flat_rows.append(flatten_result(result))
@@ -113,6 +113,48 @@ async function postJson(path, payload) {
   return data;
 }
 
+// POST that reads an NDJSON event stream, calling onEvent for each event.
+// Resolves with the last event; returns null if the backend has no such route.
+async function postStream(path, payload, onEvent) {
+  let response;
+  try {
+    response = await fetch(`${cleanApiBase()}${path}`, {
+      method: "POST",
+      headers: { ...requestHeaders(true), Accept: "application/x-ndjson" },
+      body: JSON.stringify(payload)
+    });
+  } catch (error) {
+    throw new Error(formatFetchError(error));
+  }
+  if (response.status === 404 || response.status === 405) {
+    return null;
+  }
+  if (!response.ok || !response.body) {
+    const data = await response.json().catch(() => ({}));
+    throw new Error(data.detail || `Request failed with HTTP ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let last = null;
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+    const lines = buffered.split("\n");
+    buffered = done ? "" : lines.pop();
+    for (const line of lines) {
+      if (line.trim()) {
+        last = JSON.parse(line);
+        onEvent(last);
+      }
+    }
+    if (done) {
+      return last;
+    }
+  }
+}
+
 async function getJson(path) {
   let response;
   try {
@@ -195,7 +237,7 @@ async function analyze(mode) {
       throw new Error("The page text looked empty. Try URL only.");
     }
     setStatus("Analyzing with backend...");
-    const result = await postJson("/api/analyze", {
+    const payload = {
       title: basePayload.title,
       url: basePayload.url,
       text: basePayload.text,
@@ -203,7 +245,25 @@ async function analyze(mode) {
       output_format: "text",
       length: els.length.value,
       save: true
+    };
+    let streamed = null;
+    const final = await postStream("/api/analyze/stream", payload, (event) => {
+      if (event.event === "analysis") {
+        streamed = { ...event, summary_text: "" };
+        renderResult(streamed);
+        els.summary.textContent = "";
+        setStatus("Summarizing...");
+      } else if (event.event === "delta" && streamed) {
+        streamed.summary_text += event.text;
+        els.summary.textContent = streamed.summary_text;
+      } else if (event.event === "error") {
+        throw new Error(event.detail || "Analysis failed.");
+      }
     });
+    const result = final ? { ...final, analysis: streamed.analysis } : await postJson("/api/analyze", payload);
+    if (final && final.event !== "done") {
+      throw new Error("The analysis stream ended early.");
+    }
     renderResult(result);
     setStatus("Analysis complete.", "ok");
     await loadHistory();
@@ -1,29 +1,532 @@
 # llm_layer.py
-# analysis:v1 (from nlp_layer) -> final text or HTML via Groq
+# analysis:v1 (from nlp_layer) -> final text or HTML via the configured LLM provider (Groq by default)
 
-from typing import Dict
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import os
-from groq import Groq
+import threading
+import time
 from dotenv import load_dotenv
 
+from utils.llm_clients import ClientSettings, async_semaphore
+from utils.llm_governor import get_governor
+from utils.llm_providers import get_provider
+from utils.llm_telemetry import NOTES_TIER, CallTimer, LLMCall
+
 load_dotenv()  # read .env once on import
 
+# analysis:v1 keys _build_prompt reads (meta is always present), plus the text
+# hash that keys the summary cache. Pass as
+# nlp_layer.analyze_document(fields=PROMPT_FIELDS) to skip the fact extractors.
+PROMPT_FIELDS = ("stats", "sections", "modality", "keywords", "hash")
+
+# Bump whenever _build_prompt or _chat_request changes what is sent, so cached
+# summaries from the old prompt are never returned.
+PROMPT_VERSION = "prompt:1"
+
+# Article text sent in a single-call prompt; anything longer is cut
+# (mode="truncate"), summarized part by part (mode="map_reduce"), or replaced
+# by its highest-value sentences within EXTRACTIVE_TOKENS (mode="extractive",
+# see nlp.compress).
+BODY_CHARS = 4000
+EXTRACTIVE_TOKENS = 600
+SUMMARY_MODES = ("truncate", "map_reduce", "extractive")
+
 # ---------- Public API ----------
 
 def summarize(
     analysis: Dict,
     tier: str = "tier1",            # "tier1" | "tier2"
     output_format: str = "text",    # "text" | "html"
-    length: str = "short"           # "short" | "medium" | "long"
+    length: str = "short",          # "short" | "medium" | "long"
+    *,
+    model: Optional[str] = None,
+    cache: Optional["SummaryCache"] = None,
+    fresh: bool = False,
+    mode: str = "truncate",
+    calls: Optional[List[LLMCall]] = None,
+) -> str:
+    """
+    With `cache`, an identical earlier request (see SummaryCache.key) is
+    answered from the cache; fresh=True always calls the model and refreshes
+    the entry (stability runs need independent samples).
+
+    mode="map_reduce" covers articles longer than BODY_CHARS in full instead
+    of cutting them (see "Long documents" below); mode="extractive" sends
+    the sentences nlp.compress ranks highest, from anywhere in the article.
+
+    Every LLM call made is timed and counted (utils.llm_telemetry); pass a
+    list as `calls` to also get its LLMCall records, e.g. for
+    llm_telemetry.call_summary(). A cache hit adds none.
+    """
+    _validate_analysis(analysis)
+    prompt = _build_prompt(analysis, tier, output_format, length, mode=mode)
+    request = _chat_request(prompt, output_format, model)
+    key = _cache_key(cache, analysis, tier, output_format, length, request, mode)
+    if key is not None and not fresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    if _needs_map_reduce(analysis, mode):
+        request = _map_reduce_request(analysis, tier, output_format, length, model, cache, fresh, calls)
+    text = _run_llm(request, tier, calls)
+    if key is not None:
+        cache.put(key, text, request["model"])
+    return text
+
+
+async def summarize_async(
+    analysis: Dict,
+    tier: str = "tier1",
+    output_format: str = "text",
+    length: str = "short",
+    *,
+    model: Optional[str] = None,
+    timeout: Optional[float] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional["SummaryCache"] = None,
+    fresh: bool = False,
+    mode: str = "truncate",
+    calls: Optional[List[LLMCall]] = None,
 ) -> str:
+    """
+    summarize() for event loops: same prompt and request, sent with the provider's async client.
+
+    At most NOISE_SIGNAL_LLM_CONCURRENCY calls per loop are in flight (pass
+    `semaphore` for a separate limit); the rest wait their turn, so callers
+    can gather() hundreds of articles. `timeout` bounds the wait plus the call
+    and raises asyncio.TimeoutError. Cancelling the task aborts the request
+    and frees its connection. `cache`, `fresh`, `mode` and `calls` work as in
+    summarize(); map_reduce runs its part calls in a worker thread.
+    """
+    _validate_analysis(analysis)
+    prompt = _build_prompt(analysis, tier, output_format, length, mode=mode)
+    request = _chat_request(prompt, output_format, model)
+    key = _cache_key(cache, analysis, tier, output_format, length, request, mode)
+    if key is not None and not fresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    if _needs_map_reduce(analysis, mode):
+        request = await asyncio.to_thread(
+            _map_reduce_request, analysis, tier, output_format, length, model, cache, fresh, calls
+        )
+    call = _run_llm_async(request, semaphore or async_semaphore(), tier, calls)
+    text = await (call if timeout is None else asyncio.wait_for(call, timeout))
+    if key is not None:
+        cache.put(key, text, request["model"])
+    return text
+
+
+def summarize_stream(
+    analysis: Dict,
+    tier: str = "tier1",
+    output_format: str = "text",
+    length: str = "short",
+    *,
+    model: Optional[str] = None,
+    cache: Optional["SummaryCache"] = None,
+    fresh: bool = False,
+    mode: str = "truncate",
+    calls: Optional[List[LLMCall]] = None,
+) -> Iterator[str]:
+    """
+    summarize() as a generator of text deltas, yielded as the model produces
+    them. "".join() of the deltas, stripped, is what summarize() would return;
+    leading whitespace is dropped as it arrives. A cache hit is yielded as a
+    single delta. Closing the generator early aborts the request. In
+    map_reduce mode only the final pass is streamed. The streamed call's
+    LLMCall is added to `calls` once the generator finishes or is closed.
+    """
     _validate_analysis(analysis)
-    prompt = _build_prompt(analysis, tier, output_format, length)
-    return _run_llm(prompt, output_format)
+    prompt = _build_prompt(analysis, tier, output_format, length, mode=mode)
+    request = _chat_request(prompt, output_format, model)
+    key = _cache_key(cache, analysis, tier, output_format, length, request, mode)
+    if key is not None and not fresh:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+    if _needs_map_reduce(analysis, mode):
+        request = _map_reduce_request(analysis, tier, output_format, length, model, cache, fresh, calls)
+    parts = []
+    for delta in _run_llm_stream(request, tier, calls):
+        if not parts:
+            delta = delta.lstrip()
+            if not delta:
+                continue
+        parts.append(delta)
+        yield delta
+    if key is not None:
+        cache.put(key, "".join(parts).strip(), request["model"])
+
+
+class SummaryVariant(NamedTuple):
+    tier: str = "tier1"
+    output_format: str = "text"
+    length: str = "short"
+    model: Optional[str] = None
+
+
+def summarize_many(
+    analysis: Dict,
+    variants: Iterable[Any],
+    *,
+    cache: Optional["SummaryCache"] = None,
+    fresh: bool = False,
+    mode: str = "truncate",
+    calls: Optional[List[LLMCall]] = None,
+) -> Iterator[Tuple[SummaryVariant, str]]:
+    """
+    summarize() for several variants of one article, as (SummaryVariant, text)
+    pairs in the order they finish. A variant is a SummaryVariant, a tuple in
+    its field order, or a dict of its fields; repeats are generated once.
+
+    The analysis is validated and the prompt body (cut text, extractive
+    selection, or map-reduce notes, once per model) is built once. Cache hits
+    are yielded first; the remaining variants are all sent at once, at most
+    NOISE_SIGNAL_LLM_CONCURRENCY in flight, so N variants take about as long
+    as the slowest one. A failed call raises when it would have been yielded.
+    Closing the generator early cancels the calls not yet started. `calls`
+    collects the LLMCall records of every variant.
+    """
+    _validate_analysis(analysis)
+    wanted = list(dict.fromkeys(_variant(v) for v in variants))
+    if not wanted:
+        return
+    map_reduce = _needs_map_reduce(analysis, mode)
+    body = _prompt_body(analysis, mode=mode)
+    pending = []
+    for variant in wanted:
+        tier, output_format, length, model = variant
+        prompt = _build_prompt(analysis, tier, output_format, length, mode=mode, body=body)
+        request = _chat_request(prompt, output_format, model)
+        key = _cache_key(cache, analysis, tier, output_format, length, request, mode)
+        if key is not None and not fresh:
+            cached = cache.get(key)
+            if cached is not None:
+                yield variant, cached
+                continue
+        pending.append((variant, request, key))
+    if not pending:
+        return
+    if map_reduce:
+        notes = {
+            model: _map_reduce_notes(analysis, model, cache, fresh, calls)
+            for model in dict.fromkeys(variant.model for variant, _, _ in pending)
+        }
+        rebuilt = []
+        for variant, _, key in pending:
+            tier, output_format, length, model = variant
+            prompt = _build_prompt(analysis, tier, output_format, length, notes=notes[model])
+            rebuilt.append((variant, _chat_request(prompt, output_format, model), key))
+        pending = rebuilt
+
+    pool = ThreadPoolExecutor(
+        max_workers=min(ClientSettings.from_env().concurrency, len(pending)), thread_name_prefix="llm-variant"
+    )
+    try:
+        futures = {
+            pool.submit(_run_llm, request, variant.tier, calls): (variant, request, key)
+            for variant, request, key in pending
+        }
+        for future in as_completed(futures):
+            variant, request, key = futures[future]
+            text = future.result()
+            if key is not None:
+                cache.put(key, text, request["model"])
+            yield variant, text
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _variant(value: Any) -> SummaryVariant:
+    if isinstance(value, SummaryVariant):
+        return value
+    if isinstance(value, dict):
+        return SummaryVariant(**value)
+    return SummaryVariant(*value)
+
+
+# ---------- Summary cache ----------
+
+class SummaryCache:
+    """
+    Generated summaries keyed on (PROMPT_VERSION, analysis hash, a hash of
+    the request's messages, tier, output_format, length, model, temperature).
+    The messages hash covers everything the prompt carries besides the text:
+    title, URL, stats and keywords, which the TF-IDF index re-ranks over
+    time, so a changed prompt is never answered from the cache. The analysis
+    hash adds the full text, which map-reduce summarizes beyond the cut the
+    prompt shows (an analysis without one, fields=... excluding "hash",
+    relies on the messages hash alone). Map-reduce summaries carry a
+    `variant` suffix, and the per-part notes they are built from are cached
+    under chunk_key().
+
+    Any utils.cache backend works; size and TTL limits are the backend's.
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            from utils.cache import MemoryLRUCache
+            backend = MemoryLRUCache()
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def sqlite(
+        cls, path: str, max_bytes: int = 64 * 1024 * 1024, ttl_s: Optional[float] = None
+    ) -> "SummaryCache":
+        from utils.cache import SQLiteCache
+        return cls(SQLiteCache(path, table="summary_cache", namespace=PROMPT_VERSION, max_bytes=max_bytes, ttl_s=ttl_s))
+
+    @staticmethod
+    def key(
+        analysis: Dict,
+        tier: str,
+        output_format: str,
+        length: str,
+        request: Dict[str, Any],
+        variant: str = "",
+    ) -> str:
+        messages = json.dumps(request["messages"], sort_keys=True, ensure_ascii=False)
+        parts = [
+            PROMPT_VERSION,
+            analysis.get("hash") or "-",
+            "prompt:" + hashlib.sha256(messages.encode("utf-8")).hexdigest(),
+            tier,
+            output_format,
+            length,
+            request["model"],
+            str(request["temperature"]),
+        ]
+        return "|".join(parts + [variant] if variant else parts)
+
+    @staticmethod
+    def chunk_key(request: Dict[str, Any]) -> str:
+        # a note depends only on its request: the part's text, model and settings
+        digest = hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return f"{NOTES_VERSION}|{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        raw = self.backend.get(key)
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)["text"]
+
+    def put(self, key: str, text: str, model: str) -> None:
+        entry = {"text": text, "model": model, "created_at": time.time()}
+        self.backend.set(key, json.dumps(entry, ensure_ascii=False))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "version": PROMPT_VERSION,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            **self.backend.stats(),
+        }
+
+
+_default_summary_cache: Optional[SummaryCache] = None
+_default_summary_cache_ready = False
+_default_summary_cache_lock = threading.Lock()
+
+
+def get_default_summary_cache() -> Optional[SummaryCache]:
+    """
+    Process-wide cache configured by NOISE_SIGNAL_SUMMARY_CACHE:
+      unset / "memory"  in-memory LRU (NOISE_SIGNAL_SUMMARY_CACHE_SIZE entries, default 512)
+      "off"             no caching
+      anything else     path to a SQLite file shared by every process on the host
+    Entries expire after NOISE_SIGNAL_SUMMARY_CACHE_TTL_S seconds (default 86400; 0 = never).
+    """
+    global _default_summary_cache, _default_summary_cache_ready
+    with _default_summary_cache_lock:
+        if _default_summary_cache_ready:
+            return _default_summary_cache
+        setting = (os.getenv("NOISE_SIGNAL_SUMMARY_CACHE") or "memory").strip()
+        ttl_s = float(os.getenv("NOISE_SIGNAL_SUMMARY_CACHE_TTL_S") or 86400) or None
+        if setting.lower() == "off":
+            _default_summary_cache = None
+        elif setting.lower() == "memory":
+            from utils.cache import MemoryLRUCache
+            size = int(os.getenv("NOISE_SIGNAL_SUMMARY_CACHE_SIZE") or 512)
+            _default_summary_cache = SummaryCache(MemoryLRUCache(max_entries=size, ttl_s=ttl_s))
+        else:
+            _default_summary_cache = SummaryCache.sqlite(setting, ttl_s=ttl_s)
+        _default_summary_cache_ready = True
+        return _default_summary_cache
+
+
+# ---------- Long documents: map-reduce ----------
+#
+# The article is cut into parts of at most CHUNK_CHARS along analysis
+# sections. Each part is condensed into notes (the map calls, run in parallel
+# with at most NOISE_SIGNAL_LLM_CONCURRENCY in flight and cached by part),
+# and the usual prompt is then built over the notes instead of the text (the
+# reduce call). Notes too long for one prompt are condensed again in groups,
+# so a 50-page filing costs two or three rounds of parallel calls.
+
+CHUNK_CHARS = 12000         # article text per map call
+NOTES_CHARS = 16000         # notes per reduce call
+NOTES_MAX_TOKENS = 300
+NOTES_VERSION = "notes:1"   # bump when _notes_request changes
+
+
+def _article_text(analysis: Dict) -> str:
+    return " ".join(s.get("text", "") for s in analysis.get("sections") or [])
+
+
+def _estimate_tokens(text: str) -> int:
+    from nlp_layer import _estimate_tokens as estimate
+    return estimate(text)
+
+
+def _needs_map_reduce(analysis: Dict, mode: str) -> bool:
+    if mode not in SUMMARY_MODES:
+        raise ValueError(f"mode must be one of {SUMMARY_MODES}")
+    return mode == "map_reduce" and len(_article_text(analysis)) > BODY_CHARS
+
+
+def _cache_key(
+    cache: Optional["SummaryCache"],
+    analysis: Dict,
+    tier: str,
+    output_format: str,
+    length: str,
+    request: Dict[str, Any],
+    mode: str,
+) -> Optional[str]:
+    if cache is None:
+        return None
+    # short articles get the same prompt in every mode, so they share an entry
+    if _needs_map_reduce(analysis, mode):
+        variant = f"map_reduce:{NOTES_VERSION}:{CHUNK_CHARS}"
+    elif mode == "extractive" and _estimate_tokens(_article_text(analysis)) > EXTRACTIVE_TOKENS:
+        from nlp.compress import COMPRESS_VERSION
+        variant = f"{COMPRESS_VERSION}:{EXTRACTIVE_TOKENS}"
+    else:
+        variant = ""
+    return SummaryCache.key(analysis, tier, output_format, length, request, variant)
+
+
+def _pack(pieces: List[str], max_chars: int, sep: str = " ") -> List[str]:
+    """Joins consecutive pieces into groups of at most max_chars; longer pieces are split at spaces."""
+    groups: List[str] = []
+    current = ""
+    for piece in pieces:
+        while len(piece) > max_chars:
+            cut = piece.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            head, piece = piece[:cut], piece[cut:].lstrip()
+            if current:
+                groups.append(current)
+                current = ""
+            groups.append(head)
+        if not piece:
+            continue
+        if current and len(current) + len(sep) + len(piece) > max_chars:
+            groups.append(current)
+            current = ""
+        current = f"{current}{sep}{piece}" if current else piece
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _notes_request(text: str, model: Optional[str]) -> Dict[str, Any]:
+    prompt = (
+        "You are condensing one part of a long article so the whole article can be summarized later.\n"
+        "Write ≈120 words of plain notes on this part: the events, claims, numbers, dates, and the "
+        "people and organizations involved. Use only what the text says.\n\n"
+        f"TEXT:\n{text}\n"
+    )
+    request = _chat_request(prompt, "text", model)
+    request["max_tokens"] = NOTES_MAX_TOKENS
+    return request
+
+
+def _notes(
+    text: str,
+    model: Optional[str],
+    cache: Optional["SummaryCache"],
+    fresh: bool,
+    calls: Optional[List[LLMCall]] = None,
+) -> str:
+    request = _notes_request(text, model)
+    key = SummaryCache.chunk_key(request) if cache is not None else None
+    if key is not None and not fresh:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    note = _run_llm(request, NOTES_TIER, calls)
+    if key is not None:
+        cache.put(key, note, request["model"])
+    return note
+
+
+def _map_reduce_request(
+    analysis: Dict,
+    tier: str,
+    output_format: str,
+    length: str,
+    model: Optional[str],
+    cache: Optional["SummaryCache"],
+    fresh: bool,
+    calls: Optional[List[LLMCall]] = None,
+) -> Dict[str, Any]:
+    """Runs the map rounds and returns the reduce request."""
+    notes = _map_reduce_notes(analysis, model, cache, fresh, calls)
+    prompt = _build_prompt(analysis, tier, output_format, length, notes=notes)
+    return _chat_request(prompt, output_format, model)
+
+
+def _map_reduce_notes(
+    analysis: Dict,
+    model: Optional[str],
+    cache: Optional["SummaryCache"],
+    fresh: bool,
+    calls: Optional[List[LLMCall]] = None,
+) -> List[str]:
+    parts = _pack([s.get("text", "") for s in analysis.get("sections") or []], CHUNK_CHARS)
+    workers = min(ClientSettings.from_env().concurrency, len(parts))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-map") as pool:
+        notes = list(pool.map(lambda part: _notes(part, model, cache, fresh, calls), parts))
+        while len(notes) > 1 and sum(len(n) + 2 for n in notes) > NOTES_CHARS:
+            groups = _pack(notes, NOTES_CHARS, sep="\n\n")
+            if len(groups) >= len(notes):
+                break
+            notes = list(pool.map(lambda group: _notes(group, model, cache, fresh, calls), groups))
+    return notes
 
 
 # ---------- Internal: prompt ----------
 
-def _build_prompt(analysis: Dict, tier: str, output_format: str, length: str) -> str:
+def _build_prompt(
+    analysis: Dict,
+    tier: str,
+    output_format: str,
+    length: str,
+    notes: Optional[List[str]] = None,
+    mode: str = "truncate",
+    body: Optional[str] = None,
+) -> str:
+    """
+    `notes` replaces the article text with per-part notes (map-reduce mode);
+    `body` is an already built _prompt_body() for the same analysis and mode.
+    """
     meta = analysis.get("meta") or {}
     stats = analysis.get("stats") or {}
     sections = analysis.get("sections") or []
@@ -33,8 +536,8 @@ def _build_prompt(analysis: Dict, tier: str, output_format: str, length: str) ->
     stance = (analysis.get("modality") or {}).get("stance_index")
     keywords = ", ".join((analysis.get("keywords") or [])[:10])
 
-    # pack a compact context body
-    body = " ".join(s.get("text", "") for s in sections)[:4000]
+    if body is None or notes is not None:
+        body = _prompt_body(analysis, notes, mode)
 
     len_map = {"short": "≈120 words", "medium": "≈220 words", "long": "≈350 words"}
     length_hint = len_map.get(length, "≈150 words")
@@ -65,21 +568,31 @@ def _build_prompt(analysis: Dict, tier: str, output_format: str, length: str) ->
         f"Write {length_hint}. {output_instr}\n"
         "Be specific and neutral. If uncertain, say so."
     )
+    if notes is not None:
+        instructions += (
+            "\nTEXT holds notes on consecutive parts of one long article, in order. "
+            "Summarize the whole article, not each part."
+        )
 
     return f"{instructions}\n\nCONTEXT:\n{header}\n\nTEXT:\n{body}\n"
 
 
-# ---------- Internal: Groq call ----------
+def _prompt_body(analysis: Dict, notes: Optional[List[str]] = None, mode: str = "truncate") -> str:
+    # pack a compact context body
+    if notes is not None:
+        return "\n\n".join(f"PART {i}: {note}" for i, note in enumerate(notes, 1))
+    if mode == "extractive":
+        from nlp.compress import select
+        return select(analysis, EXTRACTIVE_TOKENS)["text"]
+    return _article_text(analysis)[:BODY_CHARS]
+
 
-def _run_llm(prompt: str, output_format: str) -> str:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("GROQ_API_KEY missing in environment.")
+# ---------- Internal: provider call ----------
 
-    # Choose a current, supported model (override via GROQ_MODEL if you want)
-    model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+def _chat_request(prompt: str, output_format: str, model: Optional[str] = None) -> Dict[str, Any]:
+    # the provider's default model (GROQ_MODEL, or NOISE_SIGNAL_LLM_MODEL for OpenAI-compatible endpoints)
+    model = model or get_provider().default_model
 
-    client = Groq(api_key=api_key)
     system_msg = (
         "You are a precise news explainer. Return ONLY the final output. "
         "No JSON, no code fences."
@@ -89,16 +602,78 @@ def _run_llm(prompt: str, output_format: str) -> str:
         )
     )
 
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
+    return {
+        "model": model,
+        "messages": [
             {"role": "system", "content": system_msg},
             {"role": "user", "content": prompt},
         ],
-        temperature=0.2,
-        max_tokens=800,
+        "temperature": 0.2,
+        "max_tokens": 800,
+    }
+
+
+def _run_llm(request: Dict[str, Any], tier: Optional[str] = None, calls: Optional[List[LLMCall]] = None) -> str:
+    # NOISE_SIGNAL_LLM_PROVIDER's pooled client (Groq raises if GROQ_API_KEY is unset);
+    # the governor applies rate limits, retries and the circuit breaker
+    provider = get_provider()
+    timer = CallTimer(provider.name, tier)
+    completion = get_governor(provider.name).call(timer.attempt(lambda: provider.complete(request)), request)
+    _record(timer, completion.model or request["model"], completion, calls)
+    return completion.text.strip()
+
+
+def _run_llm_stream(
+    request: Dict[str, Any], tier: Optional[str] = None, calls: Optional[List[LLMCall]] = None
+) -> Iterator[str]:
+    provider = get_provider()
+    timer = CallTimer(provider.name, tier)
+    # retried until the response starts; the governor slot is held until the stream ends,
+    # and an error while reading it reaches the breaker and the limit
+    governed = get_governor(provider.name).stream(timer.attempt(lambda: provider.open_stream(request)), request)
+    with governed as stream:
+        try:
+            for delta in stream:
+                timer.token()
+                yield delta
+        finally:
+            stream.close()  # frees the pooled connection if the caller stops early
+            usage = stream.usage
+            _record(timer, (usage.model if usage else "") or request["model"], usage, calls, streamed=True)
+
+
+async def _run_llm_async(
+    request: Dict[str, Any],
+    semaphore: asyncio.Semaphore,
+    tier: Optional[str] = None,
+    calls: Optional[List[LLMCall]] = None,
+) -> str:
+    provider = get_provider()
+    timer = CallTimer(provider.name, tier)  # waiting for the semaphore counts as queue wait
+    async with semaphore:
+        completion = await get_governor(provider.name).call_async(
+            timer.attempt(lambda: provider.complete_async(request)), request
+        )
+    _record(timer, completion.model or request["model"], completion, calls)
+    return completion.text.strip()
+
+
+def _record(
+    timer: CallTimer,
+    model: str,
+    usage: Any,
+    calls: Optional[List[LLMCall]],
+    streamed: bool = False,
+) -> None:
+    # usage: the Completion, or a stream's usage (None if the provider sent none)
+    call = timer.finish(
+        model,
+        getattr(usage, "prompt_tokens", None),
+        getattr(usage, "completion_tokens", None),
+        streamed=streamed,
     )
-    return resp.choices[0].message.content.strip()
+    if calls is not None:
+        calls.append(call)
 
 
 # ---------- Internal: minimal validation ----------
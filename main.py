@@ -18,13 +18,63 @@ def build_document_from_text(txt: str) -> dict:
     from adapter_input import to_document
     return to_document(text=txt, title=None, url=None)   # document:v1
 
-def run_nlp(document: dict) -> dict:
-    from nlp_layer import analyze_document
-    return analyze_document(document)                    # analysis:v1
+def run_nlp(document: dict, fields=None) -> dict:
+    from nlp_layer import analyze_document, get_default_cache
+    from nlp.tfidf import apply_keywords, get_default_index
+    analysis = analyze_document(document, cache=get_default_cache(), fields=fields)  # analysis:v1
+    index = get_default_index()
+    if index is not None and "keywords" in analysis and "sections" in analysis:
+        apply_keywords(analysis, index)
+    return analysis
 
-def run_llm(analysis: dict, tier: str, output_format: str, length: str) -> str:
-    from llm_layer import summarize
-    return summarize(analysis, tier=tier, output_format=output_format, length=length)
+def run_nlp_incremental(document: dict) -> dict:
+    # paragraph-memoized analysis for documents that are re-submitted as they update
+    from nlp.incremental import get_default_analyzer
+    from nlp.tfidf import apply_keywords, get_default_index
+    analysis = get_default_analyzer().analyze(document)  # analysis:v1
+    index = get_default_index()
+    return apply_keywords(analysis, index) if index is not None else analysis
+
+def run_nlp_stream(chunks, meta=None):
+    # bounded-memory analysis of very large texts: yields section events, then the analysis
+    from nlp.streaming import analyze_stream
+    return analyze_stream(chunks, meta)
+
+def _summary_mode() -> str:
+    # "truncate" (default), "map_reduce" or "extractive"; see llm_layer.SUMMARY_MODES
+    return (os.getenv("NOISE_SIGNAL_SUMMARY_MODE") or "truncate").strip().lower()
+
+def run_llm(analysis: dict, tier: str, output_format: str, length: str, fresh: bool = False) -> str:
+    # fresh=True skips the summary cache lookup (the new summary still replaces the entry)
+    from llm_layer import get_default_summary_cache, summarize
+    return summarize(
+        analysis, tier=tier, output_format=output_format, length=length,
+        cache=get_default_summary_cache(), fresh=fresh, mode=_summary_mode(),
+    )
+
+def run_llm_stream(analysis: dict, tier: str, output_format: str, length: str, fresh: bool = False, calls=None):
+    # generator of summary text deltas; same prompt and cache as run_llm.
+    # calls: optional list that receives the LLMCall telemetry records
+    from llm_layer import get_default_summary_cache, summarize_stream
+    return summarize_stream(
+        analysis, tier=tier, output_format=output_format, length=length,
+        cache=get_default_summary_cache(), fresh=fresh, mode=_summary_mode(), calls=calls,
+    )
+
+async def run_llm_async(analysis: dict, tier: str, output_format: str, length: str, model=None, fresh: bool = False) -> str:
+    # non-blocking summarize() for event loops; concurrency capped by NOISE_SIGNAL_LLM_CONCURRENCY
+    from llm_layer import get_default_summary_cache, summarize_async
+    return await summarize_async(
+        analysis, tier=tier, output_format=output_format, length=length, model=model,
+        cache=get_default_summary_cache(), fresh=fresh, mode=_summary_mode(),
+    )
+
+def run_llm_many(analysis: dict, variants, fresh: bool = False):
+    # (SummaryVariant, text) pairs as each variant finishes; one shared prompt body, calls sent concurrently
+    from llm_layer import get_default_summary_cache, summarize_many
+    return summarize_many(
+        analysis, variants, cache=get_default_summary_cache(), fresh=fresh, mode=_summary_mode(),
+    )
 
 def save_json(obj: dict, path: str):
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -0,0 +1,410 @@
+"""Compact in-memory form of analysis:v1.
+
+An analysis:v1 dict is a tree of small dicts and lists: a 10k-word article
+carries dozens of section and quote dicts, each with its own hash table. Code
+that keeps thousands of analyses alive (batch evaluation, caches, the
+Streamlit app) pays more for that structure than for the text itself.
+
+CompactAnalysis keeps the same data in slotted objects:
+
+  * section texts in one string, with word counts, spans and token estimates
+    in array columns;
+  * quotes as a tuple of texts plus a flat span array;
+  * facts, keywords and modality terms as tuples.
+
+`CompactAnalysis.from_dict(a).to_dict() == a` for any analysis:v1, partial
+(fields=...) results included. Fields that do not have the canonical shape
+are kept as given. to_msgpack()/from_msgpack() give a binary form of the
+compact columns; msgpack is optional and only imported there.
+
+Nothing in the API or the pipeline uses it yet; it is measured by the
+benchmark below and is not shipped in the API image.
+
+    python scripts/benchmark_analysis_memory.py --docs 2000
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+FORMAT_VERSION = 1
+
+META_KEYS = ("title", "url", "source_created_at", "analyzed_at")
+STATS_KEYS = ("chars", "words", "lines", "reading_minutes")
+SECTION_KEYS = ("heading", "text", "word_count")
+SECTION_KEYS_SPANS = SECTION_KEYS + ("char_span", "tokens")
+QUOTE_KEYS = ("text", "speaker", "char_span")
+FACT_LISTS = ("dates", "money", "percents", "numbers", "tickers")
+ENTITY_LABELS = ("ORG", "PERSON", "GPE")
+MODALITY_KEYS = ("hedges", "commit", "stance_index")
+
+
+class MsgpackUnavailableError(RuntimeError):
+    pass
+
+
+def _ints(values, typecode: str = "q") -> array:
+    return array(typecode, values)
+
+
+def _le_bytes(arr: array) -> bytes:
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _opt_tuple(values: Optional[List[Any]]) -> Optional[Tuple[Any, ...]]:
+    return tuple(values) if values is not None else None
+
+
+def _str_tuple(values: Any) -> Optional[Tuple[str, ...]]:
+    # fact values and keywords repeat across articles; interning shares one copy
+    if isinstance(values, list) and all(isinstance(v, str) for v in values):
+        return tuple(map(sys.intern, values))
+    return None
+
+
+@dataclass(slots=True)
+class CompactSections:
+    blob: str  # section texts back to back
+    ends: array  # cumulative end offsets into blob
+    word_counts: array
+    headings: Optional[Tuple[Optional[str], ...]]  # None when every heading is None
+    spans: Optional[array]  # flat (start, end) pairs; None for sections without char_span
+    tokens: Optional[array]
+
+    @classmethod
+    def from_list(cls, sections: Any) -> Optional["CompactSections"]:
+        if not isinstance(sections, list):
+            return None
+        with_spans = bool(sections) and tuple(sections[0]) == SECTION_KEYS_SPANS
+        keys = SECTION_KEYS_SPANS if with_spans else SECTION_KEYS
+        texts: List[str] = []
+        headings: List[Optional[str]] = []
+        counts: List[int] = []
+        spans: List[int] = []
+        tokens: List[int] = []
+        for s in sections:
+            if not isinstance(s, dict) or tuple(s) != keys:
+                return None
+            text, heading, count = s["text"], s["heading"], s["word_count"]
+            if not isinstance(text, str) or not (heading is None or isinstance(heading, str)) or type(count) is not int:
+                return None
+            texts.append(text)
+            headings.append(heading)
+            counts.append(count)
+            if with_spans:
+                span, n_tokens = s["char_span"], s["tokens"]
+                if not (isinstance(span, list) and len(span) == 2 and all(type(v) is int for v in span)) or type(n_tokens) is not int:
+                    return None
+                spans += span
+                tokens.append(n_tokens)
+        ends, pos = [], 0
+        for text in texts:
+            pos += len(text)
+            ends.append(pos)
+        return cls(
+            blob="".join(texts),
+            ends=_ints(ends),
+            word_counts=_ints(counts),
+            headings=None if all(h is None for h in headings) else tuple(headings),
+            spans=_ints(spans) if with_spans else None,
+            tokens=_ints(tokens) if with_spans else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def text(self, i: int) -> str:
+        return self.blob[self.ends[i - 1] if i else 0:self.ends[i]]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        out = []
+        start = 0
+        blob, headings, spans, tokens = self.blob, self.headings, self.spans, self.tokens
+        for i, end in enumerate(self.ends):
+            section = {
+                "heading": headings[i] if headings is not None else None,
+                "text": blob[start:end],
+                "word_count": self.word_counts[i],
+            }
+            if spans is not None:
+                section["char_span"] = [spans[2 * i], spans[2 * i + 1]]
+                section["tokens"] = tokens[i]
+            out.append(section)
+            start = end
+        return out
+
+
+@dataclass(slots=True)
+class CompactQuotes:
+    texts: Tuple[str, ...]
+    spans: array  # flat (start, end) pairs
+    speakers: Optional[Tuple[Optional[str], ...]]  # None when every speaker is None
+
+    @classmethod
+    def from_list(cls, quotes: Any) -> Optional["CompactQuotes"]:
+        if not isinstance(quotes, list):
+            return None
+        texts, speakers, spans = [], [], []
+        for q in quotes:
+            if not isinstance(q, dict) or tuple(q) != QUOTE_KEYS:
+                return None
+            span = q["char_span"]
+            if not isinstance(q["text"], str) or not (isinstance(span, list) and len(span) == 2 and all(type(v) is int for v in span)):
+                return None
+            if not (q["speaker"] is None or isinstance(q["speaker"], str)):
+                return None
+            texts.append(q["text"])
+            speakers.append(q["speaker"])
+            spans += span
+        return cls(
+            texts=tuple(texts),
+            spans=_ints(spans),
+            speakers=None if all(s is None for s in speakers) else tuple(speakers),
+        )
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        spans, speakers = self.spans, self.speakers
+        return [
+            {
+                "text": text,
+                "speaker": speakers[i] if speakers is not None else None,
+                "char_span": [spans[2 * i], spans[2 * i + 1]],
+            }
+            for i, text in enumerate(self.texts)
+        ]
+
+
+@dataclass(slots=True)
+class CompactFacts:
+    keys: Tuple[str, ...]  # facts keys present, in order
+    lists: Tuple[Optional[Tuple[str, ...]], ...]  # FACT_LISTS order; None when absent
+    entities: Optional[Tuple[Tuple[str, ...], ...]]  # ENTITY_LABELS order
+
+    @classmethod
+    def from_dict(cls, facts: Any) -> Optional["CompactFacts"]:
+        if not isinstance(facts, dict) or any(k not in FACT_LISTS and k != "entities" for k in facts):
+            return None
+        lists = []
+        for key in FACT_LISTS:
+            if key in facts:
+                values = _str_tuple(facts[key])
+                if values is None:
+                    return None
+                lists.append(values)
+            else:
+                lists.append(None)
+        entities = None
+        if "entities" in facts:
+            ents = facts["entities"]
+            if not isinstance(ents, dict) or tuple(ents) != ENTITY_LABELS:
+                return None
+            entities = tuple(_str_tuple(ents[label]) for label in ENTITY_LABELS)
+            if any(e is None for e in entities):
+                return None
+        return cls(keys=tuple(facts), lists=tuple(lists), entities=entities)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for key in self.keys:
+            if key == "entities":
+                out[key] = {label: list(spans) for label, spans in zip(ENTITY_LABELS, self.entities)}
+            else:
+                out[key] = list(self.lists[FACT_LISTS.index(key)])
+        return out
+
+
+def _compact_modality(modality: Any) -> Optional[Tuple[Any, ...]]:
+    # -> (hedge terms, hedge counts, commit terms, commit counts, stance_index)
+    if not isinstance(modality, dict) or tuple(modality) != MODALITY_KEYS:
+        return None
+    out: List[Any] = []
+    for key in ("hedges", "commit"):
+        terms, counts = [], []
+        for item in modality[key]:
+            if not isinstance(item, dict) or tuple(item) != ("term", "count") or type(item["count"]) is not int:
+                return None
+            terms.append(item["term"])
+            counts.append(item["count"])
+        out += [tuple(terms), tuple(counts)]
+    out.append(modality["stance_index"])
+    return tuple(out)
+
+
+def _expand_modality(m: Tuple[Any, ...]) -> Dict[str, Any]:
+    return {
+        "hedges": [{"term": t, "count": c} for t, c in zip(m[0], m[1])],
+        "commit": [{"term": t, "count": c} for t, c in zip(m[2], m[3])],
+        "stance_index": m[4],
+    }
+
+
+def _keyed_tuple(value: Any, keys: Tuple[str, ...]) -> Optional[Tuple[Any, ...]]:
+    if isinstance(value, dict) and tuple(value) == keys:
+        return tuple(value[k] for k in keys)
+    return None
+
+
+@dataclass(slots=True)
+class CompactAnalysis:
+    keys: Tuple[str, ...]  # top-level keys present, in order
+    schema: Optional[str] = None
+    meta: Optional[Tuple[Any, ...]] = None  # META_KEYS order
+    stats: Optional[Tuple[Any, ...]] = None  # STATS_KEYS order
+    sections: Optional[CompactSections] = None
+    facts: Optional[CompactFacts] = None
+    quotes: Optional[CompactQuotes] = None
+    modality: Optional[Tuple[Any, ...]] = None
+    keywords: Optional[Tuple[str, ...]] = None
+    hash: Optional[str] = None
+    version: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None  # non-canonical or unknown keys, as given
+
+    @classmethod
+    def from_dict(cls, analysis: Dict[str, Any]) -> "CompactAnalysis":
+        obj = cls(keys=tuple(analysis))
+        extra: Dict[str, Any] = {}
+        converters = {
+            "meta": lambda v: _keyed_tuple(v, META_KEYS),
+            "stats": lambda v: _keyed_tuple(v, STATS_KEYS),
+            "sections": CompactSections.from_list,
+            "facts": CompactFacts.from_dict,
+            "quotes": CompactQuotes.from_list,
+            "modality": _compact_modality,
+            "keywords": _str_tuple,
+        }
+        for key, value in analysis.items():
+            if key in converters:
+                compact = converters[key](value)
+            elif key in ("schema", "hash", "version") and isinstance(value, str):
+                compact = value
+            else:
+                compact = None
+            if compact is None:
+                extra[key] = value
+            else:
+                setattr(obj, key, compact)
+        obj.extra = extra or None
+        return obj
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        extra = self.extra or {}
+        for key in self.keys:
+            if key in extra:
+                out[key] = extra[key]
+            elif key == "meta":
+                out[key] = dict(zip(META_KEYS, self.meta))
+            elif key == "stats":
+                out[key] = dict(zip(STATS_KEYS, self.stats))
+            elif key == "sections":
+                out[key] = self.sections.to_list()
+            elif key == "facts":
+                out[key] = self.facts.to_dict()
+            elif key == "quotes":
+                out[key] = self.quotes.to_list()
+            elif key == "modality":
+                out[key] = _expand_modality(self.modality)
+            elif key == "keywords":
+                out[key] = list(self.keywords)
+            else:
+                out[key] = getattr(self, key)
+        return out
+
+    # ---------- binary ----------
+
+    def _columns(self) -> List[Any]:
+        s, q, f = self.sections, self.quotes, self.facts
+        return [
+            FORMAT_VERSION,
+            list(self.keys),
+            self.schema,
+            list(self.meta) if self.meta is not None else None,
+            list(self.stats) if self.stats is not None else None,
+            None if s is None else [
+                s.blob,
+                _le_bytes(s.ends),
+                _le_bytes(s.word_counts),
+                list(s.headings) if s.headings is not None else None,
+                _le_bytes(s.spans) if s.spans is not None else None,
+                _le_bytes(s.tokens) if s.tokens is not None else None,
+            ],
+            None if f is None else [
+                list(f.keys),
+                [list(v) if v is not None else None for v in f.lists],
+                [list(v) for v in f.entities] if f.entities is not None else None,
+            ],
+            None if q is None else [
+                list(q.texts),
+                _le_bytes(q.spans),
+                list(q.speakers) if q.speakers is not None else None,
+            ],
+            [list(v) if isinstance(v, tuple) else v for v in self.modality] if self.modality is not None else None,
+            list(self.keywords) if self.keywords is not None else None,
+            self.hash,
+            self.version,
+            self.extra,
+        ]
+
+    @classmethod
+    def _from_columns(cls, cols: List[Any]) -> "CompactAnalysis":
+        if cols[0] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact analysis format: {cols[0]!r}")
+        _, keys, schema, meta, stats, s, f, q, modality, keywords, hash_, version, extra = cols
+        return cls(
+            keys=tuple(keys),
+            schema=schema,
+            meta=_opt_tuple(meta),
+            stats=_opt_tuple(stats),
+            sections=None if s is None else CompactSections(
+                blob=s[0],
+                ends=_from_le("q", s[1]),
+                word_counts=_from_le("q", s[2]),
+                headings=_opt_tuple(s[3]),
+                spans=_from_le("q", s[4]) if s[4] is not None else None,
+                tokens=_from_le("q", s[5]) if s[5] is not None else None,
+            ),
+            facts=None if f is None else CompactFacts(
+                keys=tuple(f[0]),
+                lists=tuple(_opt_tuple(v) for v in f[1]),
+                entities=tuple(tuple(v) for v in f[2]) if f[2] is not None else None,
+            ),
+            quotes=None if q is None else CompactQuotes(
+                texts=tuple(q[0]),
+                spans=_from_le("q", q[1]),
+                speakers=_opt_tuple(q[2]),
+            ),
+            modality=tuple(tuple(v) if isinstance(v, list) else v for v in modality) if modality is not None else None,
+            keywords=_opt_tuple(keywords),
+            hash=hash_,
+            version=version,
+            extra=extra,
+        )
+
+    def to_msgpack(self) -> bytes:
+        return _msgpack().packb(self._columns(), use_bin_type=True)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "CompactAnalysis":
+        return cls._from_columns(_msgpack().unpackb(data, raw=False))
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except Exception as exc:
+        raise MsgpackUnavailableError("msgpack is not installed. Install it with `pip install msgpack`.") from exc
+    return msgpack
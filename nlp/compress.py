@@ -0,0 +1,131 @@
+"""Extractive context selection for the summary prompt.
+
+llm_layer used to send the first BODY_CHARS characters of an article, so the
+prompt paid for the lede's filler and never saw the back half. select() ranks
+every sentence of analysis:v1 by what the analysis already found in it and
+packs the best ones, in article order, into a token budget:
+
+  * keywords: analysis["keywords"] terms in the sentence;
+  * numbers: money, percentages and dates weigh more than bare numbers;
+  * entities: facts.entities names when the analysis has facts (they are
+    skipped by fields=llm_layer.PROMPT_FIELDS), capitalized spans otherwise;
+  * modality: the commitment and hedge terms analysis["modality"] counted;
+  * position: a small bonus for the opening sentences, which carry the news.
+
+Scores are divided by sqrt(words) so a long sentence must earn its tokens.
+Repeated sentences count once. CPU only, no model calls.
+
+    python scripts/benchmark_prompt_compression.py --corpus data/articles_raw.jsonl
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Set, Tuple
+
+import nlp_layer
+from nlp_layer import RE_DATE, RE_MONEY, RE_NUMBER, RE_PERCENT, RE_SENTENCE_BREAK
+
+COMPRESS_VERSION = "extractive:1"
+DEFAULT_BUDGET_TOKENS = 600
+
+WEIGHTS = {
+    "keyword": 1.0,
+    "money": 2.0,
+    "percent": 2.0,
+    "date": 1.5,
+    "number": 0.5,
+    "entity": 1.5,
+    "commit": 0.5,
+    "hedge": 0.25,
+}
+LEAD_SENTENCES = 3
+LEAD_BONUS = 1.5
+
+
+def _sentences(analysis: Dict[str, Any]) -> List[str]:
+    out: List[str] = []
+    for section in analysis.get("sections") or []:
+        out.extend(s for s in RE_SENTENCE_BREAK.split(section.get("text") or "") if s.strip())
+    return out
+
+
+def _entity_names(analysis: Dict[str, Any]) -> List[str]:
+    entities = (analysis.get("facts") or {}).get("entities") or {}
+    return sorted({name for values in entities.values() for name in values if len(name) > 2})
+
+
+def _terms(analysis: Dict[str, Any], key: str) -> Set[str]:
+    return {t["term"] for t in (analysis.get("modality") or {}).get(key) or [] if isinstance(t, dict)}
+
+
+def _score(sentence: str, index: int, ctx: Dict[str, Any]) -> float:
+    words = [w.lower().strip(".,;:!?\"'()[]") for w in sentence.split()]
+    w = WEIGHTS
+    score = w["keyword"] * sum(1 for t in words if t in ctx["keywords"])
+    money = len(RE_MONEY.findall(sentence))
+    percent = len(RE_PERCENT.findall(sentence))
+    score += w["money"] * money + w["percent"] * percent + w["date"] * len(RE_DATE.findall(sentence))
+    score += w["number"] * max(len(RE_NUMBER.findall(sentence)) - money - percent, 0)
+    if ctx["entities"] is not None:
+        score += w["entity"] * sum(1 for name in ctx["entities"] if name in sentence)
+    else:
+        score += w["entity"] * 0.5 * len(nlp_layer.RE_ENTITY_SPAN.findall(sentence, 1))
+    score += w["commit"] * sum(1 for t in words if t in ctx["commit"])
+    score += w["hedge"] * sum(1 for t in words if t in ctx["hedges"])
+    if index < LEAD_SENTENCES:
+        score += LEAD_BONUS * (LEAD_SENTENCES - index) / LEAD_SENTENCES
+    return score / math.sqrt(max(len(words), 1))
+
+
+def select(analysis: Dict[str, Any], budget_tokens: int = DEFAULT_BUDGET_TOKENS) -> Dict[str, Any]:
+    """
+    {"text", "tokens", "source_tokens", "sentences", "source_sentences"}:
+    the highest-scoring sentences that fit budget_tokens, joined in article
+    order. An article within the budget is returned whole.
+    """
+    nlp_layer._require(budget_tokens > 0, "budget_tokens must be > 0")
+    sentences = _sentences(analysis)
+    source = " ".join(sentences)
+    source_tokens = nlp_layer._estimate_tokens(source)
+    if source_tokens <= budget_tokens:
+        return {
+            "text": source,
+            "tokens": source_tokens,
+            "source_tokens": source_tokens,
+            "sentences": len(sentences),
+            "source_sentences": len(sentences),
+        }
+
+    ctx = {
+        "keywords": {k.lower() for k in analysis.get("keywords") or []},
+        "entities": _entity_names(analysis) if "facts" in analysis else None,
+        "commit": _terms(analysis, "commit"),
+        "hedges": _terms(analysis, "hedges"),
+    }
+    ranked: List[Tuple[float, int]] = []
+    seen: Set[str] = set()
+    for i, sentence in enumerate(sentences):
+        norm = sentence.lower()
+        if norm in seen:
+            continue
+        seen.add(norm)
+        ranked.append((_score(sentence, i, ctx), i))
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+
+    chosen: List[int] = []
+    used = 0
+    for _, i in ranked:
+        cost = nlp_layer._estimate_tokens(sentences[i]) + 1
+        if used + cost <= budget_tokens:
+            chosen.append(i)
+            used += cost
+    chosen.sort()
+    text = " ".join(sentences[i] for i in chosen)
+    return {
+        "text": text,
+        "tokens": nlp_layer._estimate_tokens(text),
+        "source_tokens": source_tokens,
+        "sentences": len(chosen),
+        "source_sentences": len(sentences),
+    }
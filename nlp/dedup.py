@@ -0,0 +1,381 @@
+"""Near-duplicate detection for articles that reappear under other URLs.
+
+Wire stories (Reuters, AP) show up in several feeds with a changed headline
+or a trimmed paragraph. Each copy would otherwise go through ingest, NLP and a
+paid LLM call. DuplicateIndex answers "have we seen something at least X%
+similar?" from a MinHash signature of the normalized text:
+
+  * shingles are lowercased word 5-grams, hashed once with blake2b;
+  * the signature is a one-permutation MinHash: the shingle hash picks one of
+    NUM_PERM bins and the bin keeps its minimum, so signing is one pass over
+    the shingles; empty bins of short texts are filled from the next
+    non-empty bin;
+  * an LSH table over BANDS x ROWS slices of the signature finds candidates,
+    which are confirmed by the fraction of equal signature slots, an
+    estimate of the shingle Jaccard similarity.
+
+Entries carry a caller-defined ref (an analysis run id, a URL) and are evicted
+least-recently-used beyond max_entries. Refs of one kind per index file: the
+API (run ids) and scripts/news_scraper.py (URLs) keep separate files. The
+index persists as JSON; save() takes a file lock and merges in entries other
+processes wrote since, so concurrent writers do not drop each other's adds:
+
+    python -m nlp.dedup add   --index data/scraper_dedup_index.json --corpus data/articles_raw.jsonl
+    python -m nlp.dedup query --index data/scraper_dedup_index.json --corpus data/articles_raw.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import regex
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves still merge, without the lock
+    fcntl = None
+
+import nlp_layer
+
+INDEX_VERSION = "dedup-index:1"
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+
+_BIN_MASK = NUM_PERM - 1
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_EMPTY = (1 << 64) - 1
+_PACK = struct.Struct(f"<{NUM_PERM}Q")
+RE_SHINGLE_TOKEN = regex.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+def _shingles(text: str) -> Iterable[str]:
+    tokens = RE_SHINGLE_TOKEN.findall(text.lower())
+    if len(tokens) <= SHINGLE_WORDS:
+        return [" ".join(tokens)] if tokens else []
+    return {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+
+
+def signature(text: str) -> Signature:
+    """MinHash signature of raw text (normalized first, like analysis:v1)."""
+    mins = [_EMPTY] * NUM_PERM
+    blake = hashlib.blake2b
+    for shingle in _shingles(nlp_layer._normalize_text(text)):
+        h = int.from_bytes(blake(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        b = h & _BIN_MASK
+        v = h >> _BIN_BITS
+        if v < mins[b]:
+            mins[b] = v
+    if _EMPTY in mins and any(v != _EMPTY for v in mins):
+        # densify: an empty bin borrows the next non-empty bin's value, tagged
+        # with the distance so borrowed slots only agree when both texts borrow alike
+        filled = list(mins)
+        for b in range(NUM_PERM):
+            if mins[b] == _EMPTY:
+                step = 1
+                while mins[(b + step) % NUM_PERM] == _EMPTY:
+                    step += 1
+                filled[b] = (mins[(b + step) % NUM_PERM] + step * 0x9E3779B97F4A7C15) % _EMPTY
+        mins = filled
+    return tuple(mins)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def _bands(sig: Signature) -> List[Tuple[int, ...]]:
+    return [(i,) + sig[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+
+
+def _encode(sig: Signature) -> str:
+    return base64.b64encode(_PACK.pack(*sig)).decode("ascii")
+
+
+def _decode(data: str) -> Signature:
+    return _PACK.unpack(base64.b64decode(data))
+
+
+class DuplicateIndex:
+    """Thread-safe MinHash LSH index of recently seen documents."""
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 50_000) -> None:
+        nlp_layer._require(0.0 < threshold <= 1.0, "threshold must be in (0, 1]")
+        nlp_layer._require(max_entries >= 1, "max_entries must be >= 1")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dirty = 0
+        # key -> (signature, ref), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Signature, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, ...], set] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- building ----------
+
+    def add(self, key: str, text: Optional[str] = None, ref: Any = None, sig: Optional[Signature] = None) -> Signature:
+        """Index `text` (or a precomputed `sig`) under `key`; re-adding a key replaces it."""
+        nlp_layer._require(text is not None or sig is not None, "add() needs text or sig")
+        if sig is None:
+            sig = signature(text)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (sig, ref)
+            for band in _bands(sig):
+                self._buckets.setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            self.dirty += 1
+        return sig
+
+    def _drop(self, key: str) -> None:
+        sig, _ = self._entries.pop(key)
+        for band in _bands(sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    # ---------- lookup ----------
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        threshold: Optional[float] = None,
+        sig: Optional[Signature] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Best indexed match at or above `threshold` (default: the index's), as
+        {"key", "ref", "similarity"}; None when nothing is that similar.
+        """
+        nlp_layer._require(text is not None or sig is not None, "query() needs text or sig")
+        if sig is None:
+            sig = signature(text)
+        floor = self.threshold if threshold is None else threshold
+        with self._lock:
+            candidates = set()
+            for band in _bands(sig):
+                bucket = self._buckets.get(band)
+                if bucket:
+                    candidates.update(bucket)
+            best: Optional[Tuple[float, str]] = None
+            for key in candidates:
+                score = similarity(sig, self._entries[key][0])
+                if score >= floor and (best is None or score > best[0]):
+                    best = (score, key)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            score, key = best
+            self._entries.move_to_end(key)
+            return {"key": key, "ref": self._entries[key][1], "similarity": round(score, 4)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def merge(self, other: "DuplicateIndex") -> int:
+        """Adds the entries of `other` this index lacks, as least recently used; returns how many."""
+        with other._lock:
+            entries = list(other._entries.items())
+        added = 0
+        with self._lock:
+            for key, (sig, ref) in reversed(entries):
+                if key in self._entries:
+                    continue
+                self._entries[key] = (sig, ref)
+                self._entries.move_to_end(key, last=False)
+                for band in _bands(sig):
+                    self._buckets.setdefault(band, set()).add(key)
+                added += 1
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return added
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [[key, _encode(sig), ref] for key, (sig, ref) in self._entries.items()]
+        return {
+            "version": INDEX_VERSION,
+            "num_perm": NUM_PERM,
+            "threshold": self.threshold,
+            "max_entries": self.max_entries,
+            "entries": entries,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DuplicateIndex":
+        if data.get("version") != INDEX_VERSION or data.get("num_perm") != NUM_PERM:
+            raise ValueError(f"Unsupported dedup index version: {data.get('version')!r}")
+        index = cls(threshold=float(data["threshold"]), max_entries=int(data["max_entries"]))
+        for key, sig, ref in data["entries"]:
+            index.add(key, ref=ref, sig=_decode(sig))
+        index.dirty = 0
+        return index
+
+    def save(self, path: str) -> str:
+        """Writes the index, merged with what is on disk (see merge()), under a file lock."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(target):
+            if target.exists():
+                self.merge(DuplicateIndex.load(str(target)))
+            tmp = target.with_suffix(target.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as handle:
+                json.dump(self.to_dict(), handle, ensure_ascii=False)
+            os.replace(tmp, target)
+        self.dirty = 0
+        return str(target)
+
+    @classmethod
+    def load(cls, path: str) -> "DuplicateIndex":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+    @classmethod
+    def load_or_new(cls, path: str, threshold: float = 0.9, max_entries: int = 50_000) -> "DuplicateIndex":
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls(threshold=threshold, max_entries=max_entries)
+
+
+@contextlib.contextmanager
+def _file_lock(target: Path) -> Iterator[None]:
+    with open(target.with_suffix(target.suffix + ".lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+_default_index: Optional[DuplicateIndex] = None
+_default_path: Optional[str] = None
+_default_ready = False
+_default_lock = threading.Lock()
+
+
+def get_default_index() -> Optional[DuplicateIndex]:
+    """
+    Process-wide index configured by NOISE_SIGNAL_DEDUP_INDEX:
+      unset / "off"  disabled
+      "memory"       in-process only
+      anything else  JSON path, loaded once and written back by save_default_index()
+    NOISE_SIGNAL_DEDUP_THRESHOLD sets the similarity floor (default 0.9).
+    Its refs are /api/analyze run ids; other indexes need files of their own.
+    """
+    global _default_index, _default_path, _default_ready
+    with _default_lock:
+        if _default_ready:
+            return _default_index
+        setting = (os.getenv("NOISE_SIGNAL_DEDUP_INDEX") or "off").strip()
+        threshold = float(os.getenv("NOISE_SIGNAL_DEDUP_THRESHOLD") or 0.9)
+        if setting.lower() == "off":
+            _default_index = None
+        elif setting.lower() == "memory":
+            _default_index = DuplicateIndex(threshold=threshold)
+        else:
+            _default_index = DuplicateIndex.load_or_new(setting, threshold=threshold)
+            _default_index.threshold = threshold
+            _default_path = setting
+        _default_ready = True
+        return _default_index
+
+
+def save_default_index(min_changes: int = 1) -> bool:
+    """Persist the default index if it is file-backed and has at least `min_changes` unsaved adds."""
+    index = get_default_index()
+    if index is None or _default_path is None or index.dirty < min_changes:
+        return False
+    index.save(_default_path)
+    return True
+
+
+# ---------- CLI ----------
+
+def _iter_records(corpus: str) -> Iterable[Tuple[str, str]]:
+    with open(corpus, "r", encoding="utf-8") as handle:
+        for n, line in enumerate(handle):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("text") or (record.get("content") or {}).get("text")
+            url = record.get("url") or (record.get("meta") or {}).get("url") or f"line:{n + 1}"
+            if text:
+                yield url, text
+
+
+def _cli() -> int:
+    ap = argparse.ArgumentParser(description="Near-duplicate index over scraped articles.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    add = sub.add_parser("add", help="Index corpus documents, reporting near-duplicates as they are found")
+    add.add_argument("--index", required=True)
+    add.add_argument("--corpus", required=True, help="JSONL of scraper records or document:v1")
+    add.add_argument("--threshold", type=float, default=0.9)
+    query = sub.add_parser("query", help="Print the closest indexed match for each corpus document")
+    query.add_argument("--index", required=True)
+    query.add_argument("--corpus", required=True)
+    query.add_argument("--threshold", type=float, default=None)
+    args = ap.parse_args()
+
+    if args.cmd == "add":
+        index = DuplicateIndex.load_or_new(args.index, threshold=args.threshold)
+        added = dupes = 0
+        for url, text in _iter_records(args.corpus):
+            sig = signature(text)
+            match = index.query(sig=sig)
+            if match is not None and match["key"] != url:
+                dupes += 1
+                print(json.dumps({"url": url, "duplicate_of": match["key"], "similarity": match["similarity"]}))
+            index.add(url, ref=url, sig=sig)
+            added += 1
+        index.save(args.index)
+        print(f"[dedup] indexed {added} documents ({dupes} near-duplicates); index holds {len(index)}")
+        return 0
+
+    index = DuplicateIndex.load(args.index)
+    for url, text in _iter_records(args.corpus):
+        match = index.query(text, threshold=args.threshold)
+        print(json.dumps({"url": url, "match": match}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_cli())
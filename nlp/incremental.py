@@ -0,0 +1,223 @@
+"""Incremental analysis:v1 for documents that are re-submitted as they change.
+
+Live blogs and developing stories come back through /api/analyze many times
+with most paragraphs untouched. IncrementalAnalyzer keeps extraction results
+per paragraph, keyed by the paragraph's normalized-text hash, and only runs the
+extractors on paragraphs it has not seen. The per-paragraph results are merged
+into a fresh analysis:v1, so the cost of a re-analysis follows the size of the
+edit rather than the size of the article.
+
+Paragraphs are the non-empty lines of content.text. Counts (keywords, modality,
+words) merge exactly. Pattern matches are paragraph-local: a date, amount,
+entity or quote never straddles a paragraph break. The full pipeline can join
+those across a break because normalization folds newlines into spaces,
+producing spans like "Finance. The Department". So facts can differ from
+analyze_document's: such cross-paragraph spans are absent, the pieces each
+paragraph matched instead ("Finance", "The Department") are present, and
+the first-seen order of the facts lists shifts with them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+import nlp_layer
+from nlp_layer import (
+    COMMIT,
+    HEDGE,
+    RE_MONEY,
+    RE_NUMBER,
+    RE_PERCENT,
+    RE_QUOTE,
+    _entity_label,
+    _modality_result,
+    _normalize_paragraphs,
+    _pull_dates,
+    _rank_keywords,
+    _scan_words,
+    _sha256,
+    _split_sections,
+    _ticker_filter,
+)
+
+
+def split_paragraphs(raw_text: str) -> List[str]:
+    """Normalized non-empty paragraphs; " ".join() of them is _normalize_text(raw_text)."""
+    return _normalize_paragraphs(raw_text)
+
+
+def extract_paragraph(text: str) -> Dict[str, Any]:
+    """JSON-serializable extractor output for one normalized paragraph."""
+    scan = _scan_words(text)
+    entities: Dict[str, List[str]] = {"ORG": [], "PERSON": [], "GPE": []}
+    for span in dict.fromkeys(nlp_layer.RE_ENTITY_SPAN.findall(text)):
+        label = _entity_label(span)
+        if label:
+            entities[label].append(span)
+    quotes = []
+    for m in RE_QUOTE.finditer(text):
+        q = m.group(1) or m.group(2)
+        quotes.append([q.strip(), m.start(), m.end()])
+    return {
+        "words": len(text.split()),
+        "keywords": scan.keywords,
+        "hedges": {k: v for k, v in scan.hedges.items() if v},
+        "commits": {k: v for k, v in scan.commits.items() if v},
+        "tickers": scan.tickers,
+        "dates": _pull_dates(text),
+        "money": list(dict.fromkeys(RE_MONEY.findall(text))),
+        "percents": list(dict.fromkeys(RE_PERCENT.findall(text))),
+        "numbers": list(dict.fromkeys(RE_NUMBER.findall(text))),
+        "entities": entities,
+        "quotes": quotes,
+    }
+
+
+class ParagraphMerger:
+    """
+    Folds extract_paragraph() outputs, in text order, into analysis:v1 keys.
+    State grows with distinct terms and facts rather than with text length;
+    with keep_quotes=False quotes are only returned from add(), not retained.
+    """
+
+    def __init__(self, keep_quotes: bool = True) -> None:
+        self.keep_quotes = keep_quotes
+        self.freq: Dict[str, int] = {}
+        self.hedges = {h: 0 for h in HEDGE}
+        self.commits = {c: 0 for c in COMMIT}
+        self.ordered: Dict[str, Dict[str, None]] = {k: {} for k in ("tickers", "dates", "money", "percents", "numbers")}
+        self.entities: Dict[str, Dict[str, None]] = {"ORG": {}, "PERSON": {}, "GPE": {}}
+        self.quotes: List[Dict[str, Any]] = []
+        self.words = 0
+        self.chars = 0
+        self._sha = hashlib.sha256()
+
+    def add(self, para: str, part: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fold one paragraph in; returns its quotes with whole-text char spans."""
+        offset = self.chars + 1 if self.chars else 0
+        if self.chars:
+            self._sha.update(b" ")
+        self._sha.update(para.encode("utf-8"))
+        self.chars = offset + len(para)
+        self.words += part["words"]
+        freq = self.freq
+        for term, n in part["keywords"].items():
+            freq[term] = freq.get(term, 0) + n
+        for term, n in part["hedges"].items():
+            self.hedges[term] += n
+        for term, n in part["commits"].items():
+            self.commits[term] += n
+        return self.add_facts(part, offset)
+
+    def add_facts(self, part: Dict[str, Any], offset: int) -> List[Dict[str, Any]]:
+        """Fold pattern matches only; `offset` places part's quote spans in the whole text."""
+        for key, seen in self.ordered.items():
+            seen.update(dict.fromkeys(part.get(key, ())))
+        for label, spans in part["entities"].items():
+            self.entities[label].update(dict.fromkeys(spans))
+        quotes = [
+            {"text": q, "speaker": None, "char_span": [start + offset, end + offset]}
+            for q, start, end in part["quotes"]
+        ]
+        if self.keep_quotes:
+            self.quotes.extend(quotes)
+        return quotes
+
+    def result(self, sections: List[Dict[str, Any]]) -> Dict[str, Any]:
+        words = self.words
+        return {
+            "stats": {
+                "chars": self.chars,
+                "words": words,
+                # normalized text is a single line
+                "lines": 1 if self.chars else 0,
+                "reading_minutes": round(words / 230.0, 2),
+            },
+            "sections": sections,
+            "facts": {
+                "dates": list(self.ordered["dates"]),
+                "money": list(self.ordered["money"]),
+                "percents": list(self.ordered["percents"]),
+                "numbers": list(self.ordered["numbers"]),
+                "tickers": _ticker_filter(list(self.ordered["tickers"])),
+                "entities": {label: list(spans) for label, spans in self.entities.items()},
+            },
+            "quotes": list(self.quotes),
+            "modality": _modality_result(self.hedges, self.commits),
+            "keywords": _rank_keywords(self.freq, k=12),
+            "hash": "sha256:" + self._sha.hexdigest(),
+            "version": nlp_layer.ANALYSIS_VERSION,
+        }
+
+
+def merge_paragraphs(paragraphs: List[str], parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-paragraph results -> text-derived analysis:v1 keys, in schema order."""
+    merger = ParagraphMerger()
+    for para, part in zip(paragraphs, parts):
+        merger.add(para, part)
+    return merger.result(_split_sections("\n".join(paragraphs)))
+
+
+class IncrementalAnalyzer:
+    """
+    document:v1 -> analysis:v1 with per-paragraph memoization.
+
+    `backend` is any utils.cache backend; the default is an in-memory LRU of
+    paragraph results. Use a SQLiteCache to share paragraphs across processes.
+    """
+
+    def __init__(self, backend=None) -> None:
+        if backend is None:
+            from utils.cache import MemoryLRUCache
+            backend = MemoryLRUCache(max_entries=8192)
+        self.backend = backend
+        self.reused = 0
+        self.computed = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(para: str) -> str:
+        return f"{nlp_layer.ANALYSIS_VERSION}|para|{_sha256(para)}"
+
+    def _paragraph(self, para: str) -> Dict[str, Any]:
+        key = self._key(para)
+        raw = self.backend.get(key)
+        if raw is not None:
+            with self._lock:
+                self.reused += 1
+            return json.loads(raw)
+        part = extract_paragraph(para)
+        self.backend.set(key, json.dumps(part, ensure_ascii=False))
+        with self._lock:
+            self.computed += 1
+        return part
+
+    def analyze(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        nlp_layer.validate_document(doc)
+        paragraphs = split_paragraphs(doc["content"]["text"])
+        parts = [self._paragraph(p) for p in paragraphs]
+        return {
+            "schema": "analysis:v1",
+            "meta": nlp_layer.analysis_meta(doc),
+            **merge_paragraphs(paragraphs, parts),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            reused, computed = self.reused, self.computed
+        return {"paragraphs_reused": reused, "paragraphs_computed": computed, **self.backend.stats()}
+
+
+_default_analyzer: Optional[IncrementalAnalyzer] = None
+_default_lock = threading.Lock()
+
+
+def get_default_analyzer() -> IncrementalAnalyzer:
+    global _default_analyzer
+    with _default_lock:
+        if _default_analyzer is None:
+            _default_analyzer = IncrementalAnalyzer()
+        return _default_analyzer
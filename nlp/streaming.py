@@ -0,0 +1,329 @@
+"""Bounded-memory analysis:v1 for documents too large to hold as one string.
+
+analyze_document() normalizes content.text and scans it as a whole, so a
+filing or book-length transcript costs several copies of itself in memory.
+StreamingAnalyzer takes the text as an iterable of chunks instead (file reads,
+HTTP body parts) and keeps only:
+
+  * the unterminated tail of the current line, capped at max_segment_chars;
+  * the text of the section being packed (at most max_tokens tokens);
+  * running counts, first-seen fact orderings and an incremental sha256.
+
+Every complete paragraph goes through the same per-paragraph extractors as
+nlp.incremental and is folded into a ParagraphMerger, so keywords, modality,
+stats and hash agree with the full pipeline. Sections come from the same
+nlp_layer.SectionPacker and are yielded as soon as they fill, together with
+the quotes that start in them; the final analysis carries the aggregated facts
+and, unless collect=True, empty "sections" and "quotes" lists.
+
+A line longer than max_segment_chars is cut at whitespace. Tokens never span
+whitespace, so counts stay exact; only a line with no whitespace in the back
+half of the budget is hard-cut mid-token. Pattern matches that cross a cut (a
+date, an amount, an entity) are recovered by re-scanning a SEAM_CHARS window
+around it; the pieces either side matched on its own ("The" and "Federal
+Reserve Board") are held back until then and dropped when the recovered match
+covers them. Only a run of more than four capitalized words, which entity
+spans split into pieces, can still split differently past a cut. Quote
+pairing resumes across the cut where a whole-line scan would. As in
+nlp.incremental, matches never straddle a line break. Sections of such a
+line may break at a cut where the full pipeline would not.
+
+    python -m nlp.streaming --in filing.txt > events.ndjson
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import nlp_layer
+from nlp_layer import (
+    RE_DATE,
+    RE_MONEY,
+    RE_NUMBER,
+    RE_PERCENT,
+    RE_QUOTE,
+    SECTION_MAX_TOKENS,
+    SectionPacker,
+    _entity_label,
+    _normalize_date,
+    _normalize_text,
+)
+from nlp.incremental import ParagraphMerger, extract_paragraph
+
+# wide enough for the longest pattern match (a 400-char quote plus delimiters)
+SEAM_CHARS = 512
+
+
+# (fact key, pattern, group holding the value) for the matches a cut can split
+_FACT_PATTERNS = (
+    ("dates", RE_DATE, 0),
+    ("money", RE_MONEY, 0),
+    ("percents", RE_PERCENT, 0),
+    ("numbers", RE_NUMBER, 0),
+    ("entities", nlp_layer.RE_ENTITY_SPAN, 1),
+)
+
+# (fact key, entity label, value, start, end)
+Match = Tuple[str, Optional[str], str, int, int]
+
+
+def _fact_matches(text: str) -> List[Match]:
+    """Fact matches in `text` with their spans, as extract_paragraph() values."""
+    out = []
+    for key, rx, group in _FACT_PATTERNS:
+        for m in rx.finditer(text):
+            value, label = m.group(group), None
+            if key == "entities":
+                label = _entity_label(value)
+                if label is None:
+                    continue
+            elif key == "dates":
+                value = _normalize_date(value)
+                if value is None:
+                    continue
+            out.append((key, label, value, *m.span(group)))
+    return out
+
+
+def _fact_part(matches: Iterable[Match]) -> Dict[str, Any]:
+    """Matches in extract_paragraph() shape, in the order given."""
+    part: Dict[str, Any] = {
+        "dates": [],
+        "money": [],
+        "percents": [],
+        "numbers": [],
+        "entities": {"ORG": [], "PERSON": [], "GPE": []},
+        "quotes": [],
+    }
+    for key, label, value, _, _ in matches:
+        (part["entities"][label] if label else part[key]).append(value)
+    return part
+
+
+def _crossing(tail: str, head: str) -> List[Match]:
+    """Matches in `tail + " " + head` that cross the join, spans in that window."""
+    seam = len(tail)
+    return [m for m in _fact_matches(tail + " " + head) if m[3] < seam < m[4]]
+
+
+def _covered(match: Match, crossing: List[Match]) -> bool:
+    return any(c[0] == match[0] and c[3] <= match[3] and match[4] <= c[4] for c in crossing)
+
+
+def _continued_quotes(tail: str, para: str, floor: int) -> List[List[Any]]:
+    """
+    Quotes of `para` when it continues `tail` on the same line, with spans
+    relative to `para` (a quote opened in the tail starts before 0). Pairing
+    resumes at `floor`, where the last quote matched in the tail ended, which
+    is where a whole-line scan would resume too.
+    """
+    window = tail + " " + para
+    shift = len(tail) + 1
+    out = []
+    for m in RE_QUOTE.finditer(window, max(floor, 0)):
+        if m.end() > shift:
+            out.append([(m.group(1) or m.group(2)).strip(), m.start() - shift, m.end() - shift])
+    return out
+
+
+class StreamingAnalyzer:
+    """
+    Push-style analyzer: feed() raw text chunks, then close().
+
+    Both return "section" events for sections completed so far. result() may
+    be called at any point for a running aggregate, and after close() for the
+    final analysis:v1.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = SECTION_MAX_TOKENS,
+        max_segment_chars: int = 64 * 1024,
+        collect: bool = False,
+    ) -> None:
+        nlp_layer._require(max_segment_chars > SEAM_CHARS, f"max_segment_chars must exceed {SEAM_CHARS}")
+        self.packer = SectionPacker(max_tokens)
+        self.max_segment_chars = max_segment_chars
+        self.collect = collect
+        self.merger = ParagraphMerger(keep_quotes=collect)
+        self.sections: List[Dict[str, Any]] = []
+        self.n_sections = 0
+        self._carry = ""
+        self._seam_tail: Optional[str] = None  # tail of the previous cut of the current line
+        self._held: List[Match] = []  # matches touching that cut, spans in the seam window
+        self._seam_floor = 0
+        self._quotes: List[Dict[str, Any]] = []  # not yet attached to a section
+        self._closed = False
+
+    # ---------- input ----------
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        nlp_layer._require(not self._closed, "StreamingAnalyzer is closed")
+        events: List[Dict[str, Any]] = []
+        lines = (self._carry + chunk).splitlines(keepends=True)
+        self._carry = ""
+        if lines and lines[-1].splitlines()[0] == lines[-1]:
+            self._carry = lines.pop()  # no line break yet
+        for line in lines:
+            self._line(line, events, ends_line=True)
+        self._carry = self._line(self._carry, events, ends_line=False)
+        return events
+
+    def close(self) -> List[Dict[str, Any]]:
+        if self._closed:
+            return []
+        events: List[Dict[str, Any]] = []
+        if self._carry:
+            self._segment(self._carry, events, ends_line=True)
+            self._carry = ""
+        self._release_held()
+        self._emit(self.packer.finish(), events)
+        self._closed = True
+        return events
+
+    def _line(self, text: str, events: List[Dict[str, Any]], ends_line: bool) -> str:
+        """Fold `text` in segments of at most max_segment_chars; returns the unfolded rest."""
+        while len(text) > self.max_segment_chars:
+            cut = self._cut_point(text)
+            self._segment(text[:cut], events, ends_line=False)
+            text = text[cut:]
+        if ends_line:
+            self._segment(text, events, ends_line=True)
+            return ""
+        return text
+
+    def _cut_point(self, text: str) -> int:
+        # last whitespace in the back half of the budget; a hard cut if there is none
+        limit = self.max_segment_chars
+        for i in range(limit, limit // 2, -1):
+            if text[i - 1].isspace():
+                return i
+        return limit
+
+    # ---------- folding ----------
+
+    def _segment(self, raw: str, events: List[Dict[str, Any]], ends_line: bool) -> None:
+        para = _normalize_text(raw)
+        if para:
+            part = extract_paragraph(para)
+            tail = self._seam_tail
+            held: List[Match] = []
+            if tail is not None or not ends_line:
+                # a match touching a cut may be a piece of one that crosses it
+                matches = _fact_matches(para)
+                head = [m for m in matches if tail is not None and m[3] == 0]
+                held = [m for m in matches if not ends_line and m[4] == len(para) and m not in head]
+                part.update(_fact_part(m for m in matches if m not in head and m not in held), quotes=part["quotes"])
+            if tail is not None:
+                shift = len(tail) + 1
+                crossing = _crossing(tail, para[:SEAM_CHARS])
+                head = [(key, label, value, start + shift, end + shift) for key, label, value, start, end in head]
+                self.merger.add_facts(
+                    _fact_part(
+                        [m for m in self._held if not _covered(m, crossing)]
+                        + crossing
+                        + [m for m in head if not _covered(m, crossing)]
+                    ),
+                    0,
+                )
+                self._held = []
+                part["quotes"] = _continued_quotes(tail, para, self._seam_floor)
+            self._quotes += self.merger.add(para, part)
+            self._emit(self.packer.add(para), events)
+            self._seam_tail = None if ends_line else para[-SEAM_CHARS:]
+            last_end = part["quotes"][-1][2] if part["quotes"] else 0
+            # re-based onto the next tail, which is the last SEAM_CHARS of para
+            rebase = len(para) - len(para[-SEAM_CHARS:])
+            self._seam_floor = last_end - rebase
+            self._held = [(key, label, value, start - rebase, end - rebase) for key, label, value, start, end in held]
+        elif ends_line:
+            self._seam_tail = None
+            self._release_held()
+
+    def _release_held(self) -> None:
+        # the line ended at the cut: nothing crosses it
+        if self._held:
+            self.merger.add_facts(_fact_part(self._held), 0)
+            self._held = []
+
+    def _emit(self, sections: List[Dict[str, Any]], events: List[Dict[str, Any]]) -> None:
+        for section in sections:
+            end = section["char_span"][1]
+            n = 0
+            while n < len(self._quotes) and self._quotes[n]["char_span"][0] < end:
+                n += 1
+            quotes, self._quotes = self._quotes[:n], self._quotes[n:]
+            if self.collect:
+                self.sections.append(section)
+            events.append({"event": "section", "index": self.n_sections, "section": section, "quotes": quotes})
+            self.n_sections += 1
+
+    # ---------- output ----------
+
+    def result(self, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        meta = meta or {}
+        return {
+            "schema": "analysis:v1",
+            "meta": {
+                "title": meta.get("title"),
+                "url": meta.get("url"),
+                "source_created_at": meta.get("created_at"),
+                "analyzed_at": nlp_layer._now_iso(),
+            },
+            **self.merger.result(list(self.sections)),
+        }
+
+
+def analyze_stream(
+    chunks: Iterable[str],
+    meta: Optional[Dict[str, Any]] = None,
+    *,
+    max_tokens: int = SECTION_MAX_TOKENS,
+    max_segment_chars: int = 64 * 1024,
+    collect: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields {"event": "section", ...} as sections complete, then one
+    {"event": "analysis", "analysis": analysis:v1} with the aggregated facts.
+    `meta` takes document:v1 meta keys (title, url, created_at).
+    """
+    analyzer = StreamingAnalyzer(max_tokens=max_tokens, max_segment_chars=max_segment_chars, collect=collect)
+    for chunk in chunks:
+        yield from analyzer.feed(chunk)
+    yield from analyzer.close()
+    yield {"event": "analysis", "analysis": analyzer.result(meta)}
+
+
+def iter_file_chunks(path: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# ---------- CLI ----------
+
+def _cli() -> int:
+    ap = argparse.ArgumentParser(description="Stream analysis:v1 events for a large plain-text file as NDJSON.")
+    ap.add_argument("--in", dest="inp", help="Plain-text input (default: stdin)")
+    ap.add_argument("--title", default=None)
+    ap.add_argument("--chunk-size", type=int, default=1 << 20)
+    ap.add_argument("--max-tokens", type=int, default=SECTION_MAX_TOKENS)
+    args = ap.parse_args()
+
+    if args.inp:
+        chunks: Iterable[str] = iter_file_chunks(args.inp, args.chunk_size)
+    else:
+        chunks = iter(lambda: sys.stdin.read(args.chunk_size), "")
+    for event in analyze_stream(chunks, {"title": args.title}, max_tokens=args.max_tokens):
+        print(json.dumps(event, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_cli())
@@ -0,0 +1,232 @@
+"""Corpus-aware keyword ranking for analysis:v1.
+
+`_keyword_top` ranks words by raw in-document frequency, so boilerplate such as
+"said" or "percent" wins on every article. KeywordIndex keeps document
+frequencies over a scraped corpus and ranks by TF-IDF instead:
+
+    python -m nlp.tfidf update --index data/keyword_index.json --corpus data/articles_raw.jsonl
+    python -m nlp.tfidf top --index data/keyword_index.json --corpus data/articles_raw.jsonl
+
+Term frequencies come from nlp_layer's fused word scan, so tokenization and
+stopwords match the frequency ranking and per-document scoring stays O(tokens).
+Updates are incremental: documents are keyed by their normalized-text hash and
+counted once, no matter how many times the corpus is replayed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import nlp_layer
+
+INDEX_VERSION = "keyword-index:1"
+
+
+def term_frequencies(text: str) -> Dict[str, int]:
+    """Keyword-token counts of raw text, in first-occurrence order."""
+    return nlp_layer._scan_words(nlp_layer._normalize_text(text)).keywords
+
+
+class KeywordIndex:
+    def __init__(self) -> None:
+        self.n_docs = 0
+        self.df: Dict[str, int] = {}
+        self.seen: set = set()
+
+    # ---------- building ----------
+
+    def add(self, text: str) -> bool:
+        """Count one document; returns False if its normalized text was seen before."""
+        normalized = nlp_layer._normalize_text(text)
+        doc_hash = nlp_layer._sha256(normalized)
+        if doc_hash in self.seen:
+            return False
+        self.seen.add(doc_hash)
+        self.n_docs += 1
+        df = self.df
+        for term in nlp_layer._scan_words(normalized).keywords:
+            df[term] = df.get(term, 0) + 1
+        return True
+
+    def update(self, texts: Iterable[str]) -> int:
+        return sum(1 for text in texts if self.add(text))
+
+    # ---------- scoring ----------
+
+    def idf(self, term: str) -> float:
+        # smoothed idf: unseen terms score highest, terms in every doc still count
+        return math.log((1 + self.n_docs) / (1 + self.df.get(term, 0))) + 1.0
+
+    def top_terms(self, tf: Dict[str, int], k: int = 12) -> List[str]:
+        idf = self.idf
+        ranked = sorted(tf.items(), key=lambda x: x[1] * idf(x[0]), reverse=True)
+        return [w for w, _ in ranked[:k]]
+
+    def top_keywords(self, text: str, k: int = 12) -> List[str]:
+        return self.top_terms(term_frequencies(text), k)
+
+    def score_batch(self, texts: List[str], k: int = 12) -> List[List[str]]:
+        """
+        Vectorized TF-IDF over many documents. Builds one sparse (row, col, tf)
+        triple set for the batch, weights it with a dense idf vector, and
+        returns the same rankings `top_keywords` would for each text.
+        """
+        import numpy as np
+
+        tfs = [term_frequencies(t) for t in texts]
+        vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        counts: List[int] = []
+        for r, tf in enumerate(tfs):
+            for term, n in tf.items():
+                rows.append(r)
+                cols.append(vocab.setdefault(term, len(vocab)))
+                counts.append(n)
+        if not vocab:
+            return [[] for _ in texts]
+
+        terms = list(vocab)
+        idf = np.array([self.idf(t) for t in terms], dtype=np.float64)
+        col_arr = np.asarray(cols, dtype=np.int64)
+        scores = np.asarray(counts, dtype=np.float64) * idf[col_arr]
+        # entries are grouped by row in first-occurrence order, so a stable
+        # sort on (row, -score) reproduces top_terms' tie-breaking
+        order = np.lexsort((-scores, np.asarray(rows, dtype=np.int64)))
+        bounds = np.cumsum([0] + [len(tf) for tf in tfs])
+        out = []
+        for r in range(len(tfs)):
+            picked = order[bounds[r]:bounds[r + 1]][:k]
+            out.append([terms[c] for c in col_arr[picked]])
+        return out
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "analysis_version": nlp_layer.ANALYSIS_VERSION,
+            "n_docs": self.n_docs,
+            "df": self.df,
+            "seen": sorted(self.seen),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KeywordIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported keyword index version: {data.get('version')!r}")
+        index = cls()
+        index.n_docs = int(data["n_docs"])
+        index.df = dict(data["df"])
+        index.seen = set(data["seen"])
+        return index
+
+    def save(self, path: str) -> str:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, ensure_ascii=False)
+        os.replace(tmp, target)
+        return str(target)
+
+    @classmethod
+    def load(cls, path: str) -> "KeywordIndex":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+    @classmethod
+    def load_or_new(cls, path: str) -> "KeywordIndex":
+        return cls.load(path) if os.path.exists(path) else cls()
+
+
+def apply_keywords(analysis: Dict[str, Any], index: KeywordIndex, k: int = 12) -> Dict[str, Any]:
+    """Replace analysis['keywords'] with the TF-IDF ranking of its section text."""
+    text = " ".join(s.get("text", "") for s in analysis.get("sections") or [])
+    analysis["keywords"] = index.top_keywords(text, k)
+    return analysis
+
+
+_default_index: Optional[KeywordIndex] = None
+_default_index_key: Optional[tuple] = None
+
+
+def get_default_index() -> Optional[KeywordIndex]:
+    """
+    Index at NOISE_SIGNAL_KEYWORD_INDEX; None when unset. Reloaded whenever
+    the file changes, so a running API picks up `update` runs (save() swaps
+    the file in atomically).
+    """
+    global _default_index, _default_index_key
+    path = os.getenv("NOISE_SIGNAL_KEYWORD_INDEX")
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key != _default_index_key:
+        _default_index, _default_index_key = KeywordIndex.load(path), key
+    return _default_index
+
+
+# ---------- CLI ----------
+
+def _iter_texts(corpus: str) -> Iterable[str]:
+    with open(corpus, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("text") or (record.get("content") or {}).get("text")
+            if text:
+                yield text
+
+
+def _cli() -> int:
+    ap = argparse.ArgumentParser(description="Corpus document-frequency index for TF-IDF keywords.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    up = sub.add_parser("update", help="Add unseen corpus documents to the index")
+    up.add_argument("--index", required=True)
+    up.add_argument("--corpus", required=True, help="JSONL of scraper records or document:v1")
+    top = sub.add_parser("top", help="Print TF-IDF keywords for each corpus document")
+    top.add_argument("--index", required=True)
+    top.add_argument("--corpus", required=True)
+    top.add_argument("-k", type=int, default=12)
+    top.add_argument("--batch", type=int, default=256)
+    args = ap.parse_args()
+
+    if args.cmd == "update":
+        index = KeywordIndex.load_or_new(args.index)
+        added = index.update(_iter_texts(args.corpus))
+        index.save(args.index)
+        print(f"[tfidf] added {added} documents; index now covers {index.n_docs}")
+        return 0
+
+    index = KeywordIndex.load(args.index)
+    batch: List[str] = []
+
+    def flush() -> None:
+        for keywords in index.score_batch(batch, k=args.k):
+            print(json.dumps(keywords, ensure_ascii=False))
+        batch.clear()
+
+    for text in _iter_texts(args.corpus):
+        batch.append(text)
+        if len(batch) >= args.batch:
+            flush()
+    if batch:
+        flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_cli())
@@ -4,11 +4,16 @@
 #
 # Zero network calls. Pure text processing.
 
-import json, sys, time, hashlib, regex, re
-from typing import Dict, Any, List, Optional
+import json, os, sys, threading, time, hashlib, regex, re, tracemalloc
+from collections import Counter, deque
+from datetime import date
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
 from dateutil import parser as dparser
 
-ANALYSIS_VERSION = "nlp-layer:1.0.0"
+ANALYSIS_VERSION = "nlp-layer:1.2.1"
 
 # ------------------------- Validation ----------------------------------------
 def _require(cond: bool, msg: str):
@@ -29,10 +34,20 @@ def _now_iso() -> str:
 def _sha256(s: str) -> str:
     return "sha256:" + hashlib.sha256(s.encode("utf-8")).hexdigest()
 
+# str.translate walks the text char by char in Python-level lookups; six
+# substring replaces run at memchr speed and skip characters that are absent
+_QUOTE_MAP = (('\u2018',"'"), ('\u2019',"'"), ('\u201C','"'), ('\u201D','"'), ('\u2013','-'), ('\u2014','-'))
+# str.isspace() and regex's \s disagree only on the ASCII information separators
+_SPLIT_UNSAFE = regex.compile(r'[\x1c-\x1f]')
+
 def _normalize_text(text: str) -> str:
     # Normalize quotes/dashes, collapse whitespace but keep paragraph breaks
-    trans = str.maketrans({'\u2018':"'", '\u2019':"'", '\u201C':'"', '\u201D':'"', '\u2013':'-', '\u2014':'-'})
-    text = text.translate(trans)
+    for src, dst in _QUOTE_MAP:
+        if src in text:
+            text = text.replace(src, dst)
+    if not _SPLIT_UNSAFE.search(text):
+        # same result as the line/regex pipeline below without the extra copies
+        return " ".join(text.split())
     # strip trailing spaces per line and remove duplicate blank lines
     lines = [ln.strip() for ln in text.splitlines()]
     lines = [ln for ln in lines if ln]  # drop empty lines
@@ -41,21 +56,114 @@ def _normalize_text(text: str) -> str:
     text = regex.sub(r'\s+', ' ', text)
     return text.strip()
 
-def _split_sections(text: str, max_words: int = 180) -> List[Dict[str, Any]]:
-    # simple word-budget chunker to keep sections readable
-    paras = [p.strip() for p in text.split('\n') if p.strip()]
-    chunks, buf, wc = [], [], 0
-    for p in paras:
-        w = len(p.split())
-        if wc + w > max_words and buf:
-            chunk = " ".join(buf)
-            chunks.append({"heading": None, "text": chunk, "word_count": len(chunk.split())})
-            buf, wc = [], 0
-        buf.append(p); wc += w
-    if buf:
-        chunk = " ".join(buf)
-        chunks.append({"heading": None, "text": chunk, "word_count": len(chunk.split())})
-    return chunks if chunks else [{"heading": None, "text": text, "word_count": len(text.split())}]
+def _normalize_paragraphs(text: str) -> List[str]:
+    # _normalize_text one line at a time: " ".join() of the result is
+    # _normalize_text(text), and the line breaks survive as list boundaries
+    for src, dst in _QUOTE_MAP:
+        if src in text:
+            text = text.replace(src, dst)
+    if _SPLIT_UNSAFE.search(text):
+        return [p for p in map(_normalize_text, text.splitlines()) if p]
+    return [p for p in (" ".join(line.split()) for line in text.splitlines()) if p]
+
+# ------------------------- Sections ------------------------------------------
+# Budgets are in estimated LLM tokens: about four characters per token for
+# English prose, which is close enough for packing and costs nothing to compute.
+SECTION_MAX_TOKENS = 256
+CHARS_PER_TOKEN = 4
+RE_SENTENCE_BREAK = regex.compile(r'(?<=[.!?]["\')\]]?) (?=["\'(\[]?[A-Z0-9])')
+
+def _estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def _pieces(para: str, start: int, max_chars: int) -> Iterator[tuple]:
+    # (offset, text) runs of an oversized paragraph: sentences, and word runs
+    # for sentences that are still too long; runs are split at single spaces
+    pos = 0
+    ends = [m.start() for m in RE_SENTENCE_BREAK.finditer(para)] + [len(para)]
+    for end in ends:
+        sentence = para[pos:end]
+        if len(sentence) <= max_chars:
+            yield start + pos, sentence
+        else:
+            run_start = run_end = 0
+            for m in regex.finditer(r'\S+', sentence):
+                if m.end() - run_start > max_chars and run_end > run_start:
+                    yield start + pos + run_start, sentence[run_start:run_end]
+                    run_start = m.start()
+                run_end = m.end()
+            yield start + pos + run_start, sentence[run_start:run_end]
+        pos = end + 1
+
+class SectionPacker:
+    """
+    One-pass section builder over normalized paragraphs.
+
+    Paragraphs are packed greedily up to `max_tokens`; a paragraph is only
+    split when it exceeds the budget on its own, first at sentence ends, then
+    between words. Each section records its char_span in the normalized text
+    (paragraphs joined by single spaces), so text == normalized[start:end].
+    Work is linear in the text length.
+    """
+
+    def __init__(self, max_tokens: int = SECTION_MAX_TOKENS):
+        _require(max_tokens >= 1, "max_tokens must be >= 1")
+        self.max_chars = max_tokens * CHARS_PER_TOKEN
+        self._pos = 0  # where the next paragraph starts
+        self._buf: List[str] = []
+        self._start = 0
+        self._chars = 0
+
+    def add(self, para: str) -> List[Dict[str, Any]]:
+        """Feed the next paragraph; returns the sections it completed."""
+        out: List[Dict[str, Any]] = []
+        start, self._pos = self._pos, self._pos + len(para) + 1
+        if len(para) <= self.max_chars:
+            self._push(start, para, out)
+            return out
+        self._flush(out)
+        for offset, piece in _pieces(para, start, self.max_chars):
+            self._push(offset, piece, out)
+        return out
+
+    def finish(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        self._flush(out)
+        return out
+
+    def _push(self, offset: int, piece: str, out: List[Dict[str, Any]]) -> None:
+        if self._buf and self._chars + 1 + len(piece) > self.max_chars:
+            self._flush(out)
+        if self._buf:
+            self._chars += 1 + len(piece)
+        else:
+            self._start, self._chars = offset, len(piece)
+        self._buf.append(piece)
+
+    def _flush(self, out: List[Dict[str, Any]]) -> None:
+        if self._buf:
+            out.append(_section(" ".join(self._buf), self._start))
+            self._buf = []
+
+def _section(text: str, start: int) -> Dict[str, Any]:
+    return {
+        "heading": None,
+        "text": text,
+        "word_count": len(text.split()),
+        "char_span": [start, start + len(text)],
+        "tokens": _estimate_tokens(text),
+    }
+
+def _split_sections(text: str, max_tokens: int = SECTION_MAX_TOKENS) -> List[Dict[str, Any]]:
+    # `text` is normalized paragraphs joined by "\n" (see _normalize_paragraphs)
+    packer = SectionPacker(max_tokens)
+    chunks: List[Dict[str, Any]] = []
+    for p in text.split('\n'):
+        p = p.strip()
+        if p:
+            chunks += packer.add(p)
+    chunks += packer.finish()
+    return chunks if chunks else [_section(text, 0)]
 
 # ------------------------- Extractors ----------------------------------------
 RE_MONEY   = regex.compile(r'(?:(?:USD|US\$|\$)\s?\d[\d,]*(?:\.\d{1,2})?)', regex.I)
@@ -66,33 +174,109 @@ RE_QUOTE   = regex.compile(r'\"([^"]{10,400})\"|\“([^”]{10,400})\”')
 
 HEDGE = {"may","might","could","suggest","appears","possible","likely","unlikely","approximately","around","estimate"}
 COMMIT = {"will","shall","must","decided","announced","approved","reduces","increases","commits","confirms"}
+STOPWORDS = frozenset("the a an and or if in on of to for with by as from this that these those be is are was were been being about between into after before during over under up down out more most less least such than not no nor".split())
+# ------------------------- Dates ---------------------------------------------
+# One scan finds "Mar 18, 2025", "2025-03-18", "18 March 2025" and "Q3 2024".
+# RE_DATE_PARTS re-reads a single match to build the ISO string directly;
+# dateutil is only consulted for matches the month table cannot resolve.
+_MONTH_ALT = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*'
+RE_DATE = re.compile(
+    r'\b' + _MONTH_ALT + r'\.?\s+\d{1,2},?\s+\d{4}'
+    r'|\b\d{4}-\d{2}-\d{2}'
+    r'|\b\d{1,2}\s+' + _MONTH_ALT + r'\.?,?\s+\d{4}'
+    r'|\bQ[1-4]\s+\d{4}\b',
+    re.I)
+RE_DATE_PARTS = re.compile(
+    r'(?P<mon>' + _MONTH_ALT + r')\.?\s+(?P<day>\d{1,2}),?\s+(?P<year>\d{4})'
+    r'|(?P<iy>\d{4})-(?P<im>\d{2})-(?P<id>\d{2})'
+    r'|(?P<dday>\d{1,2})\s+(?P<dmon>' + _MONTH_ALT + r')\.?,?\s+(?P<dyear>\d{4})'
+    r'|Q(?P<q>[1-4])\s+(?P<qyear>\d{4})',
+    re.I)
+MONTHS = {name: i for i, names in enumerate((
+    ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+    ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+    ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+), start=1) for name in names}
+
+def _fast_date(m: "re.Match[str]") -> Optional[str]:
+    if m.group("q"):
+        # facts.dates holds ISO dates only: a quarter becomes its first day
+        return date(int(m.group("qyear")), 3 * int(m.group("q")) - 2, 1).isoformat()
+    if m.group("iy"):
+        year, month, day = int(m.group("iy")), int(m.group("im")), int(m.group("id"))
+    elif m.group("mon"):
+        year, month, day = int(m.group("year")), MONTHS.get(m.group("mon").lower()), int(m.group("day"))
+    else:
+        year, month, day = int(m.group("dyear")), MONTHS.get(m.group("dmon").lower()), int(m.group("dday"))
+    # dateutil reads years below 100 as two-digit years; leave those to it
+    if month is None or year < 100:
+        return None
+    return date(year, month, day).isoformat()
+
+@lru_cache(maxsize=4096)
+def _table_date(s: str) -> Tuple[Optional[str], bool]:
+    """(ISO string or None, whether dateutil should try) from the month table alone."""
+    m = RE_DATE_PARTS.fullmatch(s)
+    if m is None or not s.isascii():
+        return None, True
+    try:
+        iso = _fast_date(m)
+    except ValueError:
+        iso = None
+    if iso is not None:
+        return iso, False
+    # formats added after the dateutil path; fuzzy parsing fills in today's
+    # day/month for unknown words, so never fall back for them
+    return None, not (m.group("q") or m.group("dmon"))
+
+def _normalize_date(s: str) -> Optional[str]:
+    """Date-like match -> ISO string, or None when nothing parses."""
+    iso, fallback = _table_date(s)
+    if not fallback:
+        return iso
+    # not memoized: dateutil fills missing parts from today's date ("Marching 5, 2025")
+    try:
+        return dparser.parse(s, fuzzy=True).date().isoformat()
+    except Exception:
+        return None
 
 def _pull_dates(text: str) -> List[str]:
-    hits, out = [], []
-    for m in re.finditer(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}|\b\d{4}-\d{2}-\d{2}', text, re.I):
-        s = m.group(0)
-        try:
-            hits.append(dparser.parse(s, fuzzy=True).date().isoformat())
-        except Exception:
-            pass
-    for h in hits:
-        if h not in out:
-            out.append(h)
-    return out
+    # normalize each distinct match once; repeats cannot change the ordered result
+    hits = {}
+    for s in dict.fromkeys(RE_DATE.findall(text)):
+        iso = _normalize_date(s)
+        if iso is not None:
+            hits[iso] = None
+    return list(hits)
+
+# ------------------------- Entities ------------------------------------------
+
+# Entity classing keys off substrings of the lowercased span. Each keyword list
+# is compiled into one alternation, so a span costs a single automaton scan per
+# class instead of one substring search per keyword.
+ORG_KEYWORDS = ("federal","board","university","bank","department","ministry","committee","corp","inc","ltd")
+GPE_KEYWORDS = ("states","republic","kingdom","city","province","county")
+RE_ENTITY_SPAN = regex.compile(r'\b([A-Z][A-Za-z&.\-]+(?:\s+[A-Z][A-Za-z&.\-]+){0,3})\b')
+RE_ORG_HINT = regex.compile("|".join(map(regex.escape, ORG_KEYWORDS)), regex.I)
+RE_GPE_HINT = regex.compile("|".join(map(regex.escape, GPE_KEYWORDS)), regex.I)
+
+def _entity_label(span: str) -> Optional[str]:
+    if span.isupper() and len(span.split())==1:
+        return None
+    if RE_ORG_HINT.search(span):
+        return "ORG"
+    if RE_GPE_HINT.search(span):
+        return "GPE"
+    return "PERSON"
 
 def _pull_entities_light(text: str) -> Dict[str, List[str]]:
     ents = {"ORG":[], "PERSON":[], "GPE":[]}
-    for m in regex.finditer(r'\b([A-Z][A-Za-z&.\-]+(?:\s+[A-Z][A-Za-z&.\-]+){0,3})\b', text):
-        span = m.group(1)
-        if len(span.split())==1 and span.isupper():
-            continue
-        low = span.lower()
-        if any(k in low for k in ["federal","board","university","bank","department","ministry","committee","corp","inc","ltd"]):
-            if span not in ents["ORG"]: ents["ORG"].append(span)
-        elif any(k in low for k in ["states","republic","kingdom","city","province","county"]):
-            if span not in ents["GPE"]: ents["GPE"].append(span)
-        else:
-            if span not in ents["PERSON"]: ents["PERSON"].append(span)
+    # a span always gets the same label, so classify distinct spans once in
+    # first-seen order; the dict doubles as the O(1) dedup set
+    for span in dict.fromkeys(RE_ENTITY_SPAN.findall(text)):
+        label = _entity_label(span)
+        if label:
+            ents[label].append(span)
     return ents
 
 def _pull_quotes(text: str) -> List[Dict[str, Any]]:
@@ -102,15 +286,29 @@ def _pull_quotes(text: str) -> List[Dict[str, Any]]:
         out.append({"text": q.strip(), "speaker": None, "char_span": [m.start(), m.end()]})
     return out
 
+def _rank_keywords(freq: Dict[str, int], k: int) -> List[str]:
+    ranked = sorted(freq.items(), key=lambda x: x[1], reverse=True)
+    return [w for w,_ in ranked[:k]]
+
+def _modality_result(hed: Dict[str, int], com: Dict[str, int]) -> Dict[str, Any]:
+    hsum = sum(hed.values()); csum = sum(com.values())
+    stance = 0.0 if (hsum+csum)==0 else csum/(hsum+csum)
+    return {
+        "hedges":[{"term":k,"count":v} for k,v in hed.items() if v],
+        "commit":[{"term":k,"count":v} for k,v in com.items() if v],
+        "stance_index": round(stance, 2)
+    }
+
+def _ticker_filter(hits: List[str]) -> List[str]:
+    return [t for t in set(hits) if len(t)>=2 and not t.isdigit()]
+
 def _keyword_top(text: str, k: int = 10) -> List[str]:
     words = [w.lower() for w in regex.findall(r'[a-zA-Z][a-zA-Z\-]{2,}', text)]
-    stop = set("the a an and or if in on of to for with by as from this that these those be is are was were been being about between into after before during over under up down out more most less least such than not no nor".split())
     freq={}
     for w in words:
-        if w in stop: continue
+        if w in STOPWORDS: continue
         freq[w]=freq.get(w,0)+1
-    ranked = sorted(freq.items(), key=lambda x: x[1], reverse=True)
-    return [w for w,_ in ranked[:k]]
+    return _rank_keywords(freq, k)
 
 def _modality_scores(text: str) -> Dict[str, Any]:
     tokens = [t.lower() for t in regex.findall(r"[a-zA-Z']+", text)]
@@ -118,74 +316,515 @@ def _modality_scores(text: str) -> Dict[str, Any]:
     for t in tokens:
         if t in hed: hed[t]+=1
         if t in com: com[t]+=1
-    hsum = sum(hed.values()); csum = sum(com.values())
-    stance = 0.0 if (hsum+csum)==0 else csum/(hsum+csum)
-    return {
-        "hedges":[{"term":k,"count":v} for k,v in hed.items() if v],
-        "commit":[{"term":k,"count":v} for k,v in com.items() if v],
-        "stance_index": round(stance, 2)
-    }
+    return _modality_result(hed, com)
 
-def _fact_pack(text: str) -> Dict[str, Any]:
+def _fact_pack(text: str, tickers: Optional[List[str]] = None) -> Dict[str, Any]:
     return {
         "dates": _pull_dates(text),
         "money": list(dict.fromkeys(RE_MONEY.findall(text))),
         "percents": list(dict.fromkeys(RE_PERCENT.findall(text))),
         "numbers": list(dict.fromkeys(RE_NUMBER.findall(text))),
-        "tickers": [t for t in set(RE_TICKER.findall(text)) if len(t)>=2 and not t.isdigit()],
+        "tickers": _ticker_filter(RE_TICKER.findall(text) if tickers is None else tickers),
         "entities": _pull_entities_light(text)
     }
 
+# ------------------------- Fused word scan -----------------------------------
+# The keyword tokenizer ([a-zA-Z][a-zA-Z-]{2,}), the modality tokenizer
+# ([a-zA-Z']+) and RE_TICKER (\b[A-Z]{1,5}\b) never match across a character
+# outside [\w'-], so the text is cut into maximal runs of those characters once
+# and counted at C speed. The three extractors are then evaluated once per
+# distinct run, weighted by its count, instead of once per occurrence. Dict
+# insertion order follows first occurrence, which keeps keyword tie-breaking
+# and ticker set construction identical to the per-extractor passes above.
+RE_WORD_RUN = regex.compile(r"[\w'\-]+")
+RE_KEYWORD = regex.compile(r'[a-zA-Z][a-zA-Z\-]{2,}')
+RE_MODAL_TOKEN = regex.compile(r"[a-zA-Z']+")
+
+class _WordScan:
+    __slots__ = ("keywords", "hedges", "commits", "tickers")
+
+    def __init__(self):
+        self.keywords: Dict[str, int] = {}
+        self.hedges = {h:0 for h in HEDGE}
+        self.commits = {c:0 for c in COMMIT}
+        self.tickers: List[str] = []
+
+def _scan_words(text: str) -> _WordScan:
+    scan = _WordScan()
+    freq, hed, com = scan.keywords, scan.hedges, scan.commits
+    tickers: Dict[str, None] = {}
+    for run, n in Counter(RE_WORD_RUN.findall(text)).items():
+        if run.isascii() and run.isalpha():
+            # plain ASCII word: every tokenizer yields the run itself
+            low = run.lower()
+            if len(run) >= 3 and low not in STOPWORDS:
+                freq[low] = freq.get(low, 0) + n
+            if low in hed: hed[low] += n
+            elif low in com: com[low] += n
+            if len(run) <= 5 and run.isupper():
+                tickers[run] = None
+            continue
+        for w in RE_KEYWORD.findall(run):
+            w = w.lower()
+            if w not in STOPWORDS:
+                freq[w] = freq.get(w, 0) + n
+        for t in RE_MODAL_TOKEN.findall(run):
+            t = t.lower()
+            if t in hed: hed[t] += n
+            elif t in com: com[t] += n
+        for t in RE_TICKER.findall(run):
+            tickers[t] = None
+    scan.tickers = list(tickers)
+    return scan
+
+# ------------------------- Analysis cache ------------------------------------
+class AnalysisCache:
+    """
+    Text-derived part of analysis:v1 keyed on (normalized text hash, ANALYSIS_VERSION).
+    analyze_document hashes the text with its paragraph breaks when it has
+    several paragraphs, since sections depend on them.
+
+    `meta` is never cached; it is rebuilt from each document so title, url and
+    analyzed_at stay per-request. Any utils.cache backend works; entries from
+    another ANALYSIS_VERSION are never returned.
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            from utils.cache import MemoryLRUCache
+            backend = MemoryLRUCache()
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def sqlite(cls, path: str, max_bytes: int = 256 * 1024 * 1024) -> "AnalysisCache":
+        from utils.cache import SQLiteCache
+        return cls(SQLiteCache(path, table="analysis_cache", namespace=ANALYSIS_VERSION, max_bytes=max_bytes))
+
+    @staticmethod
+    def _key(text_hash: str) -> str:
+        return f"{ANALYSIS_VERSION}|{text_hash}"
+
+    def get(self, text_hash: str) -> Optional[Dict[str, Any]]:
+        raw = self.backend.get(self._key(text_hash))
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    def put(self, text_hash: str, body: Dict[str, Any]) -> None:
+        self.backend.set(self._key(text_hash), json.dumps(body, ensure_ascii=False))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "version": ANALYSIS_VERSION,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            **self.backend.stats(),
+        }
+
+_default_cache: Optional[AnalysisCache] = None
+_default_cache_ready = False
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> Optional[AnalysisCache]:
+    """
+    Process-wide cache configured by NOISE_SIGNAL_ANALYSIS_CACHE:
+      unset / "memory"  in-memory LRU (NOISE_SIGNAL_ANALYSIS_CACHE_SIZE entries, default 512)
+      "off"             no caching
+      anything else     path to a SQLite file shared by every process on the host
+    """
+    global _default_cache, _default_cache_ready
+    with _default_cache_lock:
+        if _default_cache_ready:
+            return _default_cache
+        setting = (os.getenv("NOISE_SIGNAL_ANALYSIS_CACHE") or "memory").strip()
+        if setting.lower() == "off":
+            _default_cache = None
+        elif setting.lower() == "memory":
+            from utils.cache import MemoryLRUCache
+            size = int(os.getenv("NOISE_SIGNAL_ANALYSIS_CACHE_SIZE") or 512)
+            _default_cache = AnalysisCache(MemoryLRUCache(max_entries=size))
+        else:
+            _default_cache = AnalysisCache.sqlite(setting)
+        _default_cache_ready = True
+        return _default_cache
+
+# ------------------------- Profiling ----------------------------------------
+StageCallback = Callable[[str, Dict[str, float]], None]
+
+def _unprofiled(stage: str, fn: Callable, *args):
+    return fn(*args)
+
+class StageProfiler:
+    """
+    Per-stage measurements for analyze_document(profile=...).
+
+    Each stage records its exclusive wall time in ms (a nested stage, such as
+    the word scan that modality, keywords and tickers share, is charged to
+    itself only) and `net_blocks`, the net change in allocated memory blocks
+    (sys.getallocatedblocks(), nested stages included): what the stage left
+    allocated, not how much it allocated, so it can be zero or negative.
+    While tracemalloc is tracing, the stage's peak traced KiB above its start
+    is added too, nested stages included. `callback(stage, record)` is
+    invoked as each stage finishes.
+    """
+
+    def __init__(self, callback: Optional[StageCallback] = None):
+        self.callback = callback
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._nested = [0.0]
+        # highest traced memory seen by each open stage before its nested
+        # stages reset tracemalloc's peak
+        self._peaks = [0]
+
+    def run(self, stage: str, fn: Callable, *args):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            base, peak = tracemalloc.get_traced_memory()
+            self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self._peaks.append(base)
+        blocks = sys.getallocatedblocks()
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            self._nested[-1] += elapsed
+            record = {"ms": round((elapsed - nested) * 1000, 3), "net_blocks": sys.getallocatedblocks() - blocks}
+            if tracing:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                self._peaks[-1] = max(self._peaks[-1], peak)  # the enclosing stage's peak includes this one
+                record["peak_kib"] = round((peak - base) / 1024, 1)
+            prev = self.stages.get(stage)
+            if prev is not None:  # a stage run twice reports the sum
+                record = {k: round(v + prev.get(k, 0), 3) for k, v in record.items()}
+            self.stages[stage] = record
+            if self.callback is not None:
+                self.callback(stage, record)
+
+    def report(self) -> Dict[str, Any]:
+        return {"total_ms": round(sum(r["ms"] for r in self.stages.values()), 3), "stages": dict(self.stages)}
+
 # ------------------------- Core API -----------------------------------------
-def analyze_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+# Top-level analysis:v1 keys after schema/meta, and the facts sub-keys, in
+# serialization order. `fields=` accepts either level ("facts" or "facts.dates").
+ANALYSIS_FIELDS = ("stats", "sections", "facts", "quotes", "modality", "keywords", "hash", "version")
+FACT_FIELDS = ("dates", "money", "percents", "numbers", "tickers", "entities")
+
+class _TextAnalysis:
     """
-    document:v1 -> analysis:v1
+    Per-field extractors over one normalized text. Each field is computed on
+    first request and memoized, so asking for a subset never pays for the rest.
     """
-    validate_document(doc)
 
-    raw_text = doc["content"]["text"]
-    text = _normalize_text(raw_text)
-    sections = _split_sections(text)
-    words = len(text.split())
-
-    analysis = {
-        "schema": "analysis:v1",
-        "meta": {
-            "title": (doc.get("meta") or {}).get("title"),
-            "url": (doc.get("meta") or {}).get("url"),
-            "source_created_at": (doc.get("meta") or {}).get("created_at"),
-            "analyzed_at": _now_iso(),
-        },
-        "stats": {
+    def __init__(
+        self,
+        text: str,
+        text_hash: str,
+        profiler: Optional[StageProfiler] = None,
+        layout: Optional[str] = None,
+    ):
+        self.text = text
+        # the same text with paragraph breaks kept as "\n", for sectioning
+        self.layout = text if layout is None else layout
+        self.text_hash = text_hash
+        self._memo: Dict[str, Any] = {}
+        self._scan: Optional[_WordScan] = None
+        self._run = profiler.run if profiler is not None else _unprofiled
+
+    @property
+    def scan(self) -> _WordScan:
+        if self._scan is None:
+            self._scan = self._run("scan", _scan_words, self.text)
+        return self._scan
+
+    def field(self, name: str) -> Any:
+        if name not in self._memo:
+            self._memo[name] = self._run(name, getattr(self, "_f_" + name.replace(".", "_")))
+        return self._memo[name]
+
+    def _f_stats(self) -> Dict[str, Any]:
+        text = self.text
+        words = len(text.split())
+        return {
             "chars": len(text),
             "words": words,
             "lines": len(text.splitlines()),
             "reading_minutes": round(words/230.0, 2),
-        },
-        "sections": sections,
-        "facts": _fact_pack(text),
-        "quotes": _pull_quotes(text),
-        "modality": _modality_scores(text),
-        "keywords": _keyword_top(text, k=12),
-        "hash": _sha256(text),
-        "version": ANALYSIS_VERSION,
+        }
+
+    def _f_sections(self): return _split_sections(self.layout)
+    def _f_quotes(self): return _pull_quotes(self.text)
+    def _f_modality(self): return _modality_result(self.scan.hedges, self.scan.commits)
+    def _f_keywords(self): return _rank_keywords(self.scan.keywords, k=12)
+    def _f_hash(self): return self.text_hash
+    def _f_version(self): return ANALYSIS_VERSION
+    def _f_facts_dates(self): return _pull_dates(self.text)
+    def _f_facts_money(self): return list(dict.fromkeys(RE_MONEY.findall(self.text)))
+    def _f_facts_percents(self): return list(dict.fromkeys(RE_PERCENT.findall(self.text)))
+    def _f_facts_numbers(self): return list(dict.fromkeys(RE_NUMBER.findall(self.text)))
+    def _f_facts_tickers(self): return _ticker_filter(self.scan.tickers)
+    def _f_facts_entities(self): return _pull_entities_light(self.text)
+
+    def body(self, fields: Optional[Dict[str, Optional[tuple]]] = None) -> Dict[str, Any]:
+        """Text-derived analysis:v1 keys; `fields` comes from _parse_fields."""
+        out: Dict[str, Any] = {}
+        for name in ANALYSIS_FIELDS:
+            if fields is not None and name not in fields:
+                continue
+            if name == "facts":
+                subset = fields.get("facts") if fields is not None else None
+                out["facts"] = {f: self.field("facts." + f) for f in FACT_FIELDS if subset is None or f in subset}
+            else:
+                out[name] = self.field(name)
+        return out
+
+def _parse_fields(fields: Optional[Iterable[str]]) -> Optional[Dict[str, Optional[tuple]]]:
+    # -> {top-level field: None (all of it) or tuple of facts sub-fields}
+    if fields is None:
+        return None
+    parsed: Dict[str, Any] = {}
+    for name in fields:
+        top, _, sub = name.partition(".")
+        _require(top in ANALYSIS_FIELDS, f"unknown analysis field: {name!r}")
+        if not sub:
+            parsed[top] = None
+            continue
+        _require(top == "facts" and sub in FACT_FIELDS, f"unknown analysis field: {name!r}")
+        if top not in parsed:
+            parsed[top] = ()
+        if parsed[top] is not None:
+            parsed[top] += (sub,)
+    if parsed.get("facts") is not None and set(parsed["facts"]) == set(FACT_FIELDS):
+        parsed["facts"] = None
+    return parsed
+
+def _analyze_text(text: str, text_hash: str, layout: Optional[str] = None) -> Dict[str, Any]:
+    # everything in analysis:v1 that depends only on the normalized text
+    return _TextAnalysis(text, text_hash, layout=layout).body()
+
+def analysis_meta(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """The analysis:v1 `meta` of a document, stamped now."""
+    meta = doc.get("meta") or {}
+    return {
+        "title": meta.get("title"),
+        "url": meta.get("url"),
+        "source_created_at": meta.get("created_at"),
+        "analyzed_at": _now_iso(),
     }
+
+def analyze_document(
+    doc: Dict[str, Any],
+    cache: Optional[AnalysisCache] = None,
+    fields: Optional[Iterable[str]] = None,
+    profile: Union[bool, StageCallback, None] = None,
+) -> Dict[str, Any]:
+    """
+    document:v1 -> analysis:v1
+
+    With `cache`, documents whose normalized text was analyzed before reuse the
+    stored result and only get fresh `meta`.
+
+    `fields` limits the output to the named keys (schema and meta are always
+    present), e.g. ("sections", "keywords", "facts.tickers"); extractors behind
+    the other keys never run. Omit it for the full analysis:v1. Partial results
+    are served from the cache but never written to it.
+
+    `profile=True` adds a "timings" block (see StageProfiler) after the
+    analysis:v1 keys; a callable instead receives (stage, record) per stage.
+    Stages are normalize, sha256, cache, scan and one per output field
+    ("sections", "facts.dates", ...). Off by default, at no measurable cost.
+    """
+    validate_document(doc)
+    selected = _parse_fields(fields)
+    full = selected is None or (len(selected) == len(ANALYSIS_FIELDS) and all(v is None for v in selected.values()))
+    profiler = StageProfiler(profile if callable(profile) else None) if profile else None
+    run = profiler.run if profiler is not None else _unprofiled
+
+    raw_text = doc["content"]["text"]
+    paragraphs = run("normalize", _normalize_paragraphs, raw_text)
+    text = " ".join(paragraphs)
+    text_hash = run("sha256", _sha256, text)
+    layout = "\n".join(paragraphs)
+    # sections follow paragraph breaks, which the text hash does not see
+    cache_key = text_hash if len(paragraphs) <= 1 else _sha256(layout)
+
+    body = run("cache", cache.get, cache_key) if cache is not None else None
+    if body is None:
+        extraction = _TextAnalysis(text, text_hash, profiler, layout)
+        if full:
+            body = extraction.body()
+            if cache is not None:
+                cache.put(cache_key, body)
+        else:
+            body = extraction.body(selected)
+    elif not full:
+        body = {k: v for k, v in body.items() if k in selected}
+        if selected.get("facts") is not None:
+            body["facts"] = {k: v for k, v in body["facts"].items() if k in selected["facts"]}
+
+    analysis = {"schema": "analysis:v1", "meta": analysis_meta(doc), **body}
+    if profile is True:
+        analysis["timings"] = profiler.report()
     return analysis
 
+# ------------------------- Batch API ----------------------------------------
+def _analyze_chunk(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # module-level so worker processes can unpickle it
+    return [analyze_document(d) for d in docs]
+
+def analyze_documents(
+    docs: Iterable[Dict[str, Any]],
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    ordered: bool = True,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterable of document:v1 -> iterator of analysis:v1, fanned out over a process pool.
+
+    Args:
+        docs: document:v1 dicts; consumed lazily, so generators over large files work.
+        workers: pool size (default: os.cpu_count()). 1 analyzes inline without a pool.
+        chunksize: documents per task sent to a worker.
+        ordered: yield in input order; False yields chunks as they complete
+            (correlate via meta.url/meta.title).
+        max_in_flight: chunks submitted but not yet yielded (default: 2 * workers).
+            Bounds memory to roughly max_in_flight * chunksize documents.
+
+    The first failing document raises its ValueError here and stops the batch.
+    """
+    _require(chunksize >= 1, "chunksize must be >= 1")
+    workers = workers or os.cpu_count() or 1
+    it = iter(docs)
+    if workers == 1:
+        for doc in it:
+            yield analyze_document(doc)
+        return
+
+    limit = max(max_in_flight or 2 * workers, 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < limit:
+                    chunk = list(islice(it, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_analyze_chunk, chunk))
+                if not pending:
+                    return
+                if ordered:
+                    done = pending.popleft()
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = next(f for f in pending if f in finished)
+                    pending.remove(done)
+                yield from done.result()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
 # ------------------------- CLI ----------------------------------------------
 # Usage:
 #   cat doc.json | python nlp_layer.py
 #   python nlp_layer.py --in doc.json --out analysis.json
+#   python nlp_layer.py --jsonl --in docs.jsonl --out analyses.jsonl --workers 8
+def _read_jsonl(handle) -> Iterator[Dict[str, Any]]:
+    for line in handle:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    # nearest-rank
+    idx = max(0, min(len(sorted_vals) - 1, int(round(q / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[idx]
+
+def profile_report(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """{stage: [ms, ...]} -> {stage: n, mean and p50/p90/p99/max in ms}, slowest p50 first."""
+    out = {}
+    for stage, vals in samples.items():
+        vals = sorted(vals)
+        out[stage] = {
+            "n": len(vals),
+            "mean_ms": round(sum(vals) / len(vals), 3),
+            "p50_ms": _percentile(vals, 50),
+            "p90_ms": _percentile(vals, 90),
+            "p99_ms": _percentile(vals, 99),
+            "max_ms": vals[-1],
+        }
+    return dict(sorted(out.items(), key=lambda kv: kv[1]["p50_ms"], reverse=True))
+
+def _profile_jsonl(src, dst) -> Dict[str, Dict[str, float]]:
+    # inline on purpose: per-stage timings from pool workers would include contention
+    samples: Dict[str, List[float]] = {}
+    for doc in _read_jsonl(src):
+        analysis = analyze_document(doc, profile=True)
+        timings = analysis.pop("timings")
+        samples.setdefault("total", []).append(timings["total_ms"])
+        for stage, record in timings["stages"].items():
+            samples.setdefault(stage, []).append(record["ms"])
+        if dst is not None:
+            dst.write(json.dumps(analysis, ensure_ascii=False) + "\n")
+    return profile_report(samples)
+
 def _cli():
     import argparse
     ap = argparse.ArgumentParser(description="document:v1 -> analysis:v1 (LLM-free)")
     ap.add_argument("--in", dest="inpath", help="Path to document:v1 JSON; omit to read STDIN")
     ap.add_argument("--out", dest="outpath", help="Write analysis JSON to file; omit to STDOUT")
+    ap.add_argument("--jsonl", action="store_true", help="Input is one document:v1 per line; output is one analysis:v1 per line")
+    ap.add_argument("--workers", type=int, default=None, help="Processes for --jsonl (default: CPU count)")
+    ap.add_argument("--chunksize", type=int, default=8, help="Documents per worker task for --jsonl")
+    ap.add_argument("--unordered", action="store_true", help="With --jsonl, write results as they complete")
+    ap.add_argument("--profile", action="store_true",
+                    help="Per-stage timings: adds a timings block; with --jsonl, prints per-stage percentiles "
+                         "(analyses go to --out only, analyzed inline)")
     args = ap.parse_args()
 
+    if args.jsonl and args.profile:
+        src = open(args.inpath, "r", encoding="utf-8") if args.inpath else sys.stdin
+        dst = open(args.outpath, "w", encoding="utf-8") if args.outpath else None
+        try:
+            report = _profile_jsonl(src, dst)
+        finally:
+            if args.inpath: src.close()
+            if dst is not None: dst.close()
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    if args.jsonl:
+        src = open(args.inpath, "r", encoding="utf-8") if args.inpath else sys.stdin
+        dst = open(args.outpath, "w", encoding="utf-8") if args.outpath else sys.stdout
+        n = 0
+        try:
+            for analysis in analyze_documents(_read_jsonl(src), workers=args.workers,
+                                              chunksize=args.chunksize, ordered=not args.unordered):
+                dst.write(json.dumps(analysis, ensure_ascii=False) + "\n")
+                n += 1
+        finally:
+            if args.inpath: src.close()
+            if args.outpath: dst.close()
+        if args.outpath:
+            print(f"[nlp] wrote {n} analyses to {args.outpath}")
+        return
+
     raw = sys.stdin.read() if not args.inpath else open(args.inpath, "r", encoding="utf-8").read()
     doc = json.loads(raw)
-    analysis = analyze_document(doc)
+    analysis = analyze_document(doc, profile=args.profile or None)
 
     if args.outpath:
         with open(args.outpath, "w", encoding="utf-8") as f:
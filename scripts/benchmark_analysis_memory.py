@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nlp_layer
+from nlp.compact import CompactAnalysis, MsgpackUnavailableError
+from scripts.benchmark_nlp import synthetic_document
+
+
+def retained_bytes(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by build()'s return value once it has been built."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def per_call_us(fn: Callable[[Any], Any], items: List[Any]) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return round((time.perf_counter() - start) * 1e6 / len(items), 2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Memory held by analysis:v1 dicts vs nlp.compact.CompactAnalysis.")
+    parser.add_argument("--docs", type=int, default=1000, help="Analyses kept in memory.")
+    parser.add_argument("--words", nargs="+", type=int, default=[800, 3000], help="Synthetic article sizes to cycle through.")
+    args = parser.parse_args()
+
+    analyses = [
+        nlp_layer.analyze_document(synthetic_document(args.words[i % len(args.words)], seed=i))
+        for i in range(args.docs)
+    ]
+    blobs = [json.dumps(a, ensure_ascii=False) for a in analyses]
+
+    for analysis in analyses[:50]:
+        if CompactAnalysis.from_dict(analysis).to_dict() != analysis:
+            print("[bench] to_dict(from_dict(a)) != a", file=sys.stderr)
+            return 1
+
+    # rebuild from JSON inside each measurement so nothing is shared with `analyses`
+    rows: Dict[str, Any] = {
+        "dict": retained_bytes(lambda: [json.loads(b) for b in blobs]),
+        "compact": retained_bytes(lambda: [CompactAnalysis.from_dict(json.loads(b)) for b in blobs]),
+        "json_str": sys.getsizeof(blobs) + sum(sys.getsizeof(b) for b in blobs),
+    }
+    compact = [CompactAnalysis.from_dict(a) for a in analyses]
+    timings = {
+        "from_dict_us": per_call_us(CompactAnalysis.from_dict, analyses),
+        "to_dict_us": per_call_us(CompactAnalysis.to_dict, compact),
+        "json_loads_us": per_call_us(json.loads, blobs),
+    }
+    try:
+        packed = [c.to_msgpack() for c in compact]
+        rows["msgpack_bytes"] = sys.getsizeof(packed) + sum(sys.getsizeof(p) for p in packed)
+        timings["to_msgpack_us"] = per_call_us(CompactAnalysis.to_msgpack, compact)
+        timings["from_msgpack_us"] = per_call_us(CompactAnalysis.from_msgpack, packed)
+        if CompactAnalysis.from_msgpack(packed[0]).to_dict() != analyses[0]:
+            print("[bench] msgpack round-trip mismatch", file=sys.stderr)
+            return 1
+    except MsgpackUnavailableError as exc:
+        rows["msgpack_bytes"] = None
+        print(f"[bench] {exc}", file=sys.stderr)
+
+    report = {
+        "docs": args.docs,
+        "words": args.words,
+        "retained_kib": {k: round(v / 1024, 1) if v is not None else None for k, v in rows.items()},
+        "compact_vs_dict": round(rows["compact"] / rows["dict"], 3),
+        "per_analysis": timings,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""/api/analyze throughput under bursts of identical requests, with and without coalescing.
+
+Runs the API (uvicorn, in-process) against the stub chat-completions server
+(scripts/stub_llm_server.py), so it needs no network. Each burst sends
+--dupes identical requests for each of --articles synthetic articles at once,
+the way a viral article reaches the backend; every mode gets articles of its
+own so no cache is warm:
+
+    python scripts/benchmark_api.py --articles 4 --dupes 25 --latency-ms 800
+
+Reported per mode: wall time, requests/s, latency percentiles and how many
+completions the stub served.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.benchmark_nlp import synthetic_document
+from scripts.stub_llm_server import StubConfig, StubHandler, start_server
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_api(port: int) -> Any:
+    import uvicorn
+
+    from api.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def burst(base_url: str, payloads: List[Dict[str, Any]], dupes: int) -> Dict[str, Any]:
+    import httpx
+
+    requests = [payload for payload in payloads for _ in range(dupes)]
+    latencies: List[float] = []
+    run_ids = set()
+    coalesced = 0
+
+    with httpx.Client(base_url=base_url, timeout=300, limits=httpx.Limits(max_connections=len(requests))) as client:
+        def one(payload: Dict[str, Any]) -> None:
+            nonlocal coalesced
+            start = time.perf_counter()
+            response = client.post("/api/analyze", json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+            body = response.json()
+            run_ids.add(body["id"])
+            coalesced += bool(body["meta"].get("coalesced"))
+
+        before = StubHandler.requests
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+            list(pool.map(one, requests))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(requests),
+        "wall_s": round(wall, 2),
+        "requests_per_s": round(len(requests) / wall, 1),
+        "p50_s": round(latencies[len(latencies) // 2], 2),
+        "p95_s": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "llm_calls": StubHandler.requests - before,
+        "coalesced_responses": coalesced,
+        "distinct_run_ids": len(run_ids),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="/api/analyze under bursts of duplicate requests.")
+    parser.add_argument("--articles", type=int, default=4)
+    parser.add_argument("--dupes", type=int, default=25, help="Identical requests per article in a burst.")
+    parser.add_argument("--words", type=int, default=1500)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Stub time to first token.")
+    parser.add_argument("--tokens-per-s", type=float, default=200.0)
+    args = parser.parse_args()
+
+    stub = start_server(StubConfig(latency_s=args.latency_ms / 1000, token_s=1 / args.tokens_per_s))
+    workdir = tempfile.mkdtemp(prefix="bench-api-")
+    os.environ.update(
+        NOISE_SIGNAL_LLM_PROVIDER="openai",
+        NOISE_SIGNAL_LLM_BASE_URL=f"http://127.0.0.1:{stub.server_address[1]}/v1",
+        NOISE_SIGNAL_DB=os.path.join(workdir, "runs.db"),
+        NOISE_SIGNAL_SUMMARY_CACHE="memory",
+    )
+    os.environ.pop("EXTENSION_API_TOKEN", None)
+    port = _free_port()
+    api = _start_api(port)
+
+    report: Dict[str, Any] = {"articles": args.articles, "dupes": args.dupes, "latency_ms": args.latency_ms}
+    for offset, (mode, setting) in enumerate((("independent", "0"), ("coalesced", "1"))):
+        os.environ["NOISE_SIGNAL_COALESCE"] = setting
+        payloads = []
+        for i in range(args.articles):
+            document = synthetic_document(args.words, seed=1000 * (offset + 1) + i)
+            payloads.append({"text": document["content"]["text"], "title": f"article {i}", "save": True})
+        report[mode] = burst(f"http://127.0.0.1:{port}", payloads, args.dupes)
+    report["throughput_gain"] = round(
+        report["coalesced"]["requests_per_s"] / report["independent"]["requests_per_s"], 2
+    )
+
+    api.should_exit = True
+    stub.shutdown()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
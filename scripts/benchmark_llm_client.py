@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Per-call latency of a fresh Groq() client per call vs the pooled utils.llm_clients client.
+
+Both run against the local stub server (scripts/stub_llm_server.py), so the numbers cover
+client construction, connection setup and the TLS handshake (self-signed
+certificate; --no-tls for plain HTTP), without any model time:
+
+    python scripts/benchmark_llm_client.py --calls 200 --threads 8
+
+--fanout N also times N summaries sent one by one with the pooled sync client
+against N sent from one event loop with AsyncGroq (async_semaphore() limits
+how many are in flight); use --latency-ms to stand in for model time.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.stub_llm_server import StubConfig, StubHandler, start_server
+from utils.llm_clients import aclose_async_clients, async_semaphore, close_clients, get_async_groq_client, get_groq_client
+
+
+def _self_signed(workdir: str) -> Optional[Dict[str, str]]:
+    cert, key = os.path.join(workdir, "cert.pem"), os.path.join(workdir, "key.pem")
+    try:
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=localhost", "-addext", "subjectAltName=IP:127.0.0.1",
+             "-keyout", key, "-out", cert],
+            check=True, capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {"cert": cert, "key": key}
+
+
+def _call(client: Any) -> None:
+    client.chat.completions.create(
+        model="mock",
+        messages=[{"role": "user", "content": "ping"}],
+        temperature=0.2,
+        max_tokens=800,
+    )
+
+
+def fresh_call() -> None:
+    # what llm_layer._run_llm did before: a new client, and pool, per call
+    from groq import Groq
+
+    client = Groq(api_key=os.environ["GROQ_API_KEY"])
+    try:
+        _call(client)
+    finally:
+        client.close()
+
+
+def pooled_call() -> None:
+    _call(get_groq_client())
+
+
+def fanout(calls: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    for _ in range(calls):
+        pooled_call()
+    sequential = time.perf_counter() - start
+
+    async def _one() -> None:
+        async with async_semaphore():
+            await get_async_groq_client().chat.completions.create(
+                model="mock",
+                messages=[{"role": "user", "content": "ping"}],
+                temperature=0.2,
+                max_tokens=800,
+            )
+
+    async def _all() -> float:
+        begin = time.perf_counter()
+        await asyncio.gather(*(_one() for _ in range(calls)))
+        elapsed = time.perf_counter() - begin
+        await aclose_async_clients()
+        return elapsed
+
+    concurrent = asyncio.run(_all())
+    return {
+        "calls": calls,
+        "sync_sequential_s": round(sequential, 2),
+        "async_gather_s": round(concurrent, 2),
+        "speedup": round(sequential / concurrent, 1),
+    }
+
+
+def measure(fn: Callable[[], None], calls: int, threads: int) -> Dict[str, Any]:
+    before = StubHandler.connections
+    latencies: List[float] = []
+
+    def one(_: int) -> None:
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(calls)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "calls_per_s": round(calls / wall, 1),
+        "connections": StubHandler.connections - before,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fresh vs pooled Groq client latency against a local mock server.")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated server time per completion.")
+    parser.add_argument("--no-tls", action="store_true", help="Plain HTTP instead of a self-signed TLS endpoint.")
+    parser.add_argument("--fanout", type=int, default=0, help="Also compare N sequential sync calls with N async calls.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pem = None if args.no_tls else _self_signed(workdir)
+        if not args.no_tls and pem is None:
+            print("[bench] openssl not available; falling back to plain HTTP", file=sys.stderr)
+        server = start_server(StubConfig(latency_s=args.latency_ms / 1000, reply="ok"), pem=pem)
+        scheme = "https" if pem else "http"
+        os.environ["GROQ_BASE_URL"] = f"{scheme}://127.0.0.1:{server.server_address[1]}"
+        os.environ["GROQ_API_KEY"] = "mock-key"
+        if pem:
+            os.environ["SSL_CERT_FILE"] = pem["cert"]  # trusted by httpx when it builds its SSL context
+
+        pooled_call()  # warm the import and the first connection for both modes
+        fresh_call()
+        runs = []
+        for threads in args.threads:
+            fresh = measure(fresh_call, args.calls, threads)
+            pooled = measure(pooled_call, args.calls, threads)
+            runs.append({
+                "threads": threads,
+                "fresh_client": fresh,
+                "pooled_client": pooled,
+                "p50_speedup": round(fresh["p50_ms"] / pooled["p50_ms"], 2) if pooled["p50_ms"] else None,
+            })
+        report: Dict[str, Any] = {"calls": args.calls, "tls": bool(pem), "latency_ms": args.latency_ms, "runs": runs}
+        if args.fanout:
+            report["fanout"] = fanout(args.fanout)
+        close_clients()
+        server.shutdown()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
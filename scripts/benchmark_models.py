@@ -9,7 +9,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from evaluation.metrics_schema import EvaluationConfig
-from evaluation.runner import run_batch_evaluation
+from evaluation.runner import dataset_documents, prefetch_summaries, run_batch_evaluation
+from main import run_nlp
 
 
 def main() -> int:
@@ -25,13 +26,18 @@ def main() -> int:
     parser.add_argument("--with-factcc", action="store_true")
     parser.add_argument("--stability-runs", type=int, default=1)
     parser.add_argument("--carbon-dir", default="artifacts/evaluation")
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Generate every variant of each article up front, concurrently, and skip generation carbon tracking.",
+    )
     args = parser.parse_args()
 
-    outputs = []
+    configs = []
     for provider, provider_model, model_name, tier, length in product(
         args.providers, args.models, args.model_names, args.tiers, args.lengths
     ):
-        config = EvaluationConfig(
+        configs.append(EvaluationConfig(
             tier=tier,
             output_format="text",
             length=length,
@@ -42,9 +48,17 @@ def main() -> int:
             summac_model=args.summac_model,
             stability_runs=max(args.stability_runs, 1),
             carbon_output_dir=args.carbon_dir,
-        )
+            track_generation_carbon=not args.prefetch,
+        ))
+    if args.prefetch:
+        analyses = [run_nlp(document) for document in dataset_documents(args.dataset)]
+        prefetch_summaries(analyses, configs)
+
+    outputs = []
+    for config in configs:
+        provider, provider_model = config.provider, config.provider_model
         model_slug = provider_model or "default"
-        run_dir = f"{args.outdir}/{provider}_{model_slug}_{model_name}_{tier}_{length}"
+        run_dir = f"{args.outdir}/{provider}_{model_slug}_{config.model_name}_{config.tier}_{config.length}"
         result = run_batch_evaluation(
             dataset_path=args.dataset,
             config=config,
@@ -53,10 +67,10 @@ def main() -> int:
         outputs.append(
             {
                 "provider": provider,
-                "provider_model": provider_model or None,
-                "model_name": model_name,
-                "tier": tier,
-                "length": length,
+                "provider_model": provider_model,
+                "model_name": config.model_name,
+                "tier": config.tier,
+                "length": config.length,
                 "paths": result,
             }
         )
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import nlp_layer
+from adapter_input import to_document
+from scripts import nlp_layer_baseline
+
+
+RESULTS_VERSION = "nlp-bench:1"
+
+SENTENCES = [
+    "The Federal Reserve Board said on March 18, 2025 that it will hold the policy rate at 4.25 percent.",
+    "Officials noted that inflation may ease to around 2.4% by 2026-06-30 if energy prices stay flat.",
+    "\"We are prepared to adjust the stance of monetary policy as appropriate,\" the Chair told reporters.",
+    "Apple Inc. reported revenue of $94,930 million, up 6% from a year earlier, while AAPL rose 3.1%.",
+    "The Department of Labor estimate suggests payrolls could increase by 150,000 in the next report.",
+    "Analysts at Goldman Sachs Bank expect the committee to approve two cuts, though timing is unlikely to be settled before Sep 17, 2025.",
+    "Treasury yields fell 12 basis points as the United States sold US$58 billion of ten-year notes.",
+    "Management confirms it will repurchase up to USD 10,000,000 of shares and reduces its capital budget.",
+    "The European Central Bank might follow, according to minutes released by the Ministry of Finance.",
+    "Shares of NVDA and MSFT were little changed, with volume about 1,250 contracts above average.",
+]
+
+
+def synthetic_document(words: int, seed: int = 0) -> Dict[str, Any]:
+    """Finance/policy flavoured document:v1 with roughly `words` words."""
+    rng = random.Random(seed)
+    paragraphs: List[str] = []
+    count = 0
+    while count < words:
+        para = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 6)))
+        paragraphs.append(para)
+        count += len(para.split())
+    return to_document(text="\n\n".join(paragraphs), title=f"Synthetic {words}-word article")
+
+
+def load_corpus(path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """document:v1 list from a JSONL of scraper records (articles_raw.jsonl) or document:v1."""
+    docs: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("schema") == "document:v1":
+                docs.append(record)
+            elif record.get("text"):
+                docs.append(to_document(text=record["text"], title=record.get("title"), url=record.get("url")))
+            if limit is not None and len(docs) >= limit:
+                break
+    return docs
+
+
+def analyze_per_extractor(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Output reference for analyze_document: today's extractors, each scanning
+    the normalized text on its own instead of sharing the fused word scan.
+    Its timing isolates that fusion only; "analyze_baseline" (the frozen
+    pre-series pipeline in nlp_layer_baseline) is the before of the series.
+    """
+    nlp_layer.validate_document(doc)
+    paragraphs = nlp_layer._normalize_paragraphs(doc["content"]["text"])
+    text = " ".join(paragraphs)
+    words = len(text.split())
+    return {
+        "schema": "analysis:v1",
+        "meta": {},
+        "stats": {
+            "chars": len(text),
+            "words": words,
+            "lines": len(text.splitlines()),
+            "reading_minutes": round(words / 230.0, 2),
+        },
+        "sections": nlp_layer._split_sections("\n".join(paragraphs)),
+        "facts": nlp_layer._fact_pack(text),
+        "quotes": nlp_layer._pull_quotes(text),
+        "modality": nlp_layer._modality_scores(text),
+        "keywords": nlp_layer._keyword_top(text, k=12),
+        "hash": nlp_layer._sha256(text),
+        "version": nlp_layer.ANALYSIS_VERSION,
+    }
+
+
+def _comparable(analysis: Dict[str, Any]) -> str:
+    body = {k: v for k, v in analysis.items() if k != "meta"}
+    return json.dumps(body, ensure_ascii=False, sort_keys=True)
+
+
+def docs_per_sec(fn: Callable[[Dict[str, Any]], Any], doc: Dict[str, Any], min_seconds: float) -> float:
+    fn(doc)  # warm-up
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn(doc)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return runs / elapsed
+
+
+# ---------- extractors ----------
+# Each benchmark target takes the document:v1 ("doc"), its raw text ("raw"),
+# or its normalized text as one line ("text") or one line per paragraph
+# ("layout"), so normalization is only timed where it is the target.
+
+Target = Tuple[str, Callable[[Any], Any]]
+
+
+def _nlp_layer_targets() -> Dict[str, Target]:
+    return {
+        "analyze_document": ("doc", nlp_layer.analyze_document),
+        "analyze_per_extractor": ("doc", analyze_per_extractor),
+        "analyze_baseline": ("doc", nlp_layer_baseline.analyze_document),
+        "normalize_text": ("raw", nlp_layer._normalize_text),
+        "split_sections": ("layout", nlp_layer._split_sections),
+        "scan_words": ("text", nlp_layer._scan_words),
+        "facts.dates": ("text", nlp_layer._pull_dates),
+        "facts.money": ("text", nlp_layer.RE_MONEY.findall),
+        "facts.percents": ("text", nlp_layer.RE_PERCENT.findall),
+        "facts.numbers": ("text", nlp_layer.RE_NUMBER.findall),
+        "facts.tickers": ("text", nlp_layer.RE_TICKER.findall),
+        "facts.entities": ("text", nlp_layer._pull_entities_light),
+        "quotes": ("text", nlp_layer._pull_quotes),
+        "fact_pack": ("text", nlp_layer._fact_pack),
+        "modality_scores": ("text", nlp_layer._modality_scores),
+        "keyword_top": ("text", nlp_layer._keyword_top),
+    }
+
+
+def load_targets() -> Tuple[Dict[str, Target], Dict[str, str]]:
+    """Benchmark targets by name, plus {name: reason} for optional ones that cannot load."""
+    targets = _nlp_layer_targets()
+    skipped: Dict[str, str] = {}
+
+    try:
+        from nlp.sentiment import sentiment_scores
+        targets["sentiment.sentiment_scores"] = ("text", sentiment_scores)
+    except Exception as exc:  # vaderSentiment is optional here
+        skipped["sentiment.sentiment_scores"] = f"{type(exc).__name__}: {exc}"
+
+    # ner_linking reads data/symbols.csv relative to the working directory
+    cwd = os.getcwd()
+    try:
+        os.chdir(ROOT)
+        from nlp import ner_linking
+        targets["ner_linking.link_text_to_tickers"] = ("text", ner_linking.link_text_to_tickers)
+        if ner_linking._nlp is None:
+            skipped["ner_linking.extract_orgs"] = "spaCy model en_core_web_sm not installed; timing the fallback"
+    except Exception as exc:
+        skipped["ner_linking.link_text_to_tickers"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        os.chdir(cwd)
+    return targets, skipped
+
+
+def time_target(fn: Callable[[Any], Any], inputs: List[Any], min_seconds: float) -> Dict[str, float]:
+    """Runs `fn` over all inputs until min_seconds elapse; per-document ms and docs/sec."""
+    for item in inputs:  # warm-up
+        fn(item)
+    runs, start = 0, time.perf_counter()
+    while True:
+        for item in inputs:
+            fn(item)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            docs = runs * len(inputs)
+            return {"ms_per_doc": round(elapsed * 1000 / docs, 4), "docs_per_sec": round(docs / elapsed, 2)}
+
+
+def run_case(
+    docs: List[Dict[str, Any]],
+    targets: Dict[str, Target],
+    min_seconds: float,
+    only: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    inputs = {
+        "doc": docs,
+        "raw": [d["content"]["text"] for d in docs],
+        "text": [nlp_layer._normalize_text(d["content"]["text"]) for d in docs],
+        "layout": ["\n".join(nlp_layer._normalize_paragraphs(d["content"]["text"])) for d in docs],
+    }
+    results = {}
+    for name, (kind, fn) in targets.items():
+        if only and name not in only:
+            continue
+        results[name] = time_target(fn, inputs[kind], min_seconds)
+    return {
+        "docs": len(docs),
+        "words": sum(len(t.split()) for t in inputs["text"]),
+        "extractors": results,
+    }
+
+
+def check_outputs(docs: List[Dict[str, Any]]) -> Optional[str]:
+    """analyze_document must match the per-extractor reference; returns the first mismatch."""
+    for doc in docs:
+        if _comparable(analyze_per_extractor(doc)) != _comparable(nlp_layer.analyze_document(doc)):
+            return (doc.get("meta") or {}).get("title") or "untitled document"
+    return None
+
+
+# ---------- baseline comparison ----------
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """One row per (case, extractor) present in both runs; `regressed` past 1 + tolerance."""
+    rows = []
+    for case, current in results["cases"].items():
+        base_case = baseline.get("cases", {}).get(case)
+        if not base_case:
+            continue
+        for name, timing in current["extractors"].items():
+            base = base_case["extractors"].get(name)
+            if not base or not base.get("ms_per_doc"):
+                continue
+            ratio = timing["ms_per_doc"] / base["ms_per_doc"]
+            rows.append(
+                {
+                    "case": case,
+                    "extractor": name,
+                    "baseline_ms": base["ms_per_doc"],
+                    "ms": timing["ms_per_doc"],
+                    "ratio": round(ratio, 3),
+                    "regressed": ratio > 1.0 + tolerance,
+                }
+            )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for nlp_layer, nlp/sentiment.py and nlp/ner_linking.py.")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[1000, 10000, 100000], help="Synthetic article sizes in words.")
+    parser.add_argument("--corpus", nargs="*", default=[], help="JSONL corpora to replay (scraper records or document:v1).")
+    parser.add_argument("--corpus-limit", type=int, default=None, help="Documents to read from each corpus.")
+    parser.add_argument("--only", nargs="*", default=None, help="Extractor names to time (default: all).")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum timing window per measurement.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write results JSON here (use it later as --baseline).")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline before failing (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    targets, skipped = load_targets()
+    cases: Dict[str, List[Dict[str, Any]]] = {}
+    for size in args.sizes:
+        cases[f"synthetic-{size}"] = [synthetic_document(size, seed=args.seed)]
+    for path in args.corpus:
+        cases[f"corpus:{Path(path).name}"] = load_corpus(path, args.corpus_limit)
+
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "analysis_version": nlp_layer.ANALYSIS_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "min_seconds": args.min_seconds,
+            "seed": args.seed,
+            "skipped": skipped,
+        },
+        "cases": {},
+    }
+    for case, docs in cases.items():
+        if not docs:
+            print(f"[bench] {case}: no documents, skipped", file=sys.stderr)
+            continue
+        mismatch = check_outputs(docs)
+        if mismatch is not None:
+            print(f"[bench] {case}: analyze_document differs from the per-extractor reference on {mismatch!r}", file=sys.stderr)
+            return 1
+        print(f"[bench] {case}: {len(docs)} document(s)", file=sys.stderr)
+        results["cases"][case] = run_case(docs, targets, args.min_seconds, args.only)
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[bench] wrote {out}", file=sys.stderr)
+
+    if not args.baseline:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    rows = compare(results, baseline, args.tolerance)
+    print(json.dumps(rows, ensure_ascii=False, indent=2))
+    regressions = [r for r in rows if r["regressed"]]
+    for r in regressions:
+        print(f"[bench] regression: {r['case']} {r['extractor']} {r['baseline_ms']} -> {r['ms']} ms ({r['ratio']}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
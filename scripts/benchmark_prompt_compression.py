@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Prompt tokens and coverage of the summary prompt: truncate vs extractive (nlp/compress.py).
+
+Tokens are estimated as in nlp_layer (4 characters per token). For each case:
+
+  * prompt_tokens: the full user prompt _build_prompt sends;
+  * sections_covered: share of analysis sections with text in the prompt body;
+  * figures_kept: share of the article's money and percent figures in the body.
+
+    python scripts/benchmark_prompt_compression.py --corpus data/articles_raw.jsonl
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import nlp_layer
+from llm_layer import _build_prompt
+from nlp.compress import select
+from scripts.benchmark_nlp import load_corpus, synthetic_document
+
+MODES = ("truncate", "extractive")
+
+
+def _body(prompt: str) -> str:
+    return prompt.split("\nTEXT:\n", 1)[1]
+
+
+def measure(analysis: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    facts = analysis.get("facts") or {}
+    figures = set(facts.get("money") or []) | set(facts.get("percents") or [])
+    sections = analysis.get("sections") or []
+    out = {}
+    for mode in MODES:
+        prompt = _build_prompt(analysis, "tier1", "text", "short", mode=mode)
+        body = _body(prompt)
+        covered = sum(
+            1 for s in sections if any(sentence in body for sentence in s["text"].split(". ") if len(sentence) > 20)
+        )
+        out[mode] = {
+            "prompt_tokens": nlp_layer._estimate_tokens(prompt),
+            "sections_covered": covered / len(sections) if sections else 1.0,
+            "figures_kept": sum(1 for f in figures if f in body) / len(figures) if figures else 1.0,
+        }
+    return out
+
+
+def summarize_case(rows: List[Dict[str, Dict[str, float]]]) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"docs": len(rows)}
+    for mode in MODES:
+        report[mode] = {
+            key: round(sum(r[mode][key] for r in rows) / len(rows), 3)
+            for key in ("prompt_tokens", "sections_covered", "figures_kept")
+        }
+    report["prompt_token_reduction"] = round(
+        1 - report["extractive"]["prompt_tokens"] / report["truncate"]["prompt_tokens"], 3
+    )
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Prompt-token reduction of extractive context selection.")
+    parser.add_argument("--sizes", nargs="*", type=int, default=[800, 3000, 10000], help="Synthetic article sizes in words.")
+    parser.add_argument("--corpus", nargs="*", default=[], help="JSONL corpora (scraper records or document:v1).")
+    parser.add_argument("--corpus-limit", type=int, default=None)
+    parser.add_argument("--seeds", type=int, default=5, help="Synthetic documents per size.")
+    args = parser.parse_args()
+
+    cases: Dict[str, List[Dict[str, Any]]] = {}
+    for size in args.sizes:
+        cases[f"synthetic-{size}"] = [synthetic_document(size, seed=seed) for seed in range(args.seeds)]
+    for path in args.corpus:
+        cases[f"corpus:{Path(path).name}"] = load_corpus(path, args.corpus_limit)
+
+    report: Dict[str, Any] = {}
+    for case, docs in cases.items():
+        if not docs:
+            print(f"[bench] {case}: no documents, skipped", file=sys.stderr)
+            continue
+        analyses = [nlp_layer.analyze_document(doc) for doc in docs]
+        report[case] = summarize_case([measure(a) for a in analyses])
+        report[case]["select_ms"] = round(_time_select(analyses) * 1000, 3)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+def _time_select(analyses: List[Dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    for analysis in analyses:
+        select(analysis)
+    return (time.perf_counter() - start) / len(analyses)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,16 +5,21 @@ Saves results to JSONL format for further processing.
 """
 
 import json
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from urllib.parse import urlparse
 
 import feedparser
 import trafilatura
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from nlp.dedup import DuplicateIndex, signature
+
 
 def get_project_root() -> Path:
     """Get the project root directory."""
@@ -101,7 +106,8 @@ def extract_article_text(url: str) -> str:
 def scrape_articles(
     feed_urls: List[str],
     output_path: Path,
-    max_articles: int = 500
+    max_articles: int = 500,
+    dedup_index: Optional[DuplicateIndex] = None,
 ) -> None:
     """
     Main scraping function that orchestrates the entire process.
@@ -110,7 +116,15 @@ def scrape_articles(
         feed_urls: List of RSS feed URLs
         output_path: Path to save JSONL output
         max_articles: Maximum number of articles to process
+        dedup_index: Near-duplicate index consulted before saving an article.
+            Defaults to the file at NOISE_SIGNAL_SCRAPER_DEDUP_INDEX, or an
+            index for this run only. Its refs are article URLs, so it is kept
+            apart from the API's NOISE_SIGNAL_DEDUP_INDEX (refs are run ids).
     """
+    index_path = None
+    if dedup_index is None:
+        index_path = os.getenv("NOISE_SIGNAL_SCRAPER_DEDUP_INDEX") or None
+        dedup_index = DuplicateIndex.load_or_new(index_path) if index_path else DuplicateIndex()
     print(f"\n📰 Starting news scraper...")
     print(f"Output will be saved to: {output_path}\n")
     
@@ -134,6 +148,7 @@ def scrape_articles(
     # Download and extract articles
     print(f"\nStep 3: Downloading and extracting articles...")
     saved_count = 0
+    duplicate_count = 0
     
     with open(output_path, "w") as f:
         for article in tqdm(articles, desc="Processing articles"):
@@ -145,6 +160,14 @@ def scrape_articles(
             text = extract_article_text(url)
             
             if text:  # Only save if we successfully extracted text
+                # Same story under another URL (wire copy, light edits): skip it
+                sig = signature(text)
+                match = dedup_index.query(sig=sig)
+                if match is not None and match["key"] != url:
+                    duplicate_count += 1
+                    continue
+                dedup_index.add(url, ref=url, sig=sig)
+
                 output_record = {
                     "url": url,
                     "title": title,
@@ -155,7 +178,10 @@ def scrape_articles(
                 f.write(json.dumps(output_record) + "\n")
                 saved_count += 1
     
+    if index_path:
+        dedup_index.save(index_path)
     print(f"\n✓ Successfully saved {saved_count} articles to {output_path}")
+    print(f"Skipped {duplicate_count} near-duplicate articles")
     print(f"Total processed: {len(articles)} articles")
 
 
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Local chat-completions server for offline load tests.
+
+Speaks enough of the OpenAI / Groq protocol for both providers in
+utils/llm_providers.py: POST to any path ending in /chat/completions, with
+or without "stream": true (server-sent chat.completion.chunk events, usage
+included). Replies are deterministic: the same request always gets the same
+text, built from the prompt's own words, with usage counted like nlp_layer
+(4 chars a token).
+
+    python scripts/stub_llm_server.py --port 8088 --latency-ms 300 --tokens-per-s 80 \\
+        --error-rate 0.05 --error-status 429 503
+
+    # then, in the shell running the API, a batch evaluation or a benchmark:
+    export NOISE_SIGNAL_LLM_PROVIDER=openai NOISE_SIGNAL_LLM_BASE_URL=http://127.0.0.1:8088/v1
+    # or keep the Groq provider and point its SDK here:
+    export GROQ_BASE_URL=http://127.0.0.1:8088 GROQ_API_KEY=stub
+
+--latency-ms is the time to the first token and --tokens-per-s the pace
+after it (the whole reply is generated before a non-streamed response is
+sent). --error-rate answers that share of requests with one of
+--error-status, chosen from a --seed'ed sequence; 429s carry Retry-After.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class StubConfig:
+    latency_s: float = 0.0
+    token_s: float = 0.0               # seconds per generated word after the first
+    reply_words: int = 60              # capped by the request's max_tokens
+    error_rate: float = 0.0
+    error_statuses: Tuple[int, ...] = (429,)
+    retry_after_s: float = 1.0
+    seed: int = 0
+    reply: Optional[str] = None        # fixed reply text instead of the generated one
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+
+
+def reply_text(request: Dict[str, Any], config: StubConfig) -> str:
+    if config.reply is not None:
+        return config.reply
+    prompt = " ".join(str(m.get("content") or "") for m in request.get("messages") or [])
+    words = prompt.split() or ["ok"]
+    count = max(1, min(config.reply_words, int(request.get("max_tokens") or config.reply_words)))
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+    return " ".join(rng.choice(words) for _ in range(count))
+
+
+def _usage(request: Dict[str, Any], text: str) -> Dict[str, int]:
+    prompt_chars = sum(len(str(m.get("content") or "")) for m in request.get("messages") or [])
+    prompt_tokens, completion_tokens = max(1, prompt_chars // 4), max(1, len(text) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    connections = 0
+    requests = 0
+    counter_lock = threading.Lock()
+
+    def setup(self) -> None:
+        super().setup()
+        with StubHandler.counter_lock:
+            StubHandler.connections += 1
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        config: StubConfig = self.server.config
+        with StubHandler.counter_lock:
+            StubHandler.requests += 1
+            status = config.rng.choice(config.error_statuses) if config.rng.random() < config.error_rate else 200
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._json(404, {"error": {"message": f"no route {self.path}", "type": "not_found"}})
+            return
+        if config.latency_s:
+            time.sleep(config.latency_s)
+        if status != 200:
+            headers = {"Retry-After": f"{config.retry_after_s:g}"} if status == 429 else {}
+            self._json(status, {"error": {"message": f"stub error {status}", "type": "stub"}}, headers)
+            return
+        text = reply_text(request, config)
+        model = request.get("model") or "stub"
+        if request.get("stream"):
+            self._stream(request, model, text)
+            return
+        if config.token_s:
+            time.sleep(config.token_s * (len(text.split(" ")) - 1))
+        self._json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": _usage(request, text),
+        })
+
+    def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, request: Dict[str, Any], model: str, text: str) -> None:
+        # chat.completion.chunk events, one per word of the reply; usage comes in
+        # a last chunk of its own when stream_options.include_usage asks for it
+        # (OpenAI), otherwise under x_groq on the last word (Groq)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        usage = _usage(request, text)
+        include_usage = bool((request.get("stream_options") or {}).get("include_usage"))
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if i and self.server.config.token_s:
+                time.sleep(self.server.config.token_s)
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": (" " if i else "") + word}, "finish_reason": None}],
+            }
+            if i == len(words) - 1 and not include_usage:
+                chunk["x_groq"] = {"id": "req-stub", "usage": usage}
+            self._chunk(f"data: {json.dumps(chunk)}\n\n")
+        if include_usage:
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [],
+                "usage": usage,
+            }
+            self._chunk(f"data: {json.dumps(chunk)}\n\n")
+        self._chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default listen backlog of 5 drops bursts of new connections
+
+
+def start_server(
+    config: Optional[StubConfig] = None,
+    port: int = 0,
+    pem: Optional[Dict[str, str]] = None,
+    host: str = "127.0.0.1",
+) -> StubServer:
+    """Serves in a daemon thread; port 0 picks a free one (see server.server_address)."""
+    server = StubServer((host, port), StubHandler)
+    server.config = config or StubConfig()
+    if pem:
+        ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ctx.load_cert_chain(pem["cert"], pem["key"])
+        server.socket = ctx.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Deterministic local chat-completions server for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Time to the first token.")
+    parser.add_argument(
+        "--tokens-per-s", type=float, default=0.0, help="Words per second after the first (0 = instant)."
+    )
+    parser.add_argument("--reply-words", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an error.")
+    parser.add_argument("--error-status", type=int, nargs="+", default=[429])
+    parser.add_argument("--retry-after-s", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_s=args.latency_ms / 1000,
+        token_s=1 / args.tokens_per_s if args.tokens_per_s else 0.0,
+        reply_words=args.reply_words,
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_status),
+        retry_after_s=args.retry_after_s,
+        seed=args.seed,
+    )
+    server = start_server(config, args.port, host=args.host)
+    host, port = server.server_address[:2]
+    print(f"[stub] serving chat completions on http://{host}:{port} ({config})")
+    print(f"[stub] NOISE_SIGNAL_LLM_PROVIDER=openai NOISE_SIGNAL_LLM_BASE_URL=http://{host}:{port}/v1")
+    print(f"[stub] or GROQ_BASE_URL=http://{host}:{port} GROQ_API_KEY=stub")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"[stub] {StubHandler.requests} requests on {StubHandler.connections} connections")
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import nlp.dedup
+from api import server
+
+ARTICLE = " ".join(
+    f"Paragraph {i}: the central bank kept its policy rate unchanged and signalled that inflation "
+    f"risks remain balanced while wage growth slows across manufacturing and services."
+    for i in range(12)
+)
+
+
+class NearDuplicateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        env = {
+            "NOISE_SIGNAL_DB": os.path.join(self.tmp.name, "runs.db"),
+            "NOISE_SIGNAL_DEDUP_INDEX": "memory",
+            "NOISE_SIGNAL_COALESCE": "0",
+            "EXTENSION_API_TOKEN": "",
+        }
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(nlp.dedup, "_default_ready", False),
+            mock.patch.object(nlp.dedup, "_default_index", None),
+            mock.patch.object(nlp.dedup, "_default_path", None),
+            mock.patch.object(server, "run_llm_stream", self.fake_llm),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp.cleanup)
+        self.prompted = []
+        server.init_db()
+        self.client = TestClient(server.app)
+
+    def fake_llm(self, analysis, **kwargs):
+        self.prompted.append(analysis["meta"])
+        yield "summary of " + str(analysis["meta"]["title"])
+
+    def analyze(self, text, title, url, **options):
+        response = self.client.post("/api/analyze", json={"text": text, "title": title, "url": url, **options})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_reused_analysis_carries_the_new_meta(self):
+        first = self.analyze(ARTICLE, "Rates on hold", "https://a.example/rates")
+        second = self.analyze(ARTICLE + " Reuters.", "Central bank pauses", "https://b.example/pause")
+
+        self.assertEqual(second["meta"]["duplicate_of"]["run_id"], first["id"])
+        self.assertEqual(second["summary_text"], first["summary_text"])  # same variant: reused
+        meta = second["analysis"]["meta"]
+        self.assertEqual((meta["title"], meta["url"]), ("Central bank pauses", "https://b.example/pause"))
+        self.assertEqual(meta["url"], second["url"])
+        self.assertEqual(second["analysis"]["facts"], first["analysis"]["facts"])
+
+        saved = self.client.get(f"/api/history/{second['id']}").json()
+        self.assertEqual(saved["analysis"]["meta"]["title"], "Central bank pauses")
+
+    def test_other_variant_prompts_with_the_new_meta(self):
+        self.analyze(ARTICLE, "Rates on hold", "https://a.example/rates")
+        second = self.analyze(ARTICLE + " Reuters.", "Central bank pauses", "https://b.example/pause", length="long")
+
+        self.assertIsNotNone(second["meta"]["duplicate_of"])
+        self.assertEqual(self.prompted[-1]["title"], "Central bank pauses")
+        self.assertEqual(self.prompted[-1]["url"], "https://b.example/pause")
+        self.assertEqual(second["summary_text"], "summary of Central bank pauses")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from utils.cache import SQLiteCache
+
+
+class SQLiteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache.db")
+
+    def rows(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return dict(conn.execute("SELECT key, size FROM cache"))
+        finally:
+            conn.close()
+
+    def test_evicts_least_recently_used_within_the_budget(self):
+        cache = SQLiteCache(self.path, max_bytes=30)
+        for key in "abc":
+            cache.set(key, "x" * 10)
+            time.sleep(0.002)
+        cache.get("a")
+        time.sleep(0.002)
+        cache.set("d", "y" * 15)
+        self.assertEqual(sorted(self.rows()), ["a", "d"])
+        self.assertEqual(cache.evictions, 2)
+        self.assertEqual(cache.stats()["bytes"], 25)
+
+    def test_never_evicts_the_row_just_written(self):
+        cache = SQLiteCache(self.path, max_bytes=10)
+        cache.set("a", "x" * 5)
+        cache.set("big", "y" * 50)
+        self.assertEqual(list(self.rows()), ["big"])
+
+    def test_running_total_follows_overwrites_and_clear(self):
+        cache = SQLiteCache(self.path)
+        cache.set("a", "x" * 10)
+        cache.set("a", "x" * 4)
+        cache.set("b", "é")  # sized in UTF-8 bytes
+        self.assertEqual(cache.stats()["bytes"], 6)
+        self.assertEqual(cache.stats()["bytes"], sum(self.rows().values()))
+        cache.clear()
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_total_is_seeded_from_an_existing_table(self):
+        SQLiteCache(self.path).set("a", "x" * 7)
+        conn = sqlite3.connect(self.path)
+        conn.execute("DROP TABLE cache_bytes")  # as before the total existed
+        conn.commit()
+        conn.close()
+        self.assertEqual(SQLiteCache(self.path).stats()["bytes"], 7)
+
+    def test_idle_rows_of_other_namespaces_expire(self):
+        old = SQLiteCache(self.path, namespace="v1")
+        old.set("stale", "x")
+        old.set("busy", "x")
+        conn = sqlite3.connect(self.path)
+        conn.execute("UPDATE cache SET accessed_at = accessed_at - 7200 WHERE key = 'stale'")
+        conn.commit()
+        conn.close()
+        new = SQLiteCache(self.path, namespace="v2")
+        new.set("fresh", "x")
+        self.assertEqual(sorted(self.rows()), ["busy", "fresh"])
+        self.assertEqual(old.get("busy"), "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,269 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from utils.llm_governor import (
+    AdaptiveLimit,
+    CircuitBreaker,
+    GovernorSettings,
+    LLMGovernor,
+    LLMUnavailableError,
+    TokenBucket,
+    classify,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)  # one per second, bursting to 60
+        self.assertEqual([bucket.reserve(1) for _ in range(60)], [0.0] * 60)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0)
+        self.assertAlmostEqual(bucket.reserve(1), 2.0)
+
+    def test_refills_with_time_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        bucket.reserve(60)
+        clock.advance(10)
+        self.assertEqual(bucket.reserve(10), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0)
+        clock.advance(3600)
+        bucket.refund(0)
+        self.assertEqual(bucket.level, 60)
+
+    def test_refund_is_capped_and_negative_refund_charges(self):
+        clock = FakeClock()
+        bucket = TokenBucket(100, clock)
+        bucket.refund(50)
+        self.assertEqual(bucket.level, 100)
+        bucket.refund(-40)
+        self.assertEqual(bucket.level, 60)
+
+    def test_request_larger_than_bucket_waits_one_minute(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        bucket.reserve(60)
+        self.assertAlmostEqual(bucket.reserve(10_000), 60.0)
+
+    def test_refund_of_an_oversized_request_counts_from_what_was_taken(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        self.assertEqual(bucket.cost(10_000), 60)
+        bucket.reserve(10_000)
+        self.assertEqual(bucket.level, 0)
+        bucket.refund(bucket.cost(10_000) - 20)  # the call used 20 tokens
+        self.assertEqual(bucket.level, 40)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failures=3, reset_s=30, clock=clock)
+        breaker.failure()
+        breaker.failure()
+        breaker.success()  # resets the run
+        breaker.failure()
+        breaker.failure()
+        breaker.check()
+        breaker.failure()
+        self.assertEqual((breaker.state, breaker.opens), ("open", 1))
+        clock.advance(10)
+        with self.assertRaises(LLMUnavailableError) as raised:
+            breaker.check()
+        self.assertAlmostEqual(raised.exception.retry_after, 20)
+
+    def test_half_open_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failures=1, reset_s=30, clock=clock)
+        breaker.failure()
+        clock.advance(30)
+        breaker.check()  # the probe
+        self.assertEqual(breaker.state, "half_open")
+        with self.assertRaises(LLMUnavailableError):
+            breaker.check()
+        breaker.success()
+        self.assertEqual(breaker.state, "closed")
+        breaker.check()
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failures=5, reset_s=30, clock=clock)
+        for _ in range(5):
+            breaker.failure()
+        clock.advance(30)
+        breaker.check()
+        breaker.failure()
+        self.assertEqual((breaker.state, breaker.opens), ("open", 2))
+        with self.assertRaises(LLMUnavailableError):
+            breaker.check()
+
+    def test_probe_that_never_reports_is_replaced(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failures=1, reset_s=30, clock=clock)
+        breaker.failure()
+        clock.advance(30)
+        breaker.check()
+        clock.advance(30)
+        breaker.check()  # a second probe, not stuck in half_open forever
+        self.assertEqual(breaker.state, "half_open")
+
+
+class AdaptiveLimitTest(unittest.TestCase):
+    def test_throttle_halves_once_per_epoch(self):
+        limit = AdaptiveLimit(16)
+        epoch = limit.acquire()
+        stale = limit.acquire()
+        limit.on_throttle(epoch)
+        limit.on_throttle(stale)  # same burst of 429s: no second cut
+        self.assertEqual((limit.limit, limit.epoch), (8, 1))
+        limit.on_throttle(limit.epoch)
+        self.assertEqual(limit.limit, 4)
+
+    def test_throttle_floor_is_one(self):
+        limit = AdaptiveLimit(2)
+        for _ in range(5):
+            limit.on_throttle(limit.epoch)
+        self.assertEqual(limit.limit, 1)
+
+    def test_grows_by_one_after_a_window_of_successes(self):
+        limit = AdaptiveLimit(8)
+        limit.on_throttle(limit.epoch)
+        for _ in range(3):
+            limit.on_success()
+        self.assertEqual(limit.limit, 4)
+        limit.on_success()
+        self.assertEqual(limit.limit, 5)
+
+    def test_release_hands_the_slot_to_the_first_waiter(self):
+        limit = AdaptiveLimit(1)
+        limit.acquire()
+        order = []
+
+        def waiter(name):
+            limit.acquire()
+            order.append(name)
+            limit.release()
+
+        threads = []
+        for name in ("first", "second"):
+            thread = threading.Thread(target=waiter, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while limit.waiting() < len(threads):  # queue them in this order
+                time.sleep(0.001)
+        limit.release()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, ["first", "second"])
+        self.assertEqual(limit.in_flight, 0)
+
+    def test_cancelled_after_grant_releases_the_slot(self):
+        async def scenario():
+            limit = AdaptiveLimit(1)
+            limit.acquire()
+            task = asyncio.ensure_future(limit.acquire_async())
+            await asyncio.sleep(0)
+            limit.release()  # hands the slot to the waiting task
+            await asyncio.sleep(0)  # granted() has set the future's result
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return limit.in_flight
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+
+class GovernorTest(unittest.TestCase):
+    def governor(self, **settings):
+        defaults = dict(concurrency=4, max_retries=2, backoff_s=0.0, backoff_max_s=0.0, breaker_failures=2)
+        return LLMGovernor(GovernorSettings(**{**defaults, **settings}), clock=FakeClock())
+
+    def test_classify(self):
+        self.assertEqual(classify(StatusError(429)), "throttled")
+        self.assertEqual(classify(StatusError(503)), "server")
+        self.assertEqual(classify(StatusError(400)), None)
+        self.assertEqual(classify(ConnectionError()), "connection")
+
+    def test_retries_transient_errors(self):
+        governor = self.governor()
+        errors = [StatusError(429), StatusError(503)]
+
+        def fn():
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        self.assertEqual(governor.call(fn), "ok")
+        stats = governor.stats()
+        self.assertEqual((stats["attempts"], stats["retries"], stats["succeeded"]), (3, 2, 1))
+        self.assertEqual(governor.limit.limit, 2)  # the 429 halved it
+        self.assertEqual(governor.limit.in_flight, 0)
+
+    def test_does_not_retry_client_errors(self):
+        governor = self.governor()
+        with self.assertRaises(StatusError):
+            governor.call(lambda: (_ for _ in ()).throw(StatusError(400)))
+        self.assertEqual(governor.stats()["attempts"], 1)
+
+    def test_breaker_opens_and_rejects(self):
+        governor = self.governor(max_retries=0)
+
+        def fail():
+            raise StatusError(500)
+
+        for _ in range(2):
+            with self.assertRaises(StatusError):
+                governor.call(fail)
+        with self.assertRaises(LLMUnavailableError):
+            governor.call(lambda: "never sent")
+        self.assertEqual(governor.stats()["rejected"], 1)
+
+    def test_usage_correction_counts_from_the_capped_charge(self):
+        governor = self.governor(tpm=100)
+        request = {"messages": [{"content": "x" * 400}], "max_tokens": 1000}  # estimated at 1100
+
+        class Result:
+            total_tokens = 30
+
+        governor.call(lambda: Result(), request)
+        self.assertEqual(governor.tokens.level, 70)
+
+    def test_stream_holds_the_slot_until_the_block_ends(self):
+        governor = self.governor()
+        with governor.stream(lambda: iter(["a", "b"])) as stream:
+            self.assertEqual(governor.limit.in_flight, 1)
+            self.assertEqual(list(stream), ["a", "b"])
+        self.assertEqual(governor.limit.in_flight, 0)
+        self.assertEqual(governor.stats()["succeeded"], 1)
+
+    def test_stream_error_reaches_the_breaker(self):
+        governor = self.governor(breaker_failures=1)
+        with self.assertRaises(ConnectionError):
+            with governor.stream(lambda: iter(["a"])):
+                raise ConnectionError("reset mid-stream")
+        self.assertEqual(governor.limit.in_flight, 0)
+        self.assertEqual(governor.breaker.state, "open")
+        self.assertEqual(governor.stats()["connection_errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
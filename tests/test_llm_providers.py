@@ -0,0 +1,105 @@
+import json
+import unittest
+
+from utils.llm_governor import classify, retry_after
+from utils.llm_providers import (
+    ChatStream,
+    Completion,
+    ProviderConnectionError,
+    ProviderStatusError,
+    _json_completion,
+    _sse_events,
+)
+
+
+class FakeResponse:
+    def __init__(self, lines=(), status_code=200, text="", headers=None):
+        self._lines = lines
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def iter_lines(self):
+        yield from self._lines
+
+
+def chunk(content=None, usage=None, **extra):
+    choices = [] if content is None else [{"index": 0, "delta": {"content": content}}]
+    payload = {"model": "m-1", "choices": choices, **extra}
+    if usage is not None:
+        payload["usage"] = usage
+    return "data: " + json.dumps(payload)
+
+
+class SSETest(unittest.TestCase):
+    def test_deltas_and_trailing_usage_chunk(self):
+        lines = [
+            ": keep-alive",
+            chunk("Hello"),
+            "",
+            chunk(""),
+            chunk(" world"),
+            chunk(usage={"prompt_tokens": 12, "completion_tokens": 2}),
+            "data: [DONE]",
+            chunk("after done"),
+        ]
+        stream = ChatStream(_sse_events(FakeResponse(lines)), lambda: None)
+        self.assertEqual(list(stream), ["Hello", " world"])
+        self.assertEqual(stream.usage, Completion("", "m-1", 12, 2))
+        self.assertEqual(stream.usage.total_tokens, 14)
+
+    def test_groq_style_usage(self):
+        lines = [chunk("Hi", x_groq={"id": "req", "usage": {"prompt_tokens": 3, "completion_tokens": 1}})]
+        stream = ChatStream(_sse_events(FakeResponse(lines)), lambda: None)
+        self.assertEqual(list(stream), ["Hi"])
+        self.assertEqual((stream.usage.prompt_tokens, stream.usage.completion_tokens), (3, 1))
+
+    def test_no_usage_leaves_none(self):
+        stream = ChatStream(_sse_events(FakeResponse([chunk("a"), "data: [DONE]"])), lambda: None)
+        self.assertEqual(list(stream), ["a"])
+        self.assertIsNone(stream.usage)
+
+    def test_transport_errors_become_connection_errors(self):
+        import httpx
+
+        class Broken(FakeResponse):
+            def iter_lines(self):
+                yield chunk("a")
+                raise httpx.ReadError("reset")
+
+        stream = ChatStream(_sse_events(Broken()), lambda: None)
+        with self.assertRaises(ProviderConnectionError) as raised:
+            list(stream)
+        self.assertEqual(classify(raised.exception), "connection")
+
+    def test_close(self):
+        closed = []
+        ChatStream(iter(()), lambda: closed.append(True)).close()
+        self.assertEqual(closed, [True])
+
+
+class CompletionTest(unittest.TestCase):
+    def test_json_completion(self):
+        completion = _json_completion({
+            "model": "m-1",
+            "choices": [{"message": {"role": "assistant", "content": "text"}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 7},
+        })
+        self.assertEqual(completion, Completion("text", "m-1", 5, 7))
+
+    def test_json_completion_without_usage(self):
+        completion = _json_completion({"choices": [{"message": {"content": None}}]})
+        self.assertEqual(completion, Completion("", "", None, None))
+        self.assertIsNone(completion.total_tokens)
+
+    def test_status_error_is_classified_with_retry_after(self):
+        error = ProviderStatusError(FakeResponse(status_code=429, text="slow down", headers={"retry-after": "3"}))
+        self.assertEqual(error.status_code, 429)
+        self.assertEqual(classify(error), "throttled")
+        self.assertEqual(retry_after(error), 3.0)
+        self.assertEqual(classify(ProviderStatusError(FakeResponse(status_code=502))), "server")
+        self.assertIsNone(classify(ProviderStatusError(FakeResponse(status_code=401))))
+
+
+if __name__ == "__main__":
+    unittest.main()
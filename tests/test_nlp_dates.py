@@ -0,0 +1,28 @@
+import unittest
+from unittest import mock
+
+import nlp_layer
+from nlp_layer import _normalize_date, _pull_dates
+
+
+class NormalizeDateTest(unittest.TestCase):
+    def test_month_table_formats(self):
+        self.assertEqual(_normalize_date("Mar 18, 2025"), "2025-03-18")
+        self.assertEqual(_normalize_date("18 March 2025"), "2025-03-18")
+        self.assertEqual(_normalize_date("2025-03-18"), "2025-03-18")
+        self.assertIsNone(_normalize_date("31 February 2025"))
+
+    def test_quarters_are_iso_dates(self):
+        self.assertEqual(_pull_dates("Revenue rose in Q3 2024 and again in q1 2025."), ["2024-07-01", "2025-01-01"])
+
+    def test_dateutil_fallback_is_not_memoized(self):
+        # "Marching" is not in the month table; dateutil fills the gaps from today
+        with mock.patch.object(nlp_layer.dparser, "parse", wraps=nlp_layer.dparser.parse) as parse:
+            first = _normalize_date("Marching 5, 2025")
+            second = _normalize_date("Marching 5, 2025")
+        self.assertEqual(parse.call_count, 2)
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
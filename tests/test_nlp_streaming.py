@@ -0,0 +1,44 @@
+import unittest
+
+from nlp.streaming import analyze_stream
+from nlp_layer import analyze_document
+
+FILLER = "the committee noted that conditions were broadly stable over the period. "
+LINE = (
+    FILLER * 14
+    + "The Federal Reserve Board raised $ 1,250 on March 5, 2025 and 12.5 % more, said Jane Doe of New York University. "
+    + FILLER * 14
+)
+
+
+def full_facts(text):
+    return analyze_document({"schema": "document:v1", "meta": {}, "content": {"text": text}})["facts"]
+
+
+def streamed_facts(chunks, max_segment_chars):
+    return list(analyze_stream(chunks, max_segment_chars=max_segment_chars))[-1]["analysis"]["facts"]
+
+
+class LongLineTest(unittest.TestCase):
+    def test_cuts_anywhere_in_the_facts_match_the_full_pipeline(self):
+        expected = full_facts(LINE)
+        self.assertIn("The Federal Reserve Board", expected["entities"]["ORG"])
+        start = len(FILLER) * 14
+        # every cut point from just before the facts to just after them
+        for limit in range(start - 10, start + 130):
+            with self.subTest(max_segment_chars=limit):
+                self.assertEqual(streamed_facts([LINE], limit), expected)
+
+    def test_chunking_does_not_change_the_result(self):
+        expected = full_facts(LINE)
+        chunks = [LINE[i:i + 97] for i in range(0, len(LINE), 97)]
+        self.assertEqual(streamed_facts(chunks, 1070), expected)
+
+    def test_line_ending_at_a_cut_keeps_its_last_match(self):
+        line = FILLER * 16 + "said the Federal Reserve Board"
+        # cut right after "Board"; the rest of the line is blank
+        self.assertEqual(streamed_facts([line + " " * 600 + "\n"], len(line) + 1), full_facts(line))
+
+
+if __name__ == "__main__":
+    unittest.main()
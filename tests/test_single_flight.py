@@ -0,0 +1,107 @@
+import threading
+import unittest
+
+from utils.single_flight import Flight, SingleFlight
+
+
+class FlightTest(unittest.TestCase):
+    def test_late_subscriber_gets_every_item(self):
+        flight = Flight()
+        early = flight.events()
+        flight.publish(1)
+        self.assertEqual(next(early), 1)
+        flight.publish(2)
+        late = flight.events()
+        flight.publish(3)
+        flight.finish()
+        self.assertEqual(list(early), [2, 3])
+        self.assertEqual(list(late), [1, 2, 3])
+        self.assertEqual(list(flight.events()), [1, 2, 3])
+
+    def test_error_reaches_every_subscriber_after_the_items(self):
+        flight = Flight()
+        subscribers = [flight.events(), flight.events()]
+        flight.publish("a")
+        flight.finish(ValueError("boom"))
+        for events in subscribers:
+            received = []
+            with self.assertRaises(ValueError):
+                for item in events:
+                    received.append(item)
+            self.assertEqual(received, ["a"])
+
+    def test_subscriber_waits_for_items_from_another_thread(self):
+        flight = Flight()
+        publisher = threading.Thread(target=lambda: ([flight.publish(i) for i in range(3)], flight.finish()))
+        events = flight.events()
+        publisher.start()
+        self.assertEqual(list(events), [0, 1, 2])
+        publisher.join(5)
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_overlapping_joins_share_one_run(self):
+        flights = SingleFlight("test")
+        release = threading.Event()
+        runs = []
+
+        def produce():
+            runs.append(1)
+            yield "first"
+            release.wait(5)
+            yield "second"
+
+        first, started = flights.join("k", produce)
+        second, joined = flights.join("k", produce)
+        self.assertEqual((started, joined), (True, False))
+        self.assertEqual(next(first), "first")
+        release.set()
+        self.assertEqual(list(second), ["first", "second"])
+        self.assertEqual(list(first), ["second"])
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(flights.stats()["join_rate"], 0.5)
+
+    def test_key_is_free_once_the_run_ends(self):
+        flights = SingleFlight("test")
+        first, _ = flights.join("k", lambda: iter([1]))
+        self.assertEqual(list(first), [1])  # ends after finish(), which comes after the key is dropped
+        self.assertEqual(flights.stats()["in_flight"], 0)
+        second, started = flights.join("k", lambda: iter([2]))
+        self.assertTrue(started)
+        self.assertEqual(list(second), [2])
+
+    def test_producer_error_fans_out(self):
+        flights = SingleFlight("test")
+        release = threading.Event()
+
+        def produce():
+            yield "partial"
+            release.wait(5)
+            raise RuntimeError("provider down")
+
+        subscribers = [flights.join("k", produce)[0] for _ in range(3)]
+        release.set()
+        for events in subscribers:
+            with self.assertRaises(RuntimeError):
+                list(events)
+        self.assertEqual(flights.stats()["started"], 1)
+
+    def test_abandoned_subscriber_does_not_stop_the_run(self):
+        flights = SingleFlight("test")
+        release = threading.Event()
+
+        def produce():
+            yield 1
+            release.wait(5)
+            yield 2
+
+        first, _ = flights.join("k", produce)
+        second, _ = flights.join("k", produce)
+        next(first)
+        first.close()
+        release.set()
+        self.assertEqual(list(second), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
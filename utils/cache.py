@@ -0,0 +1,268 @@
+"""Small string key/value caches shared by the pipeline layers.
+
+Both backends store JSON text, so cached objects are copied on every read and
+callers can mutate what they get back. Values are grouped under a namespace
+(typically a schema or code version) and never read across namespaces. The
+SQLite backend drops rows of other namespaces once no process has used them
+for `foreign_idle_s`, so after an upgrade old entries go away on their own
+while processes still on the old version (a rolling deploy) keep theirs.
+With `ttl_s`, entries also expire that many seconds after they were written.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Protocol, Tuple
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, value: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+class MemoryLRUCache:
+    """Process-local LRU bounded by entry count."""
+
+    def __init__(self, max_entries: int = 512, ttl_s: Optional[float] = None) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("ttl_s must be > 0")
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (value, expires_at or None)
+        self._data: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl_s if self.ttl_s is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class SQLiteCache:
+    """
+    On-disk LRU bounded by total value size, shared across processes.
+
+    Triggers keep the running total in `{table}_bytes`, and every sweep walks
+    an index, so a write costs the same however many entries the cache holds.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        table: str = "cache",
+        namespace: str = "",
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_s: Optional[float] = None,
+        foreign_idle_s: float = 3600.0,
+    ) -> None:
+        if not table.isidentifier():
+            raise ValueError("table must be a plain identifier")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("ttl_s must be > 0")
+        self.path = Path(path)
+        self.table = table
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.foreign_idle_s = foreign_idle_s
+        self.evictions = 0
+        self.expirations = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                  key TEXT PRIMARY KEY,
+                  namespace TEXT NOT NULL,
+                  value TEXT NOT NULL,
+                  size INTEGER NOT NULL,
+                  accessed_at REAL NOT NULL,
+                  expires_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_{table}_accessed_at ON {table}(accessed_at);
+                """
+            )
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if "expires_at" not in columns:  # tables created before TTL support
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN expires_at REAL")
+            conn.commit()
+            # the size total is seeded once, from tables that predate it, under a write lock
+            conn.executescript(
+                f"""
+                BEGIN IMMEDIATE;
+                CREATE INDEX IF NOT EXISTS idx_{table}_expires_at ON {table}(expires_at);
+                CREATE INDEX IF NOT EXISTS idx_{table}_namespace ON {table}(namespace, accessed_at);
+                CREATE TABLE IF NOT EXISTS {table}_bytes (total INTEGER NOT NULL);
+                CREATE TRIGGER IF NOT EXISTS {table}_bytes_insert AFTER INSERT ON {table}
+                  BEGIN UPDATE {table}_bytes SET total = total + new.size; END;
+                CREATE TRIGGER IF NOT EXISTS {table}_bytes_delete AFTER DELETE ON {table}
+                  BEGIN UPDATE {table}_bytes SET total = total - old.size; END;
+                CREATE TRIGGER IF NOT EXISTS {table}_bytes_update AFTER UPDATE OF size ON {table}
+                  BEGIN UPDATE {table}_bytes SET total = total + new.size - old.size; END;
+                INSERT INTO {table}_bytes (total)
+                  SELECT COALESCE(SUM(size), 0) FROM {table} WHERE NOT EXISTS (SELECT 1 FROM {table}_bytes);
+                COMMIT;
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # sqlite3's own context manager only commits; the connection must be closed too
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ? AND namespace = ?",
+                (key, self.namespace),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] <= now:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ? AND namespace = ?", (key, self.namespace))
+                conn.commit()
+                self.expirations += 1
+                return None
+            conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ? AND namespace = ?",
+                (now, key, self.namespace),
+            )
+            conn.commit()
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        expires_at = now + self.ttl_s if self.ttl_s is not None else None
+        with self._connect() as conn:
+            # an upsert, not INSERT OR REPLACE: REPLACE's implicit delete skips the size triggers
+            conn.execute(
+                f"""
+                INSERT INTO {self.table} (key, namespace, value, size, accessed_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                  namespace = excluded.namespace, value = excluded.value, size = excluded.size,
+                  accessed_at = excluded.accessed_at, expires_at = excluded.expires_at
+                """,
+                (key, self.namespace, value, size, now, expires_at),
+            )
+            self._evict(conn, key)
+            conn.commit()
+
+    def _total(self, conn: sqlite3.Connection) -> int:
+        return conn.execute(f"SELECT total FROM {self.table}_bytes").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, written: str) -> None:
+        now = time.time()
+        expired = conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        # other versions' rows, once nothing has read or written them for foreign_idle_s;
+        # one index seek per namespace rather than a scan of the table
+        namespace = conn.execute(f"SELECT MIN(namespace) FROM {self.table}").fetchone()[0]
+        while namespace is not None:
+            if namespace != self.namespace:
+                expired += conn.execute(
+                    f"DELETE FROM {self.table} WHERE namespace = ? AND accessed_at <= ?",
+                    (namespace, now - self.foreign_idle_s),
+                ).rowcount
+            namespace = conn.execute(
+                f"SELECT MIN(namespace) FROM {self.table} WHERE namespace > ?", (namespace,)
+            ).fetchone()[0]
+        self.expirations += max(expired, 0)
+        excess = self._total(conn) - self.max_bytes
+        if excess <= 0:
+            return
+        # count the least recently used rows that cover the excess, then drop them
+        oldest = conn.execute(f"SELECT size FROM {self.table} WHERE key != ? ORDER BY accessed_at ASC", (written,))
+        doomed = 0
+        for (size,) in oldest:  # never evict the row just written
+            doomed += 1
+            excess -= size
+            if excess <= 0:
+                break
+        oldest.close()
+        conn.execute(
+            f"""
+            DELETE FROM {self.table} WHERE key IN (
+              SELECT key FROM {self.table} WHERE key != ? ORDER BY accessed_at ASC LIMIT ?
+            )
+            """,
+            (written, doomed),
+        )
+        self.evictions += doomed
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            entries = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            total = self._total(conn)
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "foreign_idle_s": self.foreign_idle_s,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
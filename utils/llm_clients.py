@@ -0,0 +1,231 @@
+"""Process-wide Groq clients shared by llm_layer and evaluation.openai_eval.
+
+A Groq() client owns an httpx connection pool. Building one per call throws
+the pool away after a single request, so every summary paid for a new TCP
+connection and TLS handshake. get_groq_client() returns one client per
+(api key, base url) and keeps its connections alive between calls. httpx
+clients are safe to share across threads; the pool caps how many requests
+are in flight at once, and callers beyond that wait for a free connection
+(up to the pool timeout).
+
+get_async_groq_client() does the same for AsyncGroq. Async connections belong
+to the event loop that opened them, so there is one async client (and one
+concurrency semaphore, see async_semaphore()) per running loop.
+
+Pool size and timeouts come from the environment:
+
+  NOISE_SIGNAL_LLM_POOL_SIZE        max open connections per client (default 20)
+  NOISE_SIGNAL_LLM_KEEPALIVE_S      idle seconds before a connection is closed (default 60)
+  NOISE_SIGNAL_LLM_TIMEOUT_S        read timeout per request (default 60)
+  NOISE_SIGNAL_LLM_CONNECT_TIMEOUT_S connect and pool-wait timeout (default 10)
+  NOISE_SIGNAL_LLM_CONCURRENCY      async requests in flight per event loop (default: pool size)
+
+GROQ_BASE_URL, which the Groq SDK reads too, points the clients at another
+endpoint (the local stub in scripts/stub_llm_server.py).
+
+get_http_client() and get_async_http_client() are plain httpx clients with
+the same pool settings, for OpenAI-compatible endpoints
+(utils.llm_providers.OpenAICompatibleProvider).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_POOL_SIZE = 20
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    pool_size: int = DEFAULT_POOL_SIZE
+    keepalive_s: float = 60.0
+    timeout_s: float = 60.0
+    connect_timeout_s: float = 10.0
+    concurrency: int = DEFAULT_POOL_SIZE
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        pool_size = int(os.getenv("NOISE_SIGNAL_LLM_POOL_SIZE") or DEFAULT_POOL_SIZE)
+        settings = cls(
+            pool_size=pool_size,
+            keepalive_s=float(os.getenv("NOISE_SIGNAL_LLM_KEEPALIVE_S") or 60),
+            timeout_s=float(os.getenv("NOISE_SIGNAL_LLM_TIMEOUT_S") or 60),
+            connect_timeout_s=float(os.getenv("NOISE_SIGNAL_LLM_CONNECT_TIMEOUT_S") or 10),
+            concurrency=int(os.getenv("NOISE_SIGNAL_LLM_CONCURRENCY") or pool_size),
+        )
+        if settings.pool_size < 1:
+            raise ValueError("NOISE_SIGNAL_LLM_POOL_SIZE must be >= 1")
+        if settings.concurrency < 1:
+            raise ValueError("NOISE_SIGNAL_LLM_CONCURRENCY must be >= 1")
+        return settings
+
+    def httpx_options(self) -> Dict[str, Any]:
+        import httpx
+
+        timeout = httpx.Timeout(self.timeout_s, connect=self.connect_timeout_s, pool=self.connect_timeout_s)
+        limits = httpx.Limits(
+            # the semaphore, not the pool, is what makes async callers wait
+            max_connections=max(self.pool_size, self.concurrency),
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.keepalive_s,
+        )
+        return {"timeout": timeout, "limits": limits}
+
+
+ClientKey = Tuple[str, Optional[str], ClientSettings]
+
+_clients: Dict[ClientKey, Any] = {}
+_http_clients: Dict[ClientKey, Any] = {}
+_lock = threading.Lock()
+# per event loop: {"clients": {ClientKey: AsyncGroq}, "http_clients": {ClientKey: httpx.AsyncClient},
+# "semaphores": {limit: Semaphore}}
+_loop_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Dict[Any, Any]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def groq_api_key() -> str:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY missing in environment.")
+    return api_key
+
+
+def _client_key(api_key: Optional[str], settings: Optional[ClientSettings]) -> ClientKey:
+    return (api_key or groq_api_key(), os.getenv("GROQ_BASE_URL") or None, settings or ClientSettings.from_env())
+
+
+def _build_groq_client(key: ClientKey) -> Any:
+    import httpx
+    from groq import Groq
+
+    api_key, base_url, settings = key
+    options = settings.httpx_options()
+    http_client = httpx.Client(**options)
+    return Groq(
+        api_key=api_key, base_url=base_url, http_client=http_client, timeout=options["timeout"],
+        max_retries=0,  # utils.llm_governor retries
+    )
+
+
+def _build_async_groq_client(key: ClientKey) -> Any:
+    import httpx
+    from groq import AsyncGroq
+
+    api_key, base_url, settings = key
+    options = settings.httpx_options()
+    http_client = httpx.AsyncClient(**options)
+    return AsyncGroq(
+        api_key=api_key, base_url=base_url, http_client=http_client, timeout=options["timeout"],
+        max_retries=0,  # utils.llm_governor retries
+    )
+
+
+def get_groq_client(api_key: Optional[str] = None, settings: Optional[ClientSettings] = None) -> Any:
+    """Shared Groq client for `api_key` (default GROQ_API_KEY), built on first use."""
+    key = _client_key(api_key, settings)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _build_groq_client(key)
+        return client
+
+
+def _state() -> Dict[str, Dict[Any, Any]]:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        state = _loop_state.get(loop)
+        if state is None:
+            state = _loop_state[loop] = {"clients": {}, "http_clients": {}, "semaphores": {}}
+        return state
+
+
+def get_async_groq_client(api_key: Optional[str] = None, settings: Optional[ClientSettings] = None) -> Any:
+    """Shared AsyncGroq client for the running event loop."""
+    key = _client_key(api_key, settings)
+    clients = _state()["clients"]
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = _build_async_groq_client(key)
+    return client
+
+
+def _http_options(key: ClientKey) -> Dict[str, Any]:
+    api_key, base_url, settings = key
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    return dict(settings.httpx_options(), base_url=base_url, headers=headers)
+
+
+def get_http_client(base_url: str, api_key: Optional[str] = None, settings: Optional[ClientSettings] = None) -> Any:
+    """Shared httpx.Client for an OpenAI-compatible endpoint; `api_key` is sent as a bearer token."""
+    import httpx
+
+    key = (api_key or "", base_url, settings or ClientSettings.from_env())
+    with _lock:
+        client = _http_clients.get(key)
+        if client is None:
+            client = _http_clients[key] = httpx.Client(**_http_options(key))
+        return client
+
+
+def get_async_http_client(
+    base_url: str, api_key: Optional[str] = None, settings: Optional[ClientSettings] = None
+) -> Any:
+    """Shared httpx.AsyncClient for the running event loop."""
+    import httpx
+
+    key = (api_key or "", base_url, settings or ClientSettings.from_env())
+    clients = _state()["http_clients"]
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = httpx.AsyncClient(**_http_options(key))
+    return client
+
+
+def async_semaphore(limit: Optional[int] = None) -> asyncio.Semaphore:
+    """Semaphore shared by every async LLM call on the running loop (NOISE_SIGNAL_LLM_CONCURRENCY)."""
+    limit = limit or ClientSettings.from_env().concurrency
+    semaphores = _state()["semaphores"]
+    semaphore = semaphores.get(limit)
+    if semaphore is None:
+        semaphore = semaphores[limit] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+def close_clients() -> None:
+    """Close every pooled connection; the next get_groq_client() builds a fresh client."""
+    with _lock:
+        clients = list(_clients.values()) + list(_http_clients.values())
+        _clients.clear()
+        _http_clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_async_clients() -> None:
+    """Close the running loop's async clients; call before the loop shuts down."""
+    state = _state()
+    clients = list(state["clients"].values())
+    http_clients = list(state["http_clients"].values())
+    state["clients"].clear()
+    state["http_clients"].clear()
+    for client in clients:
+        await client.close()
+    for client in http_clients:
+        await client.aclose()
+
+
+def client_stats() -> Dict[str, Any]:
+    with _lock:
+        keys = list(_clients) + list(_http_clients)
+        loops = len(_loop_state)
+    return {
+        "clients": len(keys),
+        "event_loops": loops,
+        "settings": [dict(asdict(settings), base_url=base_url) for _, base_url, settings in keys],
+    }
@@ -0,0 +1,511 @@
+"""Process-wide governor for LLM calls: rate limits, retries, circuit breaker.
+
+Every completion llm_layer sends goes through get_governor(provider).call()
+(or call_async(), or stream() for streamed completions), which:
+
+  * waits for the request and token buckets (NOISE_SIGNAL_LLM_RPM / _TPM,
+    refilled continuously; a request is charged its prompt estimate plus
+    max_tokens up front, corrected by the usage the provider reports);
+  * waits for a slot under the adaptive concurrency limit: it starts at
+    NOISE_SIGNAL_LLM_CONCURRENCY, halves on a 429 and grows by one after a
+    full window of successes (AIMD), so batch jobs settle at the most
+    parallelism the provider quota allows;
+  * retries 429s, 5xx and connection errors with jittered exponential
+    backoff, never sooner than the provider's Retry-After. A Retry-After also
+    pauses every other call for that long;
+  * fails fast with LLMUnavailableError while the circuit breaker is open
+    (NOISE_SIGNAL_LLM_BREAKER_FAILURES consecutive 5xx/connection failures,
+    then one probe call after NOISE_SIGNAL_LLM_BREAKER_RESET_S).
+
+A streamed completion holds its slot until the stream is done, and an error
+while reading it counts against the breaker and the limit like one from
+opening it (it is not retried: part of the reply has been used).
+
+The clients from utils.llm_clients are built with max_retries=0, so this is
+the only retry layer. stats() reports counters and the current limits
+(/health shows them).
+
+  NOISE_SIGNAL_LLM_RPM              requests per minute (default 0 = no limit)
+  NOISE_SIGNAL_LLM_TPM              tokens per minute (default 0 = no limit)
+  NOISE_SIGNAL_LLM_MAX_RETRIES      retries per call (default 4)
+  NOISE_SIGNAL_LLM_BACKOFF_S        first backoff delay (default 0.5, doubled per retry)
+  NOISE_SIGNAL_LLM_BACKOFF_MAX_S    longest backoff delay (default 30)
+  NOISE_SIGNAL_LLM_BREAKER_FAILURES failures that open the circuit (default 5)
+  NOISE_SIGNAL_LLM_BREAKER_RESET_S  seconds the circuit stays open (default 30)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LLMUnavailableError(RuntimeError):
+    """The circuit breaker is open; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM provider unavailable after repeated failures; retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class GovernorSettings:
+    rpm: float = 0.0
+    tpm: float = 0.0
+    concurrency: int = 20
+    max_retries: int = 4
+    backoff_s: float = 0.5
+    backoff_max_s: float = 30.0
+    breaker_failures: int = 5
+    breaker_reset_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "GovernorSettings":
+        from utils.llm_clients import ClientSettings
+
+        settings = cls(
+            rpm=float(os.getenv("NOISE_SIGNAL_LLM_RPM") or 0),
+            tpm=float(os.getenv("NOISE_SIGNAL_LLM_TPM") or 0),
+            concurrency=ClientSettings.from_env().concurrency,
+            max_retries=int(os.getenv("NOISE_SIGNAL_LLM_MAX_RETRIES") or 4),
+            backoff_s=float(os.getenv("NOISE_SIGNAL_LLM_BACKOFF_S") or 0.5),
+            backoff_max_s=float(os.getenv("NOISE_SIGNAL_LLM_BACKOFF_MAX_S") or 30),
+            breaker_failures=int(os.getenv("NOISE_SIGNAL_LLM_BREAKER_FAILURES") or 5),
+            breaker_reset_s=float(os.getenv("NOISE_SIGNAL_LLM_BREAKER_RESET_S") or 30),
+        )
+        if settings.rpm < 0 or settings.tpm < 0:
+            raise ValueError("NOISE_SIGNAL_LLM_RPM and NOISE_SIGNAL_LLM_TPM must be >= 0")
+        if settings.breaker_failures < 1:
+            raise ValueError("NOISE_SIGNAL_LLM_BREAKER_FAILURES must be >= 1")
+        return settings
+
+
+class TokenBucket:
+    """`per_minute` units refilled continuously, bursting up to one minute's worth."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def cost(self, amount: float) -> float:
+        """What reserve(amount) takes; refunds must not give back more."""
+        # a request larger than the whole bucket waits one minute, not forever
+        return min(amount, self.capacity)
+
+    def reserve(self, amount: float) -> float:
+        """Takes cost(amount) now and returns the seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self.level -= self.cost(amount)
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Gives back `amount` (charges it when negative)."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit shared by threads and event loops. Waiters are served
+    in arrival order; a released slot is handed straight to the next one.
+    acquire() returns the limit's epoch, which on_throttle() takes back: only
+    a call admitted since the last cut can cut the limit again.
+    """
+
+    def __init__(self, maximum: int):
+        self.maximum = maximum
+        self.limit = maximum
+        self.in_flight = 0
+        self.epoch = 0
+        self._successes = 0
+        self._waiters: Deque[Callable[[], None]] = deque()
+        self._lock = threading.RLock()  # a waiter on a closed loop releases from inside _hand_over
+
+    def acquire(self) -> int:
+        with self._lock:
+            if self._free():
+                self.in_flight += 1
+                return self.epoch
+            event = threading.Event()
+            self._waiters.append(event.set)
+        event.wait()
+        return self.epoch
+
+    async def acquire_async(self) -> int:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def granted() -> None:
+            if future.cancelled():
+                self.release()  # the slot arrived after the caller gave up
+            else:
+                future.set_result(None)
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(granted)
+            except RuntimeError:  # loop closed
+                self.release()
+
+        with self._lock:
+            if self._free():
+                self.in_flight += 1
+                return self.epoch
+            self._waiters.append(wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+            if future.done() and not future.cancelled():
+                self.release()  # granted, but the task was cancelled before it resumed
+            raise
+        return self.epoch
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._hand_over()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._hand_over()
+
+    def on_throttle(self, epoch: int) -> None:
+        with self._lock:
+            # one cut per burst of 429s: the calls already in flight were sent at the old limit
+            if epoch == self.epoch:
+                self.limit = max(1, self.limit // 2)
+                self.epoch += 1
+            self._successes = 0
+
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+    def _free(self) -> bool:
+        return self.in_flight < self.limit and not self._waiters
+
+    def _hand_over(self) -> None:
+        while self._waiters and self.in_flight < self.limit:
+            self.in_flight += 1
+            self._waiters.popleft()()
+
+
+class CircuitBreaker:
+    """closed -> open after `failures` in a row -> half-open (one probe) after `reset_s`."""
+
+    def __init__(self, failures: int, reset_s: float, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.reset_s = reset_s
+        self.state = "closed"
+        self.opens = 0
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        """Raises LLMUnavailableError unless a call may go out now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = self._clock()
+            remaining = self._opened_at + self.reset_s - now
+            if remaining <= 0:
+                # this caller is the probe; another one goes out if it never reports back
+                self.state = "half_open"
+                self._opened_at = now
+                return
+            raise LLMUnavailableError(max(remaining, 1.0))
+
+    def success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._consecutive = 0
+
+    def failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self.state == "half_open" or self._consecutive >= self.failures:
+                if self.state != "open":
+                    self.opens += 1
+                self.state = "open"
+                self._opened_at = self._clock()
+
+
+def classify(exc: BaseException) -> Optional[str]:
+    """"throttled", "server" or "connection" for errors worth retrying, else None."""
+    status = getattr(exc, "status_code", None)
+    if status == 429:
+        return "throttled"
+    if status is not None:
+        return "server" if status >= 500 or status == 408 else None
+    try:
+        from groq import APIConnectionError
+    except ImportError:
+        APIConnectionError = ()  # type: ignore[assignment]
+    # utils.llm_providers raises ConnectionError subclasses for network failures
+    if isinstance(exc, (APIConnectionError, ConnectionError, TimeoutError)):
+        return "connection"
+    return None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from the error response's Retry-After (or retry-after-ms) header."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_request_tokens(request: Optional[Dict[str, Any]]) -> int:
+    # 4 characters per token, as nlp_layer._estimate_tokens, plus the completion budget
+    if not request:
+        return 1
+    chars = sum(len(str(m.get("content") or "")) for m in request.get("messages") or [])
+    return chars // 4 + int(request.get("max_tokens") or 0)
+
+
+class LLMGovernor:
+    def __init__(self, settings: Optional[GovernorSettings] = None, clock: Callable[[], float] = time.monotonic):
+        self.settings = settings or GovernorSettings.from_env()
+        self._clock = clock
+        self.requests = TokenBucket(self.settings.rpm, clock) if self.settings.rpm else None
+        self.tokens = TokenBucket(self.settings.tpm, clock) if self.settings.tpm else None
+        self.limit = AdaptiveLimit(self.settings.concurrency)
+        self.breaker = CircuitBreaker(self.settings.breaker_failures, self.settings.breaker_reset_s, clock)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._counts = {
+            "calls": 0, "succeeded": 0, "failed": 0, "attempts": 0, "retries": 0,
+            "throttled": 0, "server_errors": 0, "connection_errors": 0, "rejected": 0,
+        }
+        self._rate_wait_s = 0.0
+        self._backoff_s = 0.0
+
+    def call(self, fn: Callable[[], T], request: Optional[Dict[str, Any]] = None) -> T:
+        """fn() under the limits, retried on transient errors. `request` sizes the token charge."""
+        self._count("calls")
+        charge = self._charge(request)
+        result, _ = self._attempts(fn, charge)
+        self.limit.release()
+        self._succeeded(result, charge)
+        return result
+
+    @contextmanager
+    def stream(self, fn: Callable[[], T], request: Optional[Dict[str, Any]] = None) -> Iterator[T]:
+        """
+        call() for a function that opens a stream: fn() is retried the same
+        way, then its result is yielded with the concurrency slot still held.
+        The slot is freed when the with-block ends, and the block's outcome
+        is what the breaker and the limit see: an exception raised in it is
+        a failed call, a caller stopping early (GeneratorExit) neither.
+        Token usage is corrected from the result's `usage` once read.
+        """
+        self._count("calls")
+        charge = self._charge(request)
+        result, epoch = self._attempts(fn, charge)
+        try:
+            yield result
+        except Exception as exc:
+            self.limit.release()
+            self._failed(exc, self.settings.max_retries, charge, epoch)
+            raise
+        except BaseException:
+            self.limit.release()
+            raise
+        self.limit.release()
+        self._succeeded(result, charge)
+
+    def _attempts(self, fn: Callable[[], T], charge: float) -> Tuple[T, int]:
+        """(fn()'s result, the limit epoch) with a concurrency slot held; retried like call()."""
+        attempt = 0
+        while True:
+            self._admit()
+            time.sleep(self._reserve(charge))
+            epoch = self.limit.acquire()
+            try:
+                self._count("attempts")
+                result = fn()
+            except Exception as exc:
+                self.limit.release()
+                delay = self._failed(exc, attempt, charge, epoch)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self.limit.release()
+                raise
+            return result, epoch
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]], request: Optional[Dict[str, Any]] = None) -> T:
+        """call() for coroutines; waits without blocking the event loop."""
+        self._count("calls")
+        charge = self._charge(request)
+        attempt = 0
+        while True:
+            self._admit()
+            await asyncio.sleep(self._reserve(charge))
+            epoch = await self.limit.acquire_async()
+            try:
+                self._count("attempts")
+                result = await fn()
+            except Exception as exc:
+                self.limit.release()
+                delay = self._failed(exc, attempt, charge, epoch)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:  # cancelled: free the slot, nothing to retry
+                self.limit.release()
+                raise
+            self.limit.release()
+            self._succeeded(result, charge)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            waits = {"rate_wait_s": round(self._rate_wait_s, 3), "backoff_s": round(self._backoff_s, 3)}
+        return {
+            **counts,
+            **waits,
+            "concurrency_limit": self.limit.limit,
+            "in_flight": self.limit.in_flight,
+            "waiting": self.limit.waiting(),
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "settings": asdict(self.settings),
+        }
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def _admit(self) -> None:
+        try:
+            self.breaker.check()
+        except LLMUnavailableError:
+            self._count("rejected")
+            self._count("failed")
+            raise
+
+    def _charge(self, request: Optional[Dict[str, Any]]) -> float:
+        # what the token bucket actually takes, so usage corrections and refunds count against that
+        charge = estimate_request_tokens(request)
+        return self.tokens.cost(charge) if self.tokens is not None else charge
+
+    def _reserve(self, charge: float) -> float:
+        delay = max(self._paused_until - self._clock(), 0.0)
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(charge))
+        if delay:
+            with self._lock:
+                self._rate_wait_s += delay
+        return delay
+
+    def _refund(self, charge: float) -> None:
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.tokens is not None:
+            self.tokens.refund(charge)
+
+    def _succeeded(self, result: Any, charge: float) -> None:
+        self.breaker.success()
+        self.limit.on_success()
+        self._count("succeeded")
+        # utils.llm_providers.Completion, or a ChatStream's usage once read
+        usage = getattr(getattr(result, "usage", None) or result, "total_tokens", None)
+        if self.tokens is not None and usage is not None:
+            self.tokens.refund(charge - usage)
+
+    def _failed(self, exc: Exception, attempt: int, charge: float, epoch: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        kind = classify(exc)
+        wait = None
+        if kind == "throttled":
+            self._count("throttled")
+            self._refund(charge)  # a rejected request used no quota
+            self.breaker.success()  # the provider answered
+            self.limit.on_throttle(epoch)
+            wait = retry_after(exc)
+            if wait:
+                with self._lock:
+                    self._paused_until = max(self._paused_until, self._clock() + wait)
+        elif kind is not None:
+            self._count("server_errors" if kind == "server" else "connection_errors")
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        if kind is None or attempt >= self.settings.max_retries or self.breaker.state == "open":
+            self._count("failed")
+            return None
+        cap = min(self.settings.backoff_max_s, self.settings.backoff_s * 2 ** attempt)
+        delay = max(cap / 2 + random.uniform(0, cap / 2), wait or 0.0)
+        with self._lock:
+            self._counts["retries"] += 1
+            self._backoff_s += delay
+        return delay
+
+
+_governors: Dict[str, LLMGovernor] = {}
+_governor_lock = threading.Lock()
+
+
+def get_governor(provider: str = "groq") -> LLMGovernor:
+    """The process-wide governor for `provider` (quotas are per provider), built from the environment."""
+    with _governor_lock:
+        governor = _governors.get(provider)
+        if governor is None:
+            governor = _governors[provider] = LLMGovernor()
+        return governor
+
+
+def governor_stats() -> Dict[str, Any]:
+    with _governor_lock:
+        governors = dict(_governors)
+    return {provider: governor.stats() for provider, governor in governors.items()}
@@ -0,0 +1,269 @@
+"""Chat-completion providers behind llm_layer.
+
+llm_layer builds an OpenAI-style chat request (model, messages, temperature,
+max_tokens) and hands it to get_provider(), chosen by the environment:
+
+  NOISE_SIGNAL_LLM_PROVIDER  "groq" (default) or "openai": any OpenAI-compatible
+                             /chat/completions endpoint (OpenAI, vLLM, Ollama,
+                             scripts/stub_llm_server.py)
+  NOISE_SIGNAL_LLM_BASE_URL  the "openai" endpoint (default https://api.openai.com/v1)
+  NOISE_SIGNAL_LLM_API_KEY   its bearer key (falls back to OPENAI_API_KEY; local
+                             servers usually need none)
+  NOISE_SIGNAL_LLM_MODEL     its default model (default gpt-4o-mini)
+
+Groq keeps GROQ_API_KEY, GROQ_MODEL and GROQ_BASE_URL. Both providers use the
+pooled clients from utils.llm_clients and return Completion / ChatStream, so
+utils.llm_governor can retry and rate-limit either one the same way: HTTP
+errors carry `status_code` and `response`, network errors are ConnectionError.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+from utils.llm_clients import (
+    get_async_groq_client,
+    get_async_http_client,
+    get_groq_client,
+    get_http_client,
+)
+
+PROVIDERS = ("groq", "openai")
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    model: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        if self.prompt_tokens is None or self.completion_tokens is None:
+            return None
+        return self.prompt_tokens + self.completion_tokens
+
+
+class ChatStream:
+    """
+    Text deltas of a streamed completion; close() frees the connection, read
+    or not. Once read to the end, `usage` is a Completion (without text)
+    with the model and token counts, if the provider sent them.
+    """
+
+    def __init__(self, events: Iterator[Union[str, Completion]], close: Callable[[], None]):
+        self._events = events
+        self._close = close
+        self.usage: Optional[Completion] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for event in self._events:
+            if isinstance(event, str):
+                yield event
+            else:
+                self.usage = event
+
+    def close(self) -> None:
+        self._close()
+
+
+class ProviderStatusError(RuntimeError):
+    def __init__(self, response: Any):
+        super().__init__(f"Error code: {response.status_code} - {response.text[:500]}")
+        self.status_code = response.status_code
+        self.response = response
+
+
+class ProviderConnectionError(ConnectionError):
+    pass
+
+
+class LLMProvider:
+    name = ""
+
+    @property
+    def default_model(self) -> str:
+        raise NotImplementedError
+
+    def complete(self, request: Dict[str, Any]) -> Completion:
+        raise NotImplementedError
+
+    def open_stream(self, request: Dict[str, Any]) -> ChatStream:
+        """Returns once the response has started, so HTTP errors raise here."""
+        raise NotImplementedError
+
+    async def complete_async(self, request: Dict[str, Any]) -> Completion:
+        raise NotImplementedError
+
+    def configured(self) -> bool:
+        return True
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    @property
+    def default_model(self) -> str:
+        return os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+
+    def complete(self, request: Dict[str, Any]) -> Completion:
+        return _groq_completion(get_groq_client().chat.completions.create(**request))
+
+    def open_stream(self, request: Dict[str, Any]) -> ChatStream:
+        stream = get_groq_client().chat.completions.create(**request, stream=True)
+        return ChatStream(_groq_events(stream), stream.response.close)
+
+    async def complete_async(self, request: Dict[str, Any]) -> Completion:
+        return _groq_completion(await get_async_groq_client().chat.completions.create(**request))
+
+    def configured(self) -> bool:
+        return bool(os.getenv("GROQ_API_KEY"))
+
+
+def _groq_completion(resp: Any) -> Completion:
+    usage = resp.usage
+    return Completion(
+        text=resp.choices[0].message.content or "",
+        model=resp.model,
+        prompt_tokens=usage.prompt_tokens if usage else None,
+        completion_tokens=usage.completion_tokens if usage else None,
+    )
+
+
+def _groq_events(stream: Any) -> Iterator[Union[str, Completion]]:
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+        # Groq reports usage under x_groq on the last chunk
+        usage = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+        if usage:
+            yield Completion("", chunk.model, usage.prompt_tokens, usage.completion_tokens)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.model = model
+
+    @property
+    def default_model(self) -> str:
+        return self.model
+
+    def complete(self, request: Dict[str, Any]) -> Completion:
+        with _transport_errors():
+            response = get_http_client(self.base_url, self.api_key).post("/chat/completions", json=request)
+        if response.status_code >= 400:
+            raise ProviderStatusError(response)
+        return _json_completion(response.json())
+
+    def open_stream(self, request: Dict[str, Any]) -> ChatStream:
+        client = get_http_client(self.base_url, self.api_key)
+        with _transport_errors():
+            response = client.send(
+                client.build_request("POST", "/chat/completions", json={**request, **_STREAM_OPTIONS}), stream=True
+            )
+            if response.status_code >= 400:
+                response.read()
+                response.close()
+                raise ProviderStatusError(response)
+        return ChatStream(_sse_events(response), response.close)
+
+    async def complete_async(self, request: Dict[str, Any]) -> Completion:
+        with _transport_errors():
+            response = await get_async_http_client(self.base_url, self.api_key).post("/chat/completions", json=request)
+        if response.status_code >= 400:
+            raise ProviderStatusError(response)
+        return _json_completion(response.json())
+
+
+# a last chunk with the token usage (OpenAI, vLLM and Ollama all honour it)
+_STREAM_OPTIONS = {"stream": True, "stream_options": {"include_usage": True}}
+
+
+@contextmanager
+def _transport_errors() -> Iterator[None]:
+    import httpx
+
+    try:
+        yield
+    except httpx.TransportError as exc:  # connect, read and pool timeouts included
+        raise ProviderConnectionError(f"{type(exc).__name__}: {exc}") from exc
+
+
+def _json_completion(payload: Dict[str, Any]) -> Completion:
+    usage = payload.get("usage") or {}
+    return Completion(
+        text=(payload["choices"][0].get("message") or {}).get("content") or "",
+        model=payload.get("model") or "",
+        prompt_tokens=usage.get("prompt_tokens"),
+        completion_tokens=usage.get("completion_tokens"),
+    )
+
+
+def _sse_events(response: Any) -> Iterator[Union[str, Completion]]:
+    with _transport_errors():
+        for line in response.iter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            chunk = json.loads(data)
+            choices = chunk.get("choices") or []
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if delta:
+                yield delta
+            usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+            if usage:
+                yield Completion(
+                    "", chunk.get("model") or "", usage.get("prompt_tokens"), usage.get("completion_tokens")
+                )
+
+
+_provider: Optional[LLMProvider] = None
+_provider_key: Optional[tuple] = None
+_provider_lock = threading.Lock()
+
+
+def _settings_key() -> tuple:
+    return (
+        (os.getenv("NOISE_SIGNAL_LLM_PROVIDER") or "groq").strip().lower(),
+        os.getenv("NOISE_SIGNAL_LLM_BASE_URL") or "https://api.openai.com/v1",
+        os.getenv("NOISE_SIGNAL_LLM_API_KEY") or os.getenv("OPENAI_API_KEY") or None,
+        os.getenv("NOISE_SIGNAL_LLM_MODEL") or "gpt-4o-mini",
+    )
+
+
+def get_provider() -> LLMProvider:
+    """The provider NOISE_SIGNAL_LLM_PROVIDER names; rebuilt if its settings change."""
+    global _provider, _provider_key
+    key = _settings_key()
+    with _provider_lock:
+        if _provider is None or key != _provider_key:
+            name, base_url, api_key, model = key
+            if name == "groq":
+                _provider = GroqProvider()
+            elif name == "openai":
+                _provider = OpenAICompatibleProvider(base_url, api_key, model)
+            else:
+                raise ValueError(f"NOISE_SIGNAL_LLM_PROVIDER must be one of {PROVIDERS}")
+            _provider_key = key
+        return _provider
+
+
+def provider_info() -> Dict[str, Any]:
+    provider = get_provider()
+    info = {"name": provider.name, "default_model": provider.default_model, "configured": provider.configured()}
+    if isinstance(provider, OpenAICompatibleProvider):
+        info["base_url"] = provider.base_url
+    return info
+
@@ -0,0 +1,202 @@
+"""Per-call LLM telemetry: token usage, queue wait, time to first token, latency.
+
+llm_layer times every chat completion it sends (map-reduce part notes
+included) with a CallTimer and records the resulting LLMCall here:
+
+  queue_wait_s   from the call to the start of the attempt that succeeded:
+                 rate limits, the concurrency limit and retries with backoff
+  ttft_s         from the call to the first text delta (for a call that is
+                 not streamed, the whole reply arrives at once: ttft = latency)
+  latency_s      from the call to the last token
+  prompt_tokens, completion_tokens
+                 as the provider reports them (None if it reports none)
+
+get_telemetry() keeps the last NOISE_SIGNAL_LLM_TELEMETRY_WINDOW calls
+(default 500) per model and tier for rolling percentiles, plus running
+token totals; /health reports them. call_summary() folds the calls behind
+one summary into the figures the API returns and saves with each run.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# the tier recorded for map-reduce part notes, which every tier shares
+NOTES_TIER = "notes"
+
+
+@dataclass(frozen=True)
+class LLMCall:
+    provider: str
+    model: str
+    tier: Optional[str]
+    prompt_tokens: Optional[int]
+    completion_tokens: Optional[int]
+    queue_wait_s: float
+    ttft_s: float
+    latency_s: float
+    attempts: int
+    streamed: bool
+    started: float  # time.perf_counter() when the call was made
+
+
+class CallTimer:
+    """Times one governed call: attempt() wraps the function the governor runs."""
+
+    def __init__(self, provider: str, tier: Optional[str] = None, clock: Callable[[], float] = time.perf_counter):
+        self.provider = provider
+        self.tier = tier
+        self._clock = clock
+        self.started = clock()
+        self.attempt_started = self.started
+        self.first_token: Optional[float] = None
+        self.attempts = 0
+
+    def attempt(self, fn: Callable[[], T]) -> Callable[[], T]:
+        def timed() -> T:
+            self.attempts += 1
+            self.attempt_started = self._clock()
+            return fn()
+        return timed
+
+    def token(self) -> None:
+        if self.first_token is None:
+            self.first_token = self._clock()
+
+    def finish(
+        self,
+        model: str,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        streamed: bool = False,
+    ) -> LLMCall:
+        """Builds the LLMCall and records it in get_telemetry()."""
+        now = self._clock()
+        call = LLMCall(
+            provider=self.provider,
+            model=model,
+            tier=self.tier,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            queue_wait_s=self.attempt_started - self.started,
+            ttft_s=(self.first_token if self.first_token is not None else now) - self.started,
+            latency_s=now - self.started,
+            attempts=self.attempts,
+            streamed=streamed,
+            started=self.started,
+        )
+        get_telemetry().record(call)
+        return call
+
+
+class LLMTelemetry:
+    def __init__(self, window: int = 500):
+        self.window = max(1, window)
+        self._recent: Dict[Tuple[str, str], Deque[LLMCall]] = {}
+        self._totals: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: LLMCall) -> None:
+        key = (call.model, call.tier or "")
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent is None:
+                recent = self._recent[key] = deque(maxlen=self.window)
+                self._totals[key] = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+            recent.append(call)
+            totals = self._totals[key]
+            totals["calls"] += 1
+            totals["prompt_tokens"] += call.prompt_tokens or 0
+            totals["completion_tokens"] += call.completion_tokens or 0
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """One row per (model, tier): totals since start, percentiles over the window."""
+        with self._lock:
+            snapshot = {key: (list(recent), dict(self._totals[key])) for key, recent in self._recent.items()}
+        rows = []
+        for (model, tier), (calls, totals) in sorted(snapshot.items()):
+            completion = [c.completion_tokens for c in calls if c.completion_tokens is not None]
+            rows.append({
+                "model": model,
+                "tier": tier or None,
+                **totals,
+                "window": len(calls),
+                "mean_prompt_tokens": _mean([c.prompt_tokens for c in calls if c.prompt_tokens is not None]),
+                "mean_completion_tokens": _mean(completion),
+                "retried": sum(c.attempts > 1 for c in calls),
+                "queue_wait_ms": _percentiles([c.queue_wait_s for c in calls]),
+                "ttft_ms": _percentiles([c.ttft_s for c in calls]),
+                "latency_ms": _percentiles([c.latency_s for c in calls]),
+            })
+        return rows
+
+
+def call_summary(calls: Sequence[LLMCall]) -> Optional[Dict[str, Any]]:
+    """
+    The calls behind one summary as API meta / analysis_runs figures, or None
+    if there were none (a cache hit). Tokens add up over all calls; queue
+    wait and time to first token are those of the last call, the one that
+    wrote the summary; latency spans from the first call to the last token.
+    """
+    if not calls:
+        return None
+    calls = sorted(calls, key=lambda c: c.started + c.latency_s)
+    final = calls[-1]
+    prompt = [c.prompt_tokens for c in calls if c.prompt_tokens is not None]
+    completion = [c.completion_tokens for c in calls if c.completion_tokens is not None]
+    start = min(c.started for c in calls)
+    return {
+        "calls": len(calls),
+        "provider": final.provider,
+        "model": final.model,
+        "prompt_tokens": sum(prompt) if prompt else None,
+        "completion_tokens": sum(completion) if completion else None,
+        "attempts": sum(c.attempts for c in calls),
+        "queue_wait_ms": _ms(final.queue_wait_s),
+        "ttft_ms": _ms(final.ttft_s),
+        "latency_ms": _ms(final.started + final.latency_s - start),
+    }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _mean(values: List[int]) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, float]:
+    values = sorted(seconds)
+    if not values:
+        return {}
+
+    def rank(q: float) -> float:
+        # nearest-rank, as nlp_layer.profile_report
+        return _ms(values[max(0, min(len(values) - 1, int(round(q / 100.0 * len(values) + 0.5)) - 1))])
+
+    return {"p50": rank(50), "p90": rank(90), "p99": rank(99), "max": _ms(values[-1])}
+
+
+_telemetry: Optional[LLMTelemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> LLMTelemetry:
+    """The process-wide LLMTelemetry, its window from NOISE_SIGNAL_LLM_TELEMETRY_WINDOW."""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = LLMTelemetry(int(os.getenv("NOISE_SIGNAL_LLM_TELEMETRY_WINDOW") or 500))
+        return _telemetry
+
+
+def telemetry_stats() -> List[Dict[str, Any]]:
+    return get_telemetry().stats()
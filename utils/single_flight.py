@@ -0,0 +1,96 @@
+"""Single-flight execution: concurrent callers with the same key share one run.
+
+The first caller for a key starts `produce()` in a background thread; every
+caller, the first included, reads the items it yields from the start, as
+they arrive. A caller that stops reading (a client that disconnects) does not
+stop the run, so the others still get everything, and an exception raised by
+produce() is re-raised in each of them. Once the run ends the key is free
+again: single-flight only merges overlapping calls, caching is left to the
+caches downstream.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Flight(Generic[T]):
+    def __init__(self) -> None:
+        self._items: List[T] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def publish(self, item: T) -> None:
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self._done = True
+            self._error = error
+            self._cond.notify_all()
+
+    def events(self) -> Iterator[T]:
+        seen = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._items) > seen or self._done)
+                items = self._items[seen:]
+                done, error = self._done, self._error
+            for item in items:
+                yield item
+            seen += len(items)
+            if done and seen == len(self._items):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight(Generic[T]):
+    def __init__(self, name: str = "single-flight"):
+        self.name = name
+        self._flights: Dict[Hashable, Flight[T]] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+
+    def join(self, key: Hashable, produce: Callable[[], Iterator[T]]) -> Tuple[Iterator[T], bool]:
+        """(items, started): started is True for the caller whose produce() runs."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.joined += 1
+                return flight.events(), False
+            flight = self._flights[key] = Flight()
+            self.started += 1
+        threading.Thread(target=self._run, args=(key, flight, produce), name=self.name, daemon=True).start()
+        return flight.events(), True
+
+    def _run(self, key: Hashable, flight: Flight[T], produce: Callable[[], Iterator[T]]) -> None:
+        error = None
+        try:
+            for item in produce():
+                flight.publish(item)
+        except BaseException as exc:  # handed to every caller
+            error = exc
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.finish(error)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._flights)
+            started, joined = self.started, self.joined
+        return {
+            "in_flight": in_flight,
+            "started": started,
+            "joined": joined,
+            "join_rate": round(joined / (started + joined), 4) if started + joined else 0.0,
+        }